@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.metrics import record_cache_lookup
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU cache mapping token keys to (user, token) pairs.
+    Entries expire after `ttl` seconds, which also bounds how long another worker
+    process may keep serving a token that was deleted elsewhere.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [key for key, (_, (user, _)) in self._entries.items() if user.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide token cache used by CachedTokenAuthentication.
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60),
+)
+
+
+def token_lifetime():
+    """Return how long a token stays valid as a timedelta, or None if tokens never expire."""
+    seconds = getattr(settings, 'AUTH_TOKEN_EXPIRY', None)
+    return timedelta(seconds=seconds) if seconds else None
+
+
+def token_expires_at(token):
+    lifetime = token_lifetime()
+    return token.created + lifetime if lifetime else None
+
+
+def is_token_expired(token):
+    expires_at = token_expires_at(token)
+    return expires_at is not None and expires_at <= timezone.now()
+
+
+def rotate_token(user):
+    """Replace the user's token with a fresh one and return it."""
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+def get_valid_token(user):
+    """Return the user's token, rotating it first if it has expired."""
+    token, _ = Token.objects.get_or_create(user=user)
+    if is_token_expired(token):
+        token = rotate_token(user)
+    return token
+
+
+class TokenKeyParser(TokenAuthentication):
+    """Runs DRF's header parsing only and returns the token key, for async callers."""
+
+    def authenticate_credentials(self, key):
+        return key
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication that keeps recently used
+    tokens in memory, so authenticated requests usually need no database query.
+    Tokens older than AUTH_TOKEN_EXPIRY seconds are rejected. Cache entries are
+    dropped when their token is deleted or their user deactivated (see signals).
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        record_cache_lookup('auth_token', cached is not None)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        if is_token_expired(token):
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        expires_at = token_expires_at(token)
+        ttl = (expires_at - timezone.now()).total_seconds() if expires_at else None
+        token_cache.set(key, (user, token), ttl)
+        return user, token
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate() for the async views: returns (user, token)
+        or None. A cached token needs no thread hop, only a miss queries in a worker thread."""
+        key = TokenKeyParser().authenticate(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            record_cache_lookup('auth_token', True)
+            return cached
+        return await sync_to_async(self.authenticate_credentials)(key)
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """A deleted (e.g. rotated) token must stop authenticating immediately."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, **kwargs):
+    """Drop cached tokens of changed users, so deactivation and profile edits take effect."""
+    if not created:
+        token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
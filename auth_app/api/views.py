@@ -2,7 +2,9 @@ from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from core.metrics import login_failures
+from .authentication import get_valid_token
 from .models import UserProfile
 from .serializers import UserRegistrationSerializer, LoginSerializer
 
@@ -32,19 +34,23 @@ class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     """Allow any user (including unauthenticated) to access this endpoint."""
     permission_classes = [AllowAny]
+    """Skip token authentication, so a client still sending an expired token can log in again."""
+    authentication_classes = []
 
     def post(self, request, *args, **kwargs):
         """Handle POST requests for user login."""
 
         """Instantiate the serializer with the incoming login data."""
         serializer = self.get_serializer(data=request.data)
-        """Validate the credentials; raise error if invalid."""
-        serializer.is_valid(raise_exception=True)
+        """Validate the credentials; count and raise the error if they are invalid."""
+        if not serializer.is_valid():
+            login_failures.inc()
+            raise ValidationError(serializer.errors)
 
         """Retrieve the authenticated User object from the validated data."""
         user = serializer.validated_data['user']
-        """Get or create an authentication token for the user."""
-        token, _ = Token.objects.get_or_create(user=user)
+        """Get or create an authentication token for the user, replacing it if it has expired."""
+        token = get_valid_token(user)
         """Retrieve the UserProfile associated with this user."""
         profile = UserProfile.objects.get(user=user)
 
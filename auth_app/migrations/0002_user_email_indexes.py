@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# The user model belongs to django.contrib.auth, so its indexes cannot be declared
+# in Meta; they are created here through the schema editor instead.
+EMAIL_INDEXES = [
+    models.Index(fields=['email'], name='user_email_idx'),
+    models.Index(Lower('email'), name='user_email_lower_idx'),
+]
+
+
+def user_model(apps):
+    return apps.get_model(settings.AUTH_USER_MODEL)
+
+
+def add_indexes(apps, schema_editor):
+    for index in EMAIL_INDEXES:
+        schema_editor.add_index(user_model(apps), index)
+
+
+def remove_indexes(apps, schema_editor):
+    for index in EMAIL_INDEXES:
+        schema_editor.remove_index(user_model(apps), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
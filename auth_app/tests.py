@@ -1,3 +1,50 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .api.authentication import token_cache
+from .api.models import UserProfile
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Token lookups are cached in memory and dropped when the token or user changes."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='a@example.com', email='a@example.com', password='secret')
+        UserProfile.objects.create(user=self.user, fullname='A')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_needs_no_auth_query(self):
+        self.assertEqual(self.client.get('/api/boards/').status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/boards/')
+        self.assertFalse([query for query in context.captured_queries if 'authtoken_token' in query['sql']])
+
+    def test_deleted_token_and_inactive_user_are_rejected(self):
+        self.client.get('/api/boards/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/boards/').status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get('/api/boards/')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/boards/').status_code, 401)
+
+    @override_settings(AUTH_TOKEN_EXPIRY=3600)
+    def test_expired_token_is_rotated_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(created=self.token.created - timedelta(hours=2))
+        self.assertEqual(self.client.get('/api/boards/').status_code, 401)
+
+        response = self.client.post('/api/login/', {'email': 'a@example.com', 'password': 'secret'})
+        self.assertNotEqual(response.data['token'], self.token.key)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        self.assertEqual(self.client.get('/api/boards/').status_code, 200)
@@ -16,7 +16,11 @@ Including another URLconf
 """
 from django.urls import path, include
 
+from .metrics import metrics_view
+
 urlpatterns = [
+    # Prometheus scrape endpoint with the request, SQL, login and cache metrics of all workers
+    path('metrics/', metrics_view, name='metrics'),
     path('', include('auth_app.api.urls')),
     path('', include('kanban_app.api.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Read replica routing.
+
+For GET, HEAD and OPTIONS requests to the views in REPLICA_READ_VIEWS, ReplicaRouter
+sends reads to the aliases in DATABASE_REPLICAS, round-robin over those passing their
+health check. Everything else uses the primary: writes, other views, reads inside a
+transaction, management commands and the models in REPLICA_PRIMARY_MODELS.
+After a user's write request, that user reads from the primary for
+REPLICA_STICKY_SECONDS, so they see their own changes even while replicas lag.
+The routing state of a request is installed by core.middleware.ReplicaRoutingMiddleware.
+"""
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger('core.db_routers')
+
+# Cheap query that also fails on a replica without the schema (e.g. an empty SQLite file).
+PROBE_SQL = 'SELECT 1 FROM django_migrations LIMIT 1'
+
+
+def sticky_key(user_id):
+    return f'replica:sticky:{user_id}'
+
+
+def authenticated_user_id(request):
+    """The id of the user DRF authenticated, without evaluating Django's lazy session user
+    (that would query the database from inside the router)."""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def remember_write(request):
+    """Pin the requesting user to the primary for REPLICA_STICKY_SECONDS."""
+    user_id = authenticated_user_id(request)
+    if user_id is not None:
+        cache.set(sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+class ReadRouting:
+    """Routing state of one request. `enabled` is switched on for safe requests to a
+    replica-read view; `forced` counts the open use_primary() blocks."""
+
+    def __init__(self, request):
+        self.request = request
+        self.enabled = False
+        self.forced = 0
+        self.sticky = None
+
+    def use_replica(self):
+        if not self.enabled or self.forced:
+            return False
+        if self.sticky is None:
+            user_id = authenticated_user_id(self.request)
+            if user_id is None:
+                """Before authentication only anonymous reads happen; decide again later."""
+                return True
+            self.sticky = cache.get(sticky_key(user_id)) is not None
+        return not self.sticky
+
+
+read_routing = ContextVar('read_routing', default=None)
+
+
+@contextmanager
+def use_primary():
+    """Send the reads of the block to the primary, e.g. when their result gets cached
+    and must not be stale."""
+    routing = read_routing.get()
+    if routing is None:
+        yield
+        return
+    routing.forced += 1
+    try:
+        yield
+    finally:
+        routing.forced -= 1
+
+
+class ReplicaPool:
+    """Round-robin over the replicas, skipping those that failed their last health check.
+    Each replica is probed at most every REPLICA_HEALTH_CHECK_SECONDS per process."""
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.checked = {}
+
+    def choose(self, replicas):
+        start = next(self.counter)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def healthy(self, alias):
+        now = time.monotonic()
+        state = self.checked.get(alias)
+        if state is None or now - state[1] >= settings.REPLICA_HEALTH_CHECK_SECONDS:
+            state = self.checked[alias] = (self.probe(alias), now)
+        return state[0]
+
+    def mark(self, alias, healthy):
+        self.checked[alias] = (healthy, time.monotonic())
+
+    @staticmethod
+    def probe(alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(PROBE_SQL)
+            return True
+        except DatabaseError as error:
+            logger.warning('Replica %s failed its health check, reading from the primary: %s', alias, error)
+            connection.close()
+            return False
+
+
+replica_pool = ReplicaPool()
+
+
+class ReplicaRouter:
+    """Database router implementing the rules described in the module docstring."""
+
+    def db_for_read(self, model, **hints):
+        routing = read_routing.get()
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or routing is None:
+            return None
+        if model._meta.label in settings.REPLICA_PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in replicas:
+            """Related objects come from the replica their parent was read from."""
+            return instance._state.db
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or not routing.use_replica():
+            return DEFAULT_DB_ALIAS
+        return replica_pool.choose(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS if settings.DATABASE_REPLICAS else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Primary and replicas hold the same data."""
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Replicas receive their schema through replication."""
+        return False if db in settings.DATABASE_REPLICAS else None
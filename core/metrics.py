@@ -0,0 +1,257 @@
+"""
+Prometheus metrics without a client library or external services.
+
+Every process writes its samples into its own memory-mapped file in METRICS_DIR, so
+workers of a pre-fork server never contend for a lock: a process only takes its own
+thread lock while updating a value. The /api/metrics/ endpoint reads the files of all
+processes and sums them. Counters of exited workers are kept, like Prometheus' own
+multiprocess mode does, so the directory should be emptied when the service starts.
+
+File layout: an 8 byte header holding the number of bytes used, followed by entries of
+a 4 byte key length, the UTF-8 key padded to 8 bytes and an 8 byte float value. A new
+entry is written completely before the header is moved past it, so readers in other
+processes never see half an entry.
+"""
+import bisect
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+# Default latency buckets in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+INITIAL_FILE_SIZE = 1024 * 1024
+
+
+class MetricsFile:
+    """The memory-mapped sample file of the current process."""
+
+    def __init__(self, path):
+        self.path = path
+        exists = os.path.exists(path)
+        self.file = open(path, 'r+b' if exists else 'w+b')
+        if not exists or os.path.getsize(path) < 8:
+            self.file.truncate(INITIAL_FILE_SIZE)
+        self.capacity = os.path.getsize(path)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+        self.positions = {}
+        self.used = struct.unpack_from('Q', self.map, 0)[0] or 8
+        for key, _, position in read_entries(self.map, self.used):
+            self.positions[key] = position
+
+    def add(self, key, amount):
+        position = self.positions.get(key)
+        if position is None:
+            position = self.append(key)
+        value = struct.unpack_from('d', self.map, position)[0]
+        struct.pack_into('d', self.map, position, value + amount)
+
+    def append(self, key):
+        encoded = key.encode('utf-8')
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        size = 4 + padded + 8
+        while self.used + size > self.capacity:
+            self.grow()
+        struct.pack_into(f'I{padded}sd', self.map, self.used, len(encoded), encoded, 0.0)
+        position = self.used + 4 + padded
+        self.used += size
+        struct.pack_into('Q', self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def grow(self):
+        self.capacity *= 2
+        self.map.close()
+        self.file.truncate(self.capacity)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+
+
+def read_entries(buffer, used):
+    """Yield (key, value, value position) for every complete entry."""
+    position = 8
+    while position < used:
+        length = struct.unpack_from('I', buffer, position)[0]
+        padded = length + (-(4 + length) % 8)
+        key = bytes(buffer[position + 4:position + 4 + length]).decode('utf-8')
+        value_position = position + 4 + padded
+        yield key, struct.unpack_from('d', buffer, value_position)[0], value_position
+        position = value_position + 8
+
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < 8:
+        return
+    used = min(struct.unpack_from('Q', data, 0)[0], len(data))
+    for key, value, _ in read_entries(data, used):
+        yield key, value
+
+
+class Registry:
+    """Holds the metric definitions and the sample file of this process.
+    The file is (re)opened lazily, so a worker forked from a master that already
+    recorded samples gets its own file."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.owner = None
+        self.file = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, samples):
+        """Add (key, amount) pairs to this process' file under a single lock acquisition."""
+        if not settings.METRICS_ENABLED:
+            return
+        with self.lock:
+            owner = (os.getpid(), settings.METRICS_DIR)
+            if self.owner != owner:
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                self.file = MetricsFile(os.path.join(settings.METRICS_DIR, f'metrics-{os.getpid()}.db'))
+                self.owner = owner
+            for key, amount in samples:
+                self.file.add(key, amount)
+
+    def collect(self):
+        """Sum the samples of all processes: {sample name: {label tuple: value}}."""
+        samples = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics-*.db')):
+            for key, value in read_file(path):
+                name, labels = json.loads(key)
+                series = samples.setdefault(name, {})
+                label_key = tuple(tuple(pair) for pair in labels)
+                series[label_key] = series.get(label_key, 0.0) + value
+        return samples
+
+    def exposition(self):
+        """Render the text exposition format."""
+        samples = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for sample_name in metric.sample_names():
+                for labels, value in sorted(samples.get(sample_name, {}).items(), key=metric.sort_key):
+                    rendered = ','.join(f'{key}="{escape(str(val))}"' for key, val in labels)
+                    lines.append(f'{sample_name}{{{rendered}}} {value!r}' if rendered else f'{sample_name} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+registry = Registry()
+
+
+def sample_key(name, labels):
+    """Encode a sample name and its labels as the key stored in the files."""
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Metric:
+    """Base of Counter and Histogram; encoded keys are cached per label values."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.keys = {}
+        registry.register(self)
+
+    def keys_for(self, labels):
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        keys = self.keys.get(values)
+        if keys is None:
+            keys = self.keys[values] = self.build_keys(dict(zip(self.labelnames, values)))
+        return keys
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def build_keys(self, labels):
+        return sample_key(self.name, labels)
+
+    def inc(self, amount=1, **labels):
+        registry.add([(self.keys_for(labels), amount)])
+
+    def sample_names(self):
+        return [self.name]
+
+    @staticmethod
+    def sort_key(item):
+        return item[0]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def build_keys(self, labels):
+        """Bucket keys in ascending order (+Inf last), then the _sum and _count keys."""
+        bounds = [repr(bound) for bound in self.buckets] + ['+Inf']
+        buckets = [sample_key(f'{self.name}_bucket', {**labels, 'le': bound}) for bound in bounds]
+        return buckets, sample_key(f'{self.name}_sum', labels), sample_key(f'{self.name}_count', labels)
+
+    def observe(self, value, **labels):
+        """Buckets are stored cumulatively, as exposed: every bucket at or above the value counts it."""
+        buckets, sum_key, count_key = self.keys_for(labels)
+        first = bisect.bisect_left(self.buckets, value)
+        registry.add([*((key, 1) for key in buckets[first:]), (sum_key, value), (count_key, 1)])
+
+    def sample_names(self):
+        return [f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count']
+
+    @staticmethod
+    def sort_key(item):
+        """Order buckets by their numeric bound within each label set."""
+        labels = dict(item[0])
+        bound = labels.pop('le', None)
+        return tuple(sorted(labels.items())), float('inf') if bound in (None, '+Inf') else float(bound)
+
+
+http_requests = Counter(
+    'kanmind_http_requests_total', 'Requests per view class, method and status code.', ['view', 'method', 'status'],
+)
+http_request_duration = Histogram(
+    'kanmind_http_request_duration_seconds', 'Request latency per view class and method.', ['view', 'method'],
+)
+db_queries = Counter('kanmind_db_queries_total', 'SQL queries issued per view class.', ['view'])
+db_query_duration = Counter('kanmind_db_query_seconds_total', 'Time spent in SQL per view class.', ['view'])
+login_failures = Counter('kanmind_login_failures_total', 'Rejected login attempts.')
+cache_requests = Counter(
+    'kanmind_cache_requests_total', 'Lookups per cache and result (hit or miss).', ['cache', 'result'],
+)
+
+
+def record_cache_lookup(cache_name, hit, count=1):
+    cache_requests.inc(count, cache=cache_name, result='hit' if hit else 'miss')
+
+
+def metrics_view(request):
+    """Serve the metrics of all processes. Requires `Authorization: Bearer <METRICS_TOKEN>`
+    when that is set and a logged-in staff user otherwise; missing while metrics are disabled."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = request.headers.get('Authorization') == f'Bearer {token}'
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,335 @@
+"""
+Opt-in performance instrumentation, enabled with PERF_INSTRUMENTATION.
+
+PerformanceMiddleware measures every request: wall time, number and duration of
+SQL queries, the time spent in the view (serializers and view code, excluding SQL),
+the time spent rendering the response and its size. The figures are sent back as a
+Server-Timing header, slow requests are logged together with their slowest SQL
+statements and repeated query shapes (typical for N+1 problems), and per-route
+histograms are written to PERF_STATS_DIR from where `manage.py dump_perf_stats` reads them.
+
+MetricsMiddleware feeds /api/metrics/ and ReplicaRoutingMiddleware drives the read
+replica routing of core.db_routers.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .db_routers import ReadRouting, read_routing, remember_write
+from .metrics import db_queries, db_query_duration, http_request_duration, http_requests
+
+logger = logging.getLogger('core.performance')
+
+# Upper bounds (ms) of the latency histogram buckets; a last bucket takes everything slower.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Collapses placeholder lists such as IN (%s, %s, %s) so queries differing only in list length match.
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+def fingerprint(sql):
+    """Reduce a SQL statement to its shape: placeholder lists and literal numbers are folded."""
+    return NUMBER.sub('N', PLACEHOLDER_LIST.sub('(...)', sql))
+
+
+class QueryRecorder:
+    """connection.execute_wrapper callback collecting the SQL and duration of every query."""
+
+    def __init__(self):
+        self.queries = []
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries.append((sql, duration))
+            self.total_ms += duration
+
+
+def recording(recorder):
+    """Context manager installing the recorder on every database connection."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+    return stack
+
+
+class RequestMetrics:
+    """The measurements of one request, filled in by the middleware hooks."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.recorder = QueryRecorder()
+        self.view_start = self.view_end = self.render_end = None
+        self.db_at_view_start = self.db_at_view_end = 0.0
+
+    def elapsed_ms(self, since, until=None):
+        return ((until or time.perf_counter()) - since) * 1000
+
+
+class ViewStats:
+    """
+    Per-route aggregates kept in process memory: request count, latency histogram,
+    SQL totals and bytes. A JSON snapshot is written to PERF_STATS_DIR at most every
+    PERF_STATS_FLUSH_SECONDS (and at exit), one file per process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    def record(self, key, total_ms, queries, db_ms, size):
+        with self.lock:
+            route = self.routes.setdefault(key, {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'buckets': [0] * (len(BUCKETS_MS) + 1),
+                'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'bytes': 0,
+            })
+            route['count'] += 1
+            route['total_ms'] += total_ms
+            route['max_ms'] = max(route['max_ms'], total_ms)
+            route['buckets'][next((i for i, bound in enumerate(BUCKETS_MS) if total_ms <= bound), len(BUCKETS_MS))] += 1
+            route['queries'] += queries
+            route['max_queries'] = max(route['max_queries'], queries)
+            route['db_ms'] += db_ms
+            route['bytes'] += size or 0
+            due = time.monotonic() - self.last_flush >= settings.PERF_STATS_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'host': socket.gethostname(),
+                'written_at': time.time(),
+                'buckets_ms': list(BUCKETS_MS),
+                'routes': copy.deepcopy(self.routes),
+            }
+
+    def flush(self):
+        """Write the snapshot atomically, so the dump command never reads half a file."""
+        if not self.routes or not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            return
+        self.last_flush = time.monotonic()
+        directory = settings.PERF_STATS_DIR
+        os.makedirs(directory, exist_ok=True)
+        data = self.snapshot()
+        path = os.path.join(directory, f"perf-{data['host']}-{data['pid']}.json")
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(f'{path}.tmp', path)
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+
+
+view_stats = ViewStats()
+
+
+class PerformanceMiddleware:
+    """
+    Measure each request and report it via Server-Timing, the slow request log and
+    the per-route histograms. Works for sync and async requests; streamed responses
+    are measured up to the point their body starts streaming.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._perf = metrics = RequestMetrics()
+        with recording(metrics.recorder):
+            response = self.get_response(request)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        request._perf = metrics = RequestMetrics()
+        with recording(metrics.recorder):
+            response = await self.get_response(request)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request._perf
+        metrics.view_start = time.perf_counter()
+        metrics.db_at_view_start = metrics.recorder.total_ms
+
+    def process_template_response(self, request, response):
+        """DRF responses render after this hook; being the outermost middleware it runs last."""
+        metrics = request._perf
+        metrics.view_end = time.perf_counter()
+        metrics.db_at_view_end = metrics.recorder.total_ms
+
+        def rendered(response):
+            metrics.render_end = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        total_ms = metrics.elapsed_ms(metrics.start)
+        recorder = metrics.recorder
+        size = None if response.streaming else len(response.content)
+
+        timings = [
+            f'total;dur={total_ms:.1f}',
+            f'db;dur={recorder.total_ms:.1f};desc="{len(recorder.queries)} queries"',
+        ]
+        if metrics.view_start is not None:
+            view_end = metrics.view_end or time.perf_counter()
+            view_ms = metrics.elapsed_ms(metrics.view_start, view_end)
+            view_db_ms = (metrics.db_at_view_end if metrics.view_end else recorder.total_ms) - metrics.db_at_view_start
+            timings.append(f'serialize;dur={max(view_ms - view_db_ms, 0):.1f};desc="view and serializers"')
+        if metrics.view_end is not None and metrics.render_end is not None:
+            timings.append(f'render;dur={metrics.elapsed_ms(metrics.view_end, metrics.render_end):.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        match = request.resolver_match
+        key = f'{request.method} /{match.route}' if match else f'{request.method} <unresolved>'
+        view_stats.record(key, total_ms, len(recorder.queries), recorder.total_ms, size)
+
+        if total_ms >= settings.PERF_SLOW_REQUEST_MS:
+            self.log_slow_request(request, response, key, total_ms, size, recorder)
+
+    @staticmethod
+    def log_slow_request(request, response, key, total_ms, size, recorder):
+        top = sorted(recorder.queries, key=lambda query: query[1], reverse=True)[:settings.PERF_SLOW_QUERY_TOP]
+        duplicates = [
+            (count, shape) for shape, count in Counter(fingerprint(sql) for sql, _ in recorder.queries).most_common()
+            if count > 1
+        ]
+        lines = [
+            f'Slow request {request.method} {request.get_full_path()} ({key}): {total_ms:.1f}ms, '
+            f'status {response.status_code}, {len(recorder.queries)} queries in {recorder.total_ms:.1f}ms, '
+            f'{size if size is not None else "streamed"} bytes',
+        ]
+        lines += [f'  {duration:8.1f}ms  {sql}' for sql, duration in top]
+        lines += [f'  repeated {count}x: {shape}' for count, shape in duplicates[:settings.PERF_SLOW_QUERY_TOP]]
+        logger.warning('\n'.join(lines))
+
+
+def view_label(request):
+    """The view class name (e.g. BoardSingleView), the function name for function views."""
+    match = request.resolver_match
+    if match is None:
+        return '<unresolved>'
+    return getattr(getattr(match.func, 'view_class', None), '__name__', None) or match.func.__name__
+
+
+class MetricsMiddleware:
+    """
+    Count requests per view class, method and status code, and record their latency,
+    SQL query count and SQL time for /api/metrics/. Inactive unless METRICS_ENABLED is set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, recorder = time.perf_counter(), QueryRecorder()
+        with recording(recorder):
+            response = self.get_response(request)
+        self.record(request, response, start, recorder)
+        return response
+
+    async def __acall__(self, request):
+        start, recorder = time.perf_counter(), QueryRecorder()
+        with recording(recorder):
+            response = await self.get_response(request)
+        self.record(request, response, start, recorder)
+        return response
+
+    @staticmethod
+    def record(request, response, start, recorder):
+        view = view_label(request)
+        http_requests.inc(view=view, method=request.method, status=str(response.status_code))
+        http_request_duration.observe(time.perf_counter() - start, view=view, method=request.method)
+        if recorder.queries:
+            db_queries.inc(len(recorder.queries), view=view)
+            db_query_duration.inc(recorder.total_ms / 1000, view=view)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Install the read routing state of core.db_routers for every request: safe requests
+    to the views in REPLICA_READ_VIEWS may read from replicas, and successful writes pin
+    their user to the primary for REPLICA_STICKY_SECONDS. Inactive without DATABASE_REPLICAS.
+    The context variable is set and reset here rather than in process_view, which may
+    run in a different context under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = read_routing.set(ReadRouting(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_routing.reset(token)
+        self.finish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = read_routing.set(ReadRouting(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_routing.reset(token)
+        self.finish(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and view_class is not None:
+            read_routing.get().enabled = view_class.__name__ in settings.REPLICA_READ_VIEWS
+
+    @staticmethod
+    def finish(request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            remember_write(request)
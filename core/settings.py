@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from corsheaders.defaults import default_headers, default_methods
 
@@ -47,12 +48,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so it measures everything below; inactive unless PERF_INSTRUMENTATION is set
+    'core.middleware.PerformanceMiddleware',
+    # Request counters and latency histograms for /api/metrics/, inactive unless METRICS_ENABLED is set
+    'core.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Read replica routing for the views in REPLICA_READ_VIEWS (inactive without DB_REPLICAS)
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,13 +98,163 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLite by default. DB_ENGINE=postgresql switches to PostgreSQL (needs psycopg[pool])
+# configured by DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT; connections are
+# then pooled by Django (DB_POOL_MIN_SIZE/DB_POOL_MAX_SIZE/DB_POOL_TIMEOUT) unless
+# DB_POOL=0, in which case they persist for DB_CONN_MAX_AGE seconds instead.
+# DB_CONN_HEALTH_CHECKS drops broken persistent connections before they are reused.
+# SQLite is tuned for a single node with concurrent workers (WAL journal, synchronous=NORMAL,
+# memory-mapped reads, writers queue for SQLITE_BUSY_TIMEOUT seconds and take the write
+# lock when their transaction starts); SQLITE_TUNED=0 restores SQLite's own defaults.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+DB_POOL = os.environ.get('DB_POOL', '1').lower() in ('1', 'true', 'yes')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', '1').lower() in ('1', 'true', 'yes')
+SQLITE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))};"
+        f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_KB', 64 * 1024))};"
+        'PRAGMA temp_store=MEMORY'
+    ),
+    'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+    'transaction_mode': 'IMMEDIATE',
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'kanmind'),
+            'USER': os.environ.get('DB_USER', 'kanmind'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # A pool replaces persistent connections; Django refuses CONN_MAX_AGE together with it.
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                },
+            } if DB_POOL else {},
+        }
     }
-}
+else:
+    SQLITE_TUNED = os.environ.get('SQLITE_TUNED', '1').lower() in ('1', 'true', 'yes')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': SQLITE_OPTIONS if SQLITE_TUNED else {},
+        }
+    }
+
+
+
+# Read replicas (core.db_routers.ReplicaRouter)
+# DB_REPLICAS is a comma separated list of replicas of the default database: SQLite
+# file names, or PostgreSQL hosts when DB_ENGINE=postgresql. They are added as the
+# aliases replica1, replica2, ... Safe requests to REPLICA_READ_VIEWS read from them
+# round-robin; a replica failing its health check is skipped for
+# REPLICA_HEALTH_CHECK_SECONDS. After a write request its user reads from the
+# primary for REPLICA_STICKY_SECONDS (shared through the cache, so use Redis with
+# several processes). REPLICA_PRIMARY_MODELS are always read from the primary.
+
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        ('NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'): replica.strip(),
+        # The test runner points replicas at the test database instead of creating their own
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+REPLICA_READ_VIEWS = [
+    'BoardListCreateView', 'BoardSingleView', 'TaskAssigneeView', 'TaskReviewerView', 'CommentListCreateAPIView',
+    'SearchView',
+]
+REPLICA_PRIMARY_MODELS = ['authtoken.Token', 'sessions.Session']
+REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+REPLICA_HEALTH_CHECK_SECONDS = float(os.environ.get('REPLICA_HEALTH_CHECK_SECONDS', 30))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set CACHE_REDIS_URL to share the cache between processes.
+
+if os.environ.get('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a serialized board detail payload stays cached (invalidated on every write anyway)
+BOARD_CACHE_TIMEOUT = int(os.environ.get('BOARD_CACHE_TIMEOUT', 300))
+
+
+# Broker fanning board change events out to /api/boards/<pk>/events/ subscribers.
+# The in-memory broker only reaches subscribers connected to the same process.
+KANBAN_EVENT_BROKER = os.environ.get('KANBAN_EVENT_BROKER', 'kanban_app.api.events.InMemoryBroker')
+
+
+# Async read views (kanban_app.api.async_views)
+# Comma separated route names (boards, board-details, tasks-assigned-to-me,
+# tasks-reviewing-to-me, comments, email-check) or "all" whose GET requests are served
+# by async-native views. Only useful under ASGI (uvicorn core.asgi:application).
+
+ASYNC_READ_ROUTES = [name.strip() for name in os.environ.get('ASYNC_READ_ROUTES', '').split(',') if name.strip()]
+
+
+# Token authentication
+# Tokens are cached in each process for AUTH_TOKEN_CACHE_TTL seconds (at most
+# AUTH_TOKEN_CACHE_SIZE of them). AUTH_TOKEN_EXPIRY (seconds) limits a token's
+# lifetime; expired tokens are rejected and replaced on the next login.
+
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000))
+AUTH_TOKEN_EXPIRY = int(os.environ['AUTH_TOKEN_EXPIRY']) if os.environ.get('AUTH_TOKEN_EXPIRY') else None
+
+
+# Performance instrumentation (core.middleware.PerformanceMiddleware)
+# Set PERF_INSTRUMENTATION=1 to add Server-Timing headers, log requests slower than
+# PERF_SLOW_REQUEST_MS with their PERF_SLOW_QUERY_TOP slowest queries, and write
+# per-route histograms to PERF_STATS_DIR (read them with `manage.py dump_perf_stats`).
+
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+PERF_SLOW_REQUEST_MS = float(os.environ.get('PERF_SLOW_REQUEST_MS', 500))
+PERF_SLOW_QUERY_TOP = int(os.environ.get('PERF_SLOW_QUERY_TOP', 5))
+PERF_STATS_DIR = os.environ.get('PERF_STATS_DIR', str(BASE_DIR / 'perf_stats'))
+PERF_STATS_FLUSH_SECONDS = float(os.environ.get('PERF_STATS_FLUSH_SECONDS', 10))
+
+
+# Metrics (/api/metrics/, Prometheus text format)
+# Each process writes its samples to a memory-mapped file in METRICS_DIR and the
+# endpoint sums all files, so the directory must be shared by all workers of the
+# service and should be emptied when it starts. Off unless METRICS_ENABLED is set.
+# With METRICS_TOKEN set, scrapers have to send `Authorization: Bearer <token>`;
+# without one only logged-in staff users may read the endpoint.
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0').lower() in ('1', 'true', 'yes')
+METRICS_DIR = os.environ.get('METRICS_DIR', str(BASE_DIR / 'metrics'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
 
 
 # Password validation
@@ -141,14 +298,23 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# JSON responses are written by orjson when it is installed (same bytes as DRF's
+# JSONRenderer, see kanban_app.api.renderers); FAST_JSON_RENDERER=0 uses DRF's renderer.
+FAST_JSON_RENDERER = os.environ.get('FAST_JSON_RENDERER', '1').lower() in ('1', 'true', 'yes')
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'kanban_app.api.renderers.OrjsonRenderer' if FAST_JSON_RENDERER else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'auth_app.api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ]
-}
\ No newline at end of file
+}
+
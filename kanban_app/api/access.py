@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db_routers import use_primary
+from core.metrics import record_cache_lookup
+
+from .models import Board
+
+# Seconds a user's accessible boards or a board's users stay cached.
+# Membership changes invalidate the entries right away; the timeout only bounds
+# staleness after writes that bypass the ORM signals. Misses are always resolved
+# on the primary, so permissions never lag behind a replica.
+ACCESS_CACHE_TIMEOUT = getattr(settings, 'BOARD_ACCESS_CACHE_TIMEOUT', 30)
+
+
+def _user_key(user_id):
+    return f'kanban:access:user:{user_id}'
+
+
+def _board_key(board_id):
+    return f'kanban:access:board:{board_id}'
+
+
+def accessible_board_ids(request):
+    """
+    Return the ids of all boards the requesting user owns or is a member of.
+    Resolved with one query, then memoized on the request and in the cache,
+    so every permission check of a request (and of the following requests) shares it.
+    """
+    board_ids = getattr(request, '_accessible_board_ids', None)
+    if board_ids is None:
+        user = request.user
+        key = _user_key(user.pk)
+        board_ids = cache.get(key)
+        record_cache_lookup('board_access', board_ids is not None)
+        if board_ids is None:
+            with use_primary():
+                board_ids = frozenset(Board.objects.accessible_to(user).values_list('pk', flat=True))
+            cache.set(key, board_ids, ACCESS_CACHE_TIMEOUT)
+        request._accessible_board_ids = board_ids
+    return board_ids
+
+
+def can_access_board(request, board_id):
+    return board_id in accessible_board_ids(request)
+
+
+async def aaccessible_board_ids(request):
+    """Async variant of accessible_board_ids for the async views, sharing its cache entries."""
+    board_ids = getattr(request, '_accessible_board_ids', None)
+    if board_ids is None:
+        user = request.user
+        key = _user_key(user.pk)
+        board_ids = await cache.aget(key)
+        record_cache_lookup('board_access', board_ids is not None)
+        if board_ids is None:
+            with use_primary():
+                board_ids = frozenset([pk async for pk in Board.objects.accessible_to(user).values_list('pk', flat=True)])
+            await cache.aset(key, board_ids, ACCESS_CACHE_TIMEOUT)
+        request._accessible_board_ids = board_ids
+    return board_ids
+
+
+async def acan_access_board(request, board_id):
+    return board_id in await aaccessible_board_ids(request)
+
+
+def board_user_ids(board_id):
+    """Return the ids of the owner and all members of a board, with one query on a cache miss."""
+    key = _board_key(board_id)
+    user_ids = cache.get(key)
+    record_cache_lookup('board_users', user_ids is not None)
+    if user_ids is None:
+        owner = Board.objects.filter(pk=board_id).values_list('owner_id', flat=True)
+        members = Board.members.through.objects.filter(board_id=board_id).values_list('user_id', flat=True)
+        with use_primary():
+            user_ids = frozenset(owner.union(members))
+        cache.set(key, user_ids, ACCESS_CACHE_TIMEOUT)
+    return user_ids
+
+
+def board_user_ids_many(board_ids):
+    """Bulk variant of board_user_ids: returns {board_id: user ids} for the boards that exist,
+    with at most two queries for all cache misses together."""
+    keys = {_board_key(board_id): board_id for board_id in set(board_ids)}
+    found = {keys[key]: user_ids for key, user_ids in cache.get_many(keys).items()}
+    missing = [board_id for board_id in keys.values() if board_id not in found]
+    if found:
+        record_cache_lookup('board_users', True, len(found))
+    if missing:
+        record_cache_lookup('board_users', False, len(missing))
+        with use_primary():
+            resolved = {
+                board_id: {owner_id}
+                for board_id, owner_id in Board.objects.filter(pk__in=missing).values_list('pk', 'owner_id')
+            }
+            members = Board.members.through.objects.filter(board_id__in=resolved).values_list('board_id', 'user_id')
+            for board_id, user_id in members:
+                resolved[board_id].add(user_id)
+        resolved = {board_id: frozenset(user_ids) for board_id, user_ids in resolved.items()}
+        cache.set_many({_board_key(board_id): user_ids for board_id, user_ids in resolved.items()}, ACCESS_CACHE_TIMEOUT)
+        found.update(resolved)
+    return found
+
+
+def invalidate_access_on_commit(user_ids=(), board_ids=()):
+    """Forget cached access after the membership change commits, so a concurrent
+    request cannot cache the state from before the change."""
+    keys = [_user_key(user_id) for user_id in user_ids] + [_board_key(board_id) for board_id in board_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,256 @@
+"""
+Async-native implementations of the read endpoints.
+
+Under ASGI, Django runs a synchronous view through sync_to_async: the whole request,
+serialization included, is handed to the single thread all sync code shares. These
+views stay on the event loop and only leave it for their queries (Django's async ORM),
+cache lookups on a miss and building the cached board payload. They answer GET and
+HEAD with the same JSON, status codes, validators and keyset pagination as the DRF
+views; every other method of a route stays with the DRF view (see with_async_reads).
+Which routes use them is chosen with ASYNC_READ_ROUTES; under WSGI they only add an
+event loop per request, so leave it empty there.
+"""
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.functions import Lower
+from django.http import HttpResponse, HttpResponseBase, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from auth_app.api.authentication import CachedTokenAuthentication
+
+from .access import acan_access_board
+from .cache import get_board_payload
+from .conditional import ConditionalGetMixin, last_modified_timestamp
+from .models import Board, Comment, Task, User
+from .pagination import BoardPagination, CommentPagination, TaskPagination
+from .payloads import (
+    BOARD_LIST_COLUMNS,
+    COMMENT_COLUMNS,
+    TASK_COLUMNS,
+    ajson_array_chunks,
+    board_detail_payload,
+    board_list_row,
+    comment_row,
+    task_row,
+    wants_stream,
+)
+from .serializers import EmailQuerySerializer, UserShortSerializer
+
+
+class AsyncReadView(View):
+    """
+    Base of the async read views, mirroring what DRF's APIView does for them: token
+    authentication, IsAuthenticated, error bodies of the form {"detail": ...} and JSON rendering.
+    Subclasses implement `async def get()` and may extend initial() with checks that
+    DRF runs before authentication.
+    """
+    http_method_names = ['get', 'head', 'options']
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.initial(request, *args, **kwargs)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+
+    async def initial(self, request, *args, **kwargs):
+        """The user forced by DRF's test client wins, as in rest_framework.request.Request."""
+        user = getattr(request, '_force_auth_user', None)
+        if user is None:
+            authenticated = await CachedTokenAuthentication().aauthenticate(request)
+            if authenticated is None:
+                raise exceptions.NotAuthenticated()
+            user = authenticated[0]
+        """Set like DRF does, so read routing and logging see the authenticated user."""
+        request.user = user
+
+    def render(self, data, status=200):
+        """Like a DRF Response, the rendered response keeps its data (read by tests and middleware)."""
+        response = HttpResponse(self.renderer.render(data), content_type='application/json', status=status)
+        response.data = data
+        return response
+
+    def error_response(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.render(data, status=exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = 401
+            response['WWW-Authenticate'] = CachedTokenAuthentication.keyword
+        return response
+
+    async def conditional(self, request, last_modified, count, build, monotonic=False):
+        """ConditionalGetMixin.get() for async views: 304 for a matching validator, otherwise
+        the awaited build() (data to render, or a response) with ETag, and Last-Modified
+        if `monotonic` (see ConditionalGetMixin.monotonic_last_modified)."""
+        etag = ConditionalGetMixin.make_etag(request, last_modified, count)
+        timestamp = last_modified_timestamp(last_modified, monotonic)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            result = await build()
+            response = result if isinstance(result, HttpResponseBase) else self.render(result)
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AsyncListView(AsyncReadView, ABC):
+    """A conditional, optionally keyset-paginated list over get_queryset(), serialized by
+    serializer_class or, like payloads.RowListMixin, read as `row_columns` and mapped by
+    `row_mapper`; then ?stream=1 streams it through an async iterator.
+    Subclasses implement get_queryset() and set pagination_class."""
+    serializer_class = None
+    pagination_class = None
+    row_columns = ()
+    row_mapper = None
+
+    @abstractmethod
+    def get_queryset(self):
+        """The listed rows of the current request, before ordering and pagination."""
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        state = await queryset.order_by().aaggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        return await self.conditional(request, state['last_modified'], state['count'], lambda: self.build(queryset))
+
+    async def build(self, queryset):
+        if self.row_mapper is not None:
+            queryset = queryset.values_list(*self.row_columns, named=True)
+            if wants_stream(self.request):
+                chunks = ajson_array_chunks(queryset, self.row_mapper, self.renderer)
+                return StreamingHttpResponse(chunks, content_type='application/json')
+        paginator = self.pagination_class()
+        rows = await paginator.apaginate_queryset(queryset, Request(self.request))
+        if rows is None:
+            return self.serialize([row async for row in queryset])
+        return {'next': paginator.get_next_link(), 'results': self.serialize(rows)}
+
+    def serialize(self, rows):
+        if self.row_mapper is not None:
+            return [self.row_mapper(row) for row in rows]
+        return self.serializer_class(rows, many=True).data
+
+
+class AsyncBoardListView(AsyncListView):
+    """GET of BoardListCreateView."""
+    pagination_class = BoardPagination
+    row_columns = BOARD_LIST_COLUMNS
+    row_mapper = staticmethod(board_list_row)
+
+    def get_queryset(self):
+        return Board.objects.accessible_to(self.request.user)
+
+
+class AsyncBoardDetailView(AsyncReadView):
+    """GET of BoardSingleView; a missing cached payload is built in one worker thread hop."""
+
+    async def get(self, request, pk):
+        board = await Board.objects.filter(pk=pk).afirst()
+        if board is None:
+            raise exceptions.NotFound('No Board matches the given query.')
+        if not await acan_access_board(request, board.pk):
+            raise exceptions.PermissionDenied()
+        return await self.conditional(
+            request, board.updated_at, 1,
+            lambda: sync_to_async(get_board_payload)(board.pk, lambda: board_detail_payload(board.pk)),
+            monotonic=True,
+        )
+
+
+class AsyncTaskAssigneeView(AsyncListView):
+    """GET of TaskAssigneeView."""
+    pagination_class = TaskPagination
+    row_columns = TASK_COLUMNS
+    row_mapper = staticmethod(task_row)
+    user_field = 'assignee'
+
+    def get_queryset(self):
+        return Task.objects.filter(**{self.user_field: self.request.user})
+
+
+class AsyncTaskReviewerView(AsyncTaskAssigneeView):
+    """GET of TaskReviewerView."""
+    user_field = 'reviewer'
+
+
+class AsyncCommentListView(AsyncListView):
+    """GET of CommentListCreateAPIView. Like there, the task is looked up before authentication."""
+    pagination_class = CommentPagination
+    row_columns = COMMENT_COLUMNS
+    row_mapper = staticmethod(comment_row)
+
+    async def initial(self, request, *args, **kwargs):
+        self.task = await Task.objects.filter(pk=kwargs['task_pk']).afirst()
+        if self.task is None:
+            raise exceptions.NotFound('Task not found.')
+        await super().initial(request, *args, **kwargs)
+        if not await acan_access_board(request, self.task.board_id):
+            raise exceptions.PermissionDenied()
+
+    def get_queryset(self):
+        return Comment.objects.filter(task=self.task)
+
+
+class AsyncEmailCheckView(AsyncReadView):
+    """GET of EmailCheckAPIView."""
+
+    async def get(self, request):
+        query = EmailQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            raise exceptions.ValidationError(query.errors)
+        email = query.validated_data['email']
+        try:
+            user = await (
+                User.objects
+                .alias(email_lower=Lower('email'))
+                .select_related('userprofile')
+                .aget(email_lower=email.lower())
+            )
+        except User.DoesNotExist:
+            raise exceptions.NotFound('A user with this email does not exist.')
+        return self.render(UserShortSerializer(user).data)
+
+
+# Route names that have an async read view, with that view.
+ASYNC_READ_VIEWS = {
+    'boards': AsyncBoardListView,
+    'board-details': AsyncBoardDetailView,
+    'tasks-assigned-to-me': AsyncTaskAssigneeView,
+    'tasks-reviewing-to-me': AsyncTaskReviewerView,
+    'comments': AsyncCommentListView,
+    'email-check': AsyncEmailCheckView,
+}
+
+
+def selected_async_routes(selection=None):
+    """The route names ASYNC_READ_ROUTES (or `selection`) enables; 'all' selects every one."""
+    selection = settings.ASYNC_READ_ROUTES if selection is None else selection
+    return set(ASYNC_READ_VIEWS) if 'all' in selection else set(selection) & set(ASYNC_READ_VIEWS)
+
+
+def with_async_reads(sync_view, async_view):
+    """
+    Combine a DRF view with its async read counterpart: GET and HEAD go to the async
+    view, all other methods to the DRF view in the sync thread, as Django would run it.
+    The DRF view class stays the view_class, so metrics and read routing see one view.
+    """
+    sync_handler = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_handler(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    view.view_class = sync_view.view_class
+    return view
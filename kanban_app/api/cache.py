@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db_routers import use_primary
+from core.metrics import record_cache_lookup
+
+# How long a serialized board payload may stay in the cache, in seconds.
+BOARD_CACHE_TIMEOUT = getattr(settings, 'BOARD_CACHE_TIMEOUT', 300)
+
+
+def _version_key(board_id):
+    return f'kanban:board:{board_id}:version'
+
+
+def _payload_key(board_id, version):
+    return f'kanban:board:{board_id}:payload:{version}'
+
+
+def board_version(board_id):
+    """Return the current version counter of a board.
+    A missing counter (first use or evicted) is seeded with the current time, so it
+    can never collide with a version an older cached payload was stored under."""
+    key = _version_key(board_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_board_version(board_id):
+    """Invalidate every cached payload of the board by moving its version forward."""
+    key = _version_key(board_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_board_version_on_commit(board_id):
+    """Bump the version once the current transaction commits, so no reader can cache
+    data from before the write under the new version."""
+    transaction.on_commit(lambda: bump_board_version(board_id))
+
+
+def get_board_payload(board_id, build):
+    """Return the cached serialized payload of a board, calling build() on a miss.
+    The payload is built from the primary, so a lagging replica never gets cached."""
+    key = _payload_key(board_id, board_version(board_id))
+    payload = cache.get(key)
+    record_cache_lookup('board_payload', payload is not None)
+    if payload is None:
+        with use_primary():
+            payload = build()
+        cache.set(key, payload, BOARD_CACHE_TIMEOUT)
+    return payload
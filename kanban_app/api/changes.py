@@ -0,0 +1,83 @@
+from django.db.models import Max
+
+from .events import publish_on_commit
+from .models import BoardChange
+
+# Upper bound of log entries a single delta response covers.
+MAX_CHANGES_PER_RESPONSE = 1000
+
+
+def change_message(cursor, kind, object_id, action):
+    """The event stream message announcing one log entry."""
+    return {'cursor': cursor, 'kind': kind, 'object_id': object_id, 'action': action}
+
+
+def record_changes(board_id, kind, object_ids, action='upsert'):
+    """Append one log entry per object to the change log of a board
+    and announce them to event stream subscribers once committed."""
+    if board_id and object_ids:
+        entries = BoardChange.objects.bulk_create([
+            BoardChange(board_id=board_id, kind=kind, object_id=object_id, action=action)
+            for object_id in object_ids
+        ])
+        for entry in entries:
+            publish_on_commit(board_id, change_message(entry.pk, kind, entry.object_id, action))
+
+
+def record_change(board_id, kind, object_id, action='upsert'):
+    record_changes(board_id, kind, [object_id], action)
+
+
+def latest_cursor(board_id):
+    return BoardChange.objects.filter(board_id=board_id).aggregate(cursor=Max('pk'))['cursor'] or 0
+
+
+def missed_changes(board_id, since, limit=MAX_CHANGES_PER_RESPONSE):
+    """The messages of the log entries after `since`, oldest first, for a resuming event
+    stream. Returns None when there are more than `limit` of them."""
+    entries = list(
+        BoardChange.objects.filter(board_id=board_id, pk__gt=since)
+        .order_by('pk')
+        .values_list('pk', 'kind', 'object_id', 'action')[:limit + 1]
+    )
+    if len(entries) > limit:
+        return None
+    return [change_message(*entry) for entry in entries]
+
+
+def collect_changes(board_id, since, limit=MAX_CHANGES_PER_RESPONSE):
+    """Read the log entries after `since` and collapse them to the latest action per object.
+    Returns (cursor, has_more, {kind: {object_id: action}})."""
+    entries = list(
+        BoardChange.objects.filter(board_id=board_id, pk__gt=since)
+        .order_by('pk')
+        .values_list('pk', 'kind', 'object_id', 'action')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {kind: {} for kind, _ in BoardChange.KIND_CHOICES}
+    for _, kind, object_id, action in entries:
+        latest[kind][object_id] = action
+    cursor = entries[-1][0] if entries else since
+    return cursor, has_more, latest
+
+
+def compact_changes(board_ids):
+    """Delete log entries superseded by a later entry for the same object.
+    A client resuming from any cursor still sees the latest action of every object
+    changed after it, so compaction never changes what a delta response contains.
+    Returns the number of deleted entries."""
+    keep = (
+        BoardChange.objects.filter(board_id__in=board_ids)
+        .order_by()
+        .values('board_id', 'kind', 'object_id')
+        .annotate(latest=Max('pk'))
+        .values('latest')
+    )
+    deleted, _ = (
+        BoardChange.objects.filter(board_id__in=board_ids)
+        .exclude(pk__in=keep)
+        .delete()
+    )
+    return deleted
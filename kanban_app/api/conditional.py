@@ -0,0 +1,56 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def last_modified_timestamp(last_modified, monotonic):
+    """The Last-Modified timestamp to validate against and send, None for non-monotonic state."""
+    return int(last_modified.timestamp()) if last_modified and monotonic else None
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET requests with ETag / Last-Modified validators and 304 Not Modified.
+    The validators come from a cheap aggregate (latest updated_at plus row count),
+    so an unchanged resource is answered without serializing anything.
+    Views either rely on the default aggregate over their queryset or override
+    get_validator_state().
+    Last-Modified is only sent (and If-Modified-Since only honoured) by views whose
+    timestamp never goes backwards. For a list, the latest updated_at drops when its
+    newest row is deleted or leaves the list, and a client revalidating by date alone
+    would get a stale 304; the ETag covers that through the row count.
+    """
+    monotonic_last_modified = False
+
+    def get_validator_state(self):
+        """Return (last_modified, count) for the rows this GET would return."""
+        state = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk'),
+        )
+        return state['last_modified'], state['count']
+
+    def get(self, request, *args, **kwargs):
+        last_modified, count = self.get_validator_state()
+        etag = self.make_etag(request, last_modified, count)
+        timestamp = last_modified_timestamp(last_modified, self.monotonic_last_modified)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        """Clients may keep the body but have to revalidate before reusing it."""
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @staticmethod
+    def make_etag(request, last_modified, count):
+        """The URL (including pagination parameters) and user are part of the tag,
+        so different pages or users never share a validator."""
+        raw = f"{request.get_full_path()}|{request.user.pk}|{last_modified and last_modified.isoformat()}|{count}"
+        return f'"{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"'
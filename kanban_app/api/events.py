@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Messages a slow subscriber may have pending before the oldest ones are dropped.
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    """A subscriber's inbox. Messages are delivered on the event loop the subscriber runs on."""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def __aenter__(self):
+        self.broker.add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.discard(self)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def deliver(self, message):
+        """Called from any thread; hands the message over to the subscriber's loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            """The loop is closed, the subscriber is gone."""
+            self.broker.discard(self)
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class InMemoryBroker:
+    """
+    Publish/subscribe broker fanning messages out to subscribers of the same process.
+    Enough for a single ASGI worker and for tests; deployments with several workers
+    point KANBAN_EVENT_BROKER at a broker class with the same publish()/subscribe()
+    interface backed by a shared service.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Use as `async with broker.subscribe(channel) as subscription:`."""
+        return Subscription(self, channel)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def add(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.channel].add(subscription)
+
+    def discard(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Return the process-wide broker configured by KANBAN_EVENT_BROKER."""
+    path = getattr(settings, 'KANBAN_EVENT_BROKER', 'kanban_app.api.events.InMemoryBroker')
+    return import_string(path)()
+
+
+def board_channel(board_id):
+    return f'board:{board_id}'
+
+
+def publish_on_commit(board_id, message):
+    """Publish once the transaction commits, so subscribers never see rolled back changes."""
+    transaction.on_commit(lambda: get_broker().publish(board_channel(board_id), message))
@@ -1,11 +1,22 @@
 import datetime
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
 """Dynamically get the User model defined in the project settings."""
 User = get_user_model()
 
+class BoardQuerySet(models.QuerySet):
+    """Custom QuerySet with reusable board filters."""
+
+    def accessible_to(self, user):
+        """Return boards the user owns or is a member of.
+        Membership is resolved through a subquery on the members through table
+        instead of a join, so a board is never returned twice."""
+        member_of = Board.members.through.objects.filter(user=user).values('board_id')
+        return self.filter(Q(owner=user) | Q(pk__in=member_of))
+
 class Board(models.Model):
     """Represents a board entity, such as a project or workspace."""
 
@@ -22,6 +33,12 @@ class Board(models.Model):
     The related_name 'members' allows reverse querying: user.members."""
     members = models.ManyToManyField(User, related_name='members')
 
+    """Timestamp of the last change to the board or anything shown on it.
+    Set on save and touched by the signal handlers when tasks, comments or members change."""
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BoardQuerySet.as_manager()
+
     def __str__(self):
         """Returns the title of the board when converted to a string,
         useful for admin display and debugging."""
@@ -76,6 +93,24 @@ class Task(models.Model):
     """The related_name 'reviewer' allows reverse lookup: user.reviewer."""
     reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="reviewed_tasks")
 
+    """Number of comments on the task, kept up to date with atomic F() updates by the
+    comment_saved and comment_deleted signal handlers in signals.py, so ORM writes
+    outside the API keep it right as well (see reconcile_comment_counts for repairing drift)."""
+    comments_count = models.PositiveIntegerField(default=0)
+
+    """Timestamp of the last change to the task, its comment count or its users."""
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Composite indexes for the board dashboards (per status and per priority)
+        and the personal task lists, which are ordered by due date."""
+        indexes = [
+            models.Index(fields=['board', 'status'], name='task_board_status_idx'),
+            models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+            models.Index(fields=['assignee', 'due_date'], name='task_assignee_due_idx'),
+            models.Index(fields=['reviewer', 'due_date'], name='task_reviewer_due_idx'),
+        ]
+
     def __str__(self):
         """Returns the task title as the string representation."""
         return self.title
@@ -98,6 +133,86 @@ class Comment(models.Model):
     """Related name 'comments' enables reverse lookup: task.comments."""
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
 
+    """Timestamp of the last change to the comment or its author's profile."""
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Comments are listed per task, newest first."""
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='comment_task_created_idx'),
+        ]
+
     def __str__(self):
         """Returns the content of the comment as its string representation."""
-        return self.content
\ No newline at end of file
+        return self.content
+
+class BoardStats(models.Model):
+    """Materialized dashboard counters of a board.
+    The row is created and kept up to date by the model signal handlers with atomic
+    F() increments (bulk writers move it themselves), so listing boards never has to
+    count members or tasks."""
+
+    """The board these counters belong to, doubling as the primary key.
+    The related_name 'stats' allows reverse lookup: board.stats."""
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    """Number of members of the board."""
+    member_count = models.PositiveIntegerField(default=0)
+
+    """Number of tasks on the board."""
+    ticket_count = models.PositiveIntegerField(default=0)
+
+    """Number of tasks per status."""
+    to_do_count = models.PositiveIntegerField(default=0)
+    in_progress_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    done_count = models.PositiveIntegerField(default=0)
+
+    """Number of tasks per priority."""
+    low_priority_count = models.PositiveIntegerField(default=0)
+    medium_priority_count = models.PositiveIntegerField(default=0)
+    high_priority_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """Returns a label naming the related board."""
+        return f"Stats for {self.board}"
+
+class BoardChange(models.Model):
+    """One entry of the per-board change log read by the delta sync endpoint.
+    The auto-incrementing id doubles as the change cursor clients resume from."""
+
+    """Kinds of objects whose changes are logged."""
+    KIND_CHOICES = [
+        ('board', 'Board'),
+        ('task', 'Task'),
+        ('comment', 'Comment'),
+        ('member', 'Member'),
+    ]
+
+    """An upsert means the object was created or changed, a delete leaves a tombstone."""
+    ACTION_CHOICES = [
+        ('upsert', 'Upsert'),
+        ('delete', 'Delete'),
+    ]
+
+    """The board the change happened on; the log is removed together with the board."""
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='changes')
+
+    """Kind and primary key of the changed object (a user id for member changes)."""
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+
+    """Whether the object was created/changed or deleted."""
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+
+    """Timestamp of when the change was recorded."""
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'id'], name='boardchange_board_cursor_idx'),
+        ]
+
+    def __str__(self):
+        """Returns a short description such as 'task 12 delete'."""
+        return f"{self.kind} {self.object_id} {self.action}"
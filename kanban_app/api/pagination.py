@@ -0,0 +1,136 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination.
+    Pagination only kicks in when the client sends ?limit= or ?cursor=, so existing
+    clients keep receiving plain lists. Each page is fetched with a
+    WHERE (a, b) > (last_a, last_b) condition on the ordering columns instead of an
+    OFFSET, so deep pages cost the same as the first one.
+    Subclasses set `ordering` to unique, non-null columns (ending in the primary key).
+    A cursor that cannot be decoded answers 400.
+    """
+    ordering = ('id',)
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    default_limit = 50
+    max_limit = 500
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_queryset(queryset, request)
+        return None if page is None else self.take_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Async variant of paginate_queryset for the async views."""
+        page = self.page_queryset(queryset, request)
+        return None if page is None else self.take_page([row async for row in page])
+
+    def page_queryset(self, queryset, request):
+        """Return the queryset of the requested page, or None without pagination parameters."""
+        params = request.query_params
+        if self.limit_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        """Fetch one extra row to find out whether a next page exists."""
+        return queryset[:self.limit + 1]
+
+    def take_page(self, rows):
+        self.next_position = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.next_position = [getattr(rows[-1], self.field_name(name)) for name in self.ordering]
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    @staticmethod
+    def field_name(name):
+        return name.lstrip('-')
+
+    def after(self, position):
+        """Build the keyset condition selecting rows strictly after `position`:
+        (a > x) OR (a = x AND b > y) OR ..., flipping the comparison for descending columns."""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field = self.field_name(name)
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def encode_cursor(self, position):
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in position])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(self.field_name(name)).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+
+class BoardPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class TaskPagination(KeysetPagination):
+    ordering = ('due_date', 'id')
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
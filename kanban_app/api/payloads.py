@@ -0,0 +1,199 @@
+"""
+Flattened, read-only serialization of the board detail payload and the board, task
+and comment lists, plus the streamed form of those lists (?stream=1).
+
+The serializers build their output field by field: for every row DRF instantiates
+model objects (with every column of the joined users, password hashes included),
+walks nested serializers and calls one field object per column. On large boards and
+lists that dominates the request. The functions here read only the emitted columns
+as tuples with values_list() and map each row straight to its output dict, in the key
+order and with the types the serializers produce, so the rendered JSON is identical
+(checked by the tests, benchmark_board_payload and benchmark_list_memory). A field
+added to UserShortSerializer, TaskShortBoardSerializer, BoardSingleSerializer,
+BoardListSerializer, TaskSerializer or CommentSerializer has to be added here as well.
+"""
+import itertools
+
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models import Board, Task, User
+
+USER_SHORT_COLUMNS = ('id', 'email', 'userprofile__fullname')
+
+TASK_SHORT_BOARD_COLUMNS = (
+    'id', 'title', 'description', 'status', 'priority', 'assignee_id',
+    'reviewer_id', 'reviewer__email', 'reviewer__userprofile__fullname',
+    'due_date', 'comments_count',
+)
+
+
+def user_short(pk, email, fullname):
+    """UserShortSerializer; a user without profile has an empty full name."""
+    return {'id': pk, 'email': email, 'fullname': fullname or ''}
+
+
+def task_short_board(row):
+    """TaskShortBoardSerializer for a row of TASK_SHORT_BOARD_COLUMNS."""
+    (pk, title, description, status, priority, assignee_id,
+     reviewer_id, reviewer_email, reviewer_fullname, due_date, comments_count) = row
+    return {
+        'id': pk,
+        'title': title,
+        'description': description,
+        'status': status,
+        'priority': priority,
+        'assignee': assignee_id,
+        'reviewer': None if reviewer_id is None else user_short(reviewer_id, reviewer_email, reviewer_fullname),
+        'due_date': due_date.isoformat(),
+        'comments_count': comments_count,
+    }
+
+
+def board_detail_payload(board_id):
+    """BoardSingleSerializer for the board, with members and tasks in primary key order
+    like BoardSingleView.get_detail_queryset(). Three queries, whatever the board size."""
+    board = Board.objects.values_list('id', 'title', 'owner_id').get(pk=board_id)
+    members = User.objects.filter(members=board_id).order_by('pk').values_list(*USER_SHORT_COLUMNS)
+    tasks = Task.objects.filter(board_id=board_id).order_by('pk').values_list(*TASK_SHORT_BOARD_COLUMNS)
+    return {
+        'id': board[0],
+        'title': board[1],
+        'owner_id': board[2],
+        'members': [user_short(*member) for member in members],
+        'tasks': [task_short_board(task) for task in tasks],
+    }
+
+
+BOARD_LIST_COLUMNS = (
+    'id', 'title', 'stats__member_count', 'stats__ticket_count',
+    'stats__to_do_count', 'stats__high_priority_count', 'owner_id',
+)
+
+TASK_COLUMNS = (
+    'id', 'board_id', 'title', 'description', 'status', 'priority',
+    'assignee_id', 'assignee__email', 'assignee__userprofile__fullname',
+    'reviewer_id', 'reviewer__email', 'reviewer__userprofile__fullname',
+    'due_date', 'comments_count',
+)
+
+COMMENT_COLUMNS = ('id', 'created_at', 'author__username', 'author__userprofile__fullname', 'content')
+
+# Renders created_at exactly like CommentSerializer (time zone and 'Z' suffix included).
+datetime_field = serializers.DateTimeField()
+
+
+def board_list_row(row):
+    """BoardListSerializer for a row of BOARD_LIST_COLUMNS; a board without stats row has null counters."""
+    pk, title, member_count, ticket_count, to_do_count, high_priority_count, owner_id = row
+    return {
+        'id': pk,
+        'title': title,
+        'member_count': member_count,
+        'ticket_count': ticket_count,
+        'tasks_to_do_count': to_do_count,
+        'tasks_high_prio_count': high_priority_count,
+        'owner_id': owner_id,
+    }
+
+
+def task_row(row):
+    """TaskSerializer for a row of TASK_COLUMNS."""
+    (pk, board_id, title, description, status, priority,
+     assignee_id, assignee_email, assignee_fullname,
+     reviewer_id, reviewer_email, reviewer_fullname, due_date, comments_count) = row
+    return {
+        'id': pk,
+        'board': board_id,
+        'title': title,
+        'description': description,
+        'status': status,
+        'priority': priority,
+        'assignee': user_short(assignee_id, assignee_email, assignee_fullname),
+        'reviewer': None if reviewer_id is None else user_short(reviewer_id, reviewer_email, reviewer_fullname),
+        'due_date': due_date.isoformat(),
+        'comments_count': comments_count,
+    }
+
+
+def comment_row(row):
+    """CommentSerializer for a row of COMMENT_COLUMNS; the author is shown by full name, else username."""
+    pk, created_at, username, fullname, content = row
+    return {
+        'id': pk,
+        'created_at': datetime_field.to_representation(created_at),
+        'author': fullname or username,
+        'content': content,
+    }
+
+
+# Rows a streamed list fetches per database round trip (server-side cursor on PostgreSQL).
+STREAM_FETCH_SIZE = 2000
+
+# Rows rendered into one chunk of a streamed list.
+STREAM_CHUNK_ROWS = 500
+
+
+def wants_stream(request):
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def array_chunk(batch, renderer, first):
+    """The rendered JSON of a batch of items without its brackets, opening the array or continuing it."""
+    return (b'[' if first else b',') + renderer.render(batch)[1:-1]
+
+
+def json_array_chunks(rows, mapper, renderer):
+    """
+    Yield the JSON array of mapper(row) for all rows, STREAM_CHUNK_ROWS at a time.
+    Compact JSON concatenates, so the chunks join to exactly the bytes rendering the
+    whole list at once gives, while only one batch of rows is ever held in memory.
+    """
+    iterator = rows.iterator(chunk_size=STREAM_FETCH_SIZE)
+    first = True
+    while batch := [mapper(row) for row in itertools.islice(iterator, STREAM_CHUNK_ROWS)]:
+        yield array_chunk(batch, renderer, first)
+        first = False
+    yield b'[]' if first else b']'
+
+
+async def ajson_array_chunks(rows, mapper, renderer):
+    """json_array_chunks() for async views, reading the rows with the async iterator."""
+    batch, first = [], True
+    async for row in rows.aiterator(chunk_size=STREAM_FETCH_SIZE):
+        batch.append(mapper(row))
+        if len(batch) == STREAM_CHUNK_ROWS:
+            yield array_chunk(batch, renderer, first)
+            batch, first = [], False
+    if batch:
+        yield array_chunk(batch, renderer, first)
+        first = False
+    yield b'[]' if first else b']'
+
+
+class RowListMixin:
+    """
+    list() for ListAPIView subclasses: the (paginated) queryset is read as named
+    `row_columns` tuples and every row is mapped by `row_mapper` instead of going
+    through serializer_class, which remains the serializer for writes.
+    With ?stream=1 the whole list is streamed instead (pagination parameters are
+    ignored): the rows are read with a server-side iterator and sent as they are
+    rendered, so memory stays flat and the first bytes leave before the last row is read.
+    Under ASGI Django buffers sync streams; there the async read views stream.
+    """
+    row_columns = ()
+    row_mapper = None
+
+    def get_rows(self):
+        return self.filter_queryset(self.get_queryset()).values_list(*self.row_columns, named=True)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_rows()
+        if wants_stream(request):
+            chunks = json_array_chunks(rows, self.row_mapper, self.get_renderers()[0])
+            return StreamingHttpResponse(chunks, content_type='application/json')
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([self.row_mapper(row) for row in page])
+        return Response([self.row_mapper(row) for row in rows])
@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.exceptions import NotFound
+from .access import can_access_board
 from .models import Board, Task
 
 class IsOwnerOrMember(BasePermission):
@@ -13,11 +14,17 @@ class IsOwnerOrMember(BasePermission):
             return False
 
         try:
-            board = Board.objects.get(pk=board_id)
-        except Board.DoesNotExist:
+            board_id = int(board_id)
+        except (TypeError, ValueError):
             raise NotFound("Board does not exist.")
 
-        return request.user == board.owner or board.members.filter(pk=request.user.pk).exists()
+        if can_access_board(request, board_id):
+            return True
+
+        """Only a denied request needs to tell a missing board (404) from a foreign one (403)."""
+        if not Board.objects.filter(pk=board_id).exists():
+            raise NotFound("Board does not exist.")
+        return False
 
     
 class IsTaskAssigneeOrReviewer(BasePermission):
@@ -30,22 +37,20 @@ class IsOwner(BasePermission):
     """Permission to restrict access only to the owner of the object."""
     def has_object_permission(self, request, view, obj):
         """Return True if the requesting user is the owner."""
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
     
 class IsBoardMember(BasePermission):
     """
     Permission allowing only Board owners or members to create tasks.
     """
     def has_object_permission(self, request, view, obj):
-        board = obj.board
-        user = request.user
-        return user == board.owner or board.members.filter(pk=user.pk).exists()
+        return can_access_board(request, obj.board_id)
 
 class IsTaskAssigneeOrReviewerOrBoardOwnerForDelete(BasePermission):
     """
     Combined permission logic for Task objects:
     - For safe methods (GET) and updates (PUT, PATCH): allow if user is assignee or reviewer.
-    - For DELETE method: allow if user is assignee or the owner of the board to which the task belongs.
+    - For DELETE method: allow if user is assignee or the owner of the associated board.
     """
     def has_object_permission(self, request, view, obj):
         user = request.user
@@ -67,7 +72,7 @@ class IsBoardOwner(BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         """Return True only if the user is the owner of the board."""
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
     
 class IsCommentBoardMember(BasePermission):
     """
@@ -80,12 +85,7 @@ class IsCommentBoardMember(BasePermission):
         if not task:
             return False
 
-        board = task.board
-
-        return (
-            request.user == board.owner
-            or board.members.filter(id=request.user.id).exists()
-        )
+        return can_access_board(request, task.board_id)
     
 class IsCommentCreator(BasePermission):
     """Permission to allow only the creator (author) of a comment to access it."""
@@ -95,4 +95,4 @@ class IsCommentCreator(BasePermission):
     
 class BoardMemberForBoard(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.owner or request.user in obj.members.all()
\ No newline at end of file
+        return can_access_board(request, obj.pk)
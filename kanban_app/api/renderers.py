@@ -0,0 +1,41 @@
+"""
+JSON rendering through orjson, when it is installed.
+
+OrjsonRenderer writes the same bytes as DRF's JSONRenderer with the compact, unicode
+and strict defaults this project runs with, several times faster. Types whose JSON
+form DRF decides itself (dates and times) are handed to DRF's encoder. Whatever orjson
+refuses (integers above 64 bit, non-string keys) and indented output requested by the
+client are rendered by JSONRenderer itself. orjson writes floats in exponent notation
+without a plus sign (1e16 instead of 1e+16) and NaN as null; no endpoint returns floats.
+Without orjson, the renderer is JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Unlike json.dumps, orjson has no option to escape these; DRF escapes them for JavaScript.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class OrjsonRenderer(JSONRenderer):
+    """JSONRenderer output, written by orjson where it produces the same bytes."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None or not self.orjson_compatible(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for character, escaped in LINE_SEPARATORS:
+            rendered = rendered.replace(character, escaped)
+        return rendered
+
+    def orjson_compatible(self, accepted_media_type, renderer_context):
+        """orjson only writes compact, unescaped unicode JSON."""
+        if not (self.compact and self.ensure_ascii is False and self.strict):
+            return False
+        return self.get_indent(accepted_media_type or '', renderer_context or {}) is None
@@ -0,0 +1,321 @@
+"""
+Full-text search over task titles and descriptions and comment contents.
+
+SQLite: the FTS5 table kanban_search holds one row per task (rowid 2 * id) and per
+comment (rowid 2 * id + 1) with the title, the body text, the board as the token
+b<id> and the task id. Triggers on the task and comment tables keep it in sync, so
+queryset updates, imports through transfer.insert_rows and cascading deletes are
+covered as well (model signals would miss them). A search matches the board tokens of
+the accessible boards together with the terms, so FTS5 intersects both posting lists
+and never reads rows of other boards (for users with many boards the matches are
+filtered by board instead).
+PostgreSQL: stored generated tsvector columns on the task table (title weighted above
+description) and the comment table, each with a GIN index; the boards are filtered
+in the WHERE clause.
+
+Every term is matched as a prefix ("kan" finds "Kanban") and all terms must match.
+The newest MAX_CANDIDATES matches are ranked, by bm25 over title and body (SQLite) or
+ts_rank_cd (PostgreSQL). Titles and snippets come back HTML-escaped with the matches
+wrapped in <mark>. SQLite folds diacritics ("muller" finds "Müller"), PostgreSQL's
+'simple' configuration does not.
+
+Django rebuilds a SQLite table for some schema changes (e.g. altering a Task field),
+which drops the triggers: run `manage.py rebuild_search_index` after such migrations.
+"""
+import heapq
+import html
+import json
+import re
+
+from django.db import connections, router
+
+from .models import Task
+
+# Terms of a query that are used; words are runs of letters and digits, like the tokenizers split them.
+MAX_TERMS = 8
+MIN_TERM_LENGTH = 2
+WORD = re.compile(r'[^\W_]+')
+
+# Prefix lengths SQLite keeps an index for. FTS5 answers a prefix query of another
+# length by merging the posting lists of every word starting with it before anything
+# else, seconds for a frequent prefix in millions of rows; longer terms are therefore
+# matched by their first MAX_PREFIX_LENGTH characters. The prefix indexes roughly
+# triple the size of the search index.
+MAX_PREFIX_LENGTH = 8
+PREFIX_LENGTHS = ' '.join(str(length) for length in range(MIN_TERM_LENGTH, MAX_PREFIX_LENGTH + 1))
+
+# Matches ranked per search: the newest ones in the accessible boards. Ranking every
+# match of a term found in most rows costs far more than the budget of a search (bm25()
+# alone reads the term's whole posting list), so very frequent terms get the best of
+# their newest matches.
+MAX_CANDIDATES = 1000
+
+# Accessible boards up to which SQLite intersects the board tokens rather than filtering the matches.
+MAX_BOARD_TOKENS = 100
+
+# bm25 parameters of the SQLite ranking; a title match counts four times a body match.
+TITLE_WEIGHT = 4.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Placeholders for the highlight tags, replaced after the text has been escaped.
+MARK_START, MARK_END = '\ue000', '\ue001'
+
+# Words of a snippet, and how many of them come before the first match.
+SNIPPET_WORDS = 16
+SNIPPET_CONTEXT = 4
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE kanban_search USING fts5(
+        title, body, board, task_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '{PREFIX_LENGTHS}'
+    )
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_insert AFTER INSERT ON kanban_app_task BEGIN
+        INSERT INTO kanban_search (rowid, title, body, board, task_id)
+        VALUES (NEW.id * 2, NEW.title, NEW.description, 'b' || NEW.board_id, NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_update AFTER UPDATE OF title, description, board_id ON kanban_app_task
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description OR OLD.board_id IS NOT NEW.board_id
+    BEGIN
+        UPDATE kanban_search SET title = NEW.title, body = NEW.description, board = 'b' || NEW.board_id
+        WHERE rowid = NEW.id * 2;
+        UPDATE kanban_search SET board = 'b' || NEW.board_id
+        WHERE OLD.board_id IS NOT NEW.board_id
+          AND rowid IN (SELECT id * 2 + 1 FROM kanban_app_comment WHERE task_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_delete AFTER DELETE ON kanban_app_task BEGIN
+        DELETE FROM kanban_search WHERE rowid = OLD.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_insert AFTER INSERT ON kanban_app_comment BEGIN
+        INSERT INTO kanban_search (rowid, title, body, board, task_id)
+        SELECT NEW.id * 2 + 1, '', NEW.content, 'b' || board_id, NEW.task_id FROM kanban_app_task WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_update AFTER UPDATE OF content, task_id ON kanban_app_comment
+    WHEN OLD.content IS NOT NEW.content OR OLD.task_id IS NOT NEW.task_id
+    BEGIN
+        UPDATE kanban_search SET body = NEW.content, task_id = NEW.task_id,
+            board = (SELECT 'b' || board_id FROM kanban_app_task WHERE id = NEW.task_id)
+        WHERE rowid = NEW.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_delete AFTER DELETE ON kanban_app_comment BEGIN
+        DELETE FROM kanban_search WHERE rowid = OLD.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, board, task_id)
+    SELECT id * 2, title, description, 'b' || board_id, id FROM kanban_app_task
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, board, task_id)
+    SELECT comment.id * 2 + 1, '', comment.content, 'b' || task.board_id, comment.task_id
+    FROM kanban_app_comment comment JOIN kanban_app_task task ON task.id = comment.task_id
+    """,
+]
+
+SQLITE_DROP = [
+    *(
+        f'DROP TRIGGER IF EXISTS kanban_search_{table}_{event}'
+        for table in ('task', 'comment') for event in ('insert', 'update', 'delete')
+    ),
+    'DROP TABLE IF EXISTS kanban_search',
+]
+
+POSTGRESQL_SCHEMA = [
+    """
+    ALTER TABLE kanban_app_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', description), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX task_search_idx ON kanban_app_task USING GIN (search_vector)',
+    """
+    ALTER TABLE kanban_app_comment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', content)
+    ) STORED
+    """,
+    'CREATE INDEX comment_search_idx ON kanban_app_comment USING GIN (search_vector)',
+]
+
+POSTGRESQL_DROP = [
+    'ALTER TABLE kanban_app_task DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE kanban_app_comment DROP COLUMN IF EXISTS search_vector',
+]
+
+SCHEMA = {'sqlite': (SQLITE_SCHEMA, SQLITE_DROP), 'postgresql': (POSTGRESQL_SCHEMA, POSTGRESQL_DROP)}
+
+
+def create_search_schema(connection):
+    """Create the search index of the connection's database and fill it with the existing rows."""
+    create, _ = SCHEMA.get(connection.vendor, ((), ()))
+    with connection.cursor() as cursor:
+        for statement in create:
+            cursor.execute(statement)
+
+
+def drop_search_schema(connection):
+    _, drop = SCHEMA.get(connection.vendor, ((), ()))
+    with connection.cursor() as cursor:
+        for statement in drop:
+            cursor.execute(statement)
+
+
+def search_terms(query):
+    """The words of a query that are searched for, lowercased and without duplicates."""
+    words = [word.lower() for word in WORD.findall(query) if len(word) >= MIN_TERM_LENGTH]
+    return list(dict.fromkeys(words))[:MAX_TERMS]
+
+
+def highlighted(text):
+    """Escape text for HTML and turn the highlight placeholders into <mark> tags."""
+    return html.escape(text or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search(board_ids, terms, limit):
+    """
+    Return the `limit` best matches of all terms among the tasks and comments of the
+    given boards, best first: dicts of type (task or comment), id, task_id, board_id,
+    title (of the task) and snippet (of the description or comment).
+    """
+    if not board_ids or not terms:
+        return []
+    connection = connections[router.db_for_read(Task)]
+    hits = BACKENDS[connection.vendor](connection, sorted(board_ids), terms, limit)
+    return [
+        {
+            'type': 'task' if kind == 0 else 'comment',
+            'id': pk,
+            'task_id': task_id,
+            'board_id': board_id,
+            'title': highlighted(title),
+            'snippet': highlighted(snippet),
+        }
+        for kind, pk, task_id, board_id, title, snippet in hits
+    ]
+
+
+def sqlite_search(connection, board_ids, terms, limit):
+    """
+    Read the MAX_CANDIDATES newest matches with their highlighted texts in one pass
+    and rank them here. FTS5 walks the posting lists in rowid order and stops at the
+    limit, and highlight() only tokenizes the rows read, whereas bm25() and ranking
+    in SQL would visit every match. Up to MAX_BOARD_TOKENS boards are matched as board
+    tokens; the posting lists of more boards cost more to merge than checking the
+    board of each match.
+    """
+    words = ' AND '.join(f'"{term[:MAX_PREFIX_LENGTH]}"*' for term in terms)
+    if len(board_ids) <= MAX_BOARD_TOKENS:
+        boards = ' OR '.join(f'"b{board_id}"' for board_id in board_ids)
+        match, board_filter, params = f'board : ({boards}) AND {{title body}} : ({words})', '', []
+    else:
+        match = f'{{title body}} : ({words})'
+        board_filter = 'AND kanban_search.board IN (SELECT value FROM json_each(%s))'
+        params = [json.dumps([f'b{board_id}' for board_id in board_ids])]
+    sql = f"""
+        WITH candidates AS MATERIALIZED (
+            SELECT rowid AS id, task_id,
+                highlight(kanban_search, 0, %s, %s) AS title, highlight(kanban_search, 1, %s, %s) AS body
+            FROM kanban_search WHERE kanban_search MATCH %s {board_filter}
+            ORDER BY rowid DESC LIMIT %s
+        )
+        SELECT candidates.id, candidates.task_id, task.board_id, candidates.title, candidates.body, task.title
+        FROM candidates JOIN kanban_app_task task ON task.id = candidates.task_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MARK_START, MARK_END, MARK_START, MARK_END, match, *params, MAX_CANDIDATES])
+        candidates = cursor.fetchall()
+    return [
+        (rowid % 2, rowid // 2, task_id, board_id, task_title if rowid % 2 else title, snippet(body))
+        for rowid, task_id, board_id, title, body, task_title in ranked(candidates, limit)
+    ]
+
+
+def ranked(candidates, limit):
+    """
+    The `limit` best candidates by bm25 over their title and body matches, newer
+    first on a tie. All terms have to match, so the inverse document frequencies
+    are left out; document lengths are counted in words.
+    """
+    if not candidates:
+        return []
+    title_lengths = [len(candidate[3].split()) for candidate in candidates]
+    body_lengths = [len(candidate[4].split()) for candidate in candidates]
+    title_average = max(sum(title_lengths) / len(candidates), 1)
+    body_average = max(sum(body_lengths) / len(candidates), 1)
+
+    def saturation(hits, length, average):
+        return hits * (BM25_K1 + 1) / (hits + BM25_K1 * (1 - BM25_B + BM25_B * length / average))
+
+    scores = {
+        candidate[0]: TITLE_WEIGHT * saturation(candidate[3].count(MARK_START), title_length, title_average)
+        + saturation(candidate[4].count(MARK_START), body_length, body_average)
+        for candidate, title_length, body_length in zip(candidates, title_lengths, body_lengths)
+    }
+    return heapq.nlargest(limit, candidates, key=lambda candidate: (scores[candidate[0]], candidate[0]))
+
+
+def snippet(text):
+    """SNIPPET_WORDS words of a highlighted text around its first match, elided with '…'."""
+    words = text.split()
+    if len(words) <= SNIPPET_WORDS:
+        return ' '.join(words)
+    first = next((index for index, word in enumerate(words) if MARK_START in word), 0)
+    start = max(0, min(first - SNIPPET_CONTEXT, len(words) - SNIPPET_WORDS))
+    end = start + SNIPPET_WORDS
+    return ('…' if start else '') + ' '.join(words[start:end]) + ('…' if end < len(words) else '')
+
+
+def postgresql_search(connection, board_ids, terms, limit):
+    """
+    Take the MAX_CANDIDATES newest matches per table (found through the GIN indexes),
+    rank them with ts_rank_cd (titles carry weight A, descriptions B) and build the
+    headlines for the page only.
+    """
+    query = ' & '.join(f'{term}:*' for term in terms)
+    headline = f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=5'
+    sql = """
+        WITH query AS (SELECT to_tsquery('simple', %s) AS q),
+        candidates AS (
+            (SELECT 0 AS kind, task.id, task.id AS task_id, task.board_id, task.search_vector AS vector
+             FROM kanban_app_task task, query
+             WHERE task.search_vector @@ query.q AND task.board_id = ANY(%s)
+             ORDER BY task.id DESC LIMIT %s)
+            UNION ALL
+            (SELECT 1, comment.id, comment.task_id, task.board_id, comment.search_vector
+             FROM kanban_app_comment comment JOIN kanban_app_task task ON task.id = comment.task_id, query
+             WHERE comment.search_vector @@ query.q AND task.board_id = ANY(%s)
+             ORDER BY comment.id DESC LIMIT %s)
+        ),
+        hits AS (
+            SELECT kind, id, task_id, board_id, ts_rank_cd(vector, query.q) AS score
+            FROM candidates, query
+            ORDER BY score DESC, id DESC LIMIT %s
+        )
+        SELECT hits.kind, hits.id, hits.task_id, hits.board_id,
+            CASE WHEN hits.kind = 0 THEN ts_headline('simple', task.title, query.q, %s) ELSE task.title END,
+            ts_headline('simple', CASE WHEN hits.kind = 0 THEN task.description ELSE comment.content END, query.q, %s)
+        FROM hits CROSS JOIN query
+        JOIN kanban_app_task task ON task.id = hits.task_id
+        LEFT JOIN kanban_app_comment comment ON hits.kind = 1 AND comment.id = hits.id
+        ORDER BY hits.score DESC, hits.id DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            query, board_ids, MAX_CANDIDATES, board_ids, MAX_CANDIDATES, limit,
+            f'{headline}, HighlightAll=true', headline,
+        ])
+        return cursor.fetchall()
+
+
+BACKENDS = {'sqlite': sqlite_search, 'postgresql': postgresql_search}
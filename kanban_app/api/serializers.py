@@ -27,11 +27,12 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'members']
 
 class BoardListSerializer(serializers.ModelSerializer):
-    """Serializer for listing Board objects with additional counts."""
-    member_count = serializers.IntegerField(read_only=True)
-    ticket_count = serializers.IntegerField(read_only=True)
-    tasks_to_do_count = serializers.IntegerField(read_only=True)
-    tasks_high_prio_count = serializers.IntegerField(read_only=True)
+    """Serializer for listing Board objects with additional counts,
+    read from the materialized BoardStats row."""
+    member_count = serializers.IntegerField(source='stats.member_count', read_only=True)
+    ticket_count = serializers.IntegerField(source='stats.ticket_count', read_only=True)
+    tasks_to_do_count = serializers.IntegerField(source='stats.to_do_count', read_only=True)
+    tasks_high_prio_count = serializers.IntegerField(source='stats.high_priority_count', read_only=True)
 
     class Meta:
         model = Board
@@ -97,6 +98,12 @@ class EmailQuerySerializer(serializers.Serializer):
     """Simple serializer to validate a single email field."""
     email = serializers.EmailField(required=True)
 
+class SearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the search: the text, optionally one board, and the number of results."""
+    q = serializers.CharField(max_length=200)
+    board = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
 class CommaSeparatedUserField(serializers.Field):
     """
     Custom field to handle user IDs as a single int, a comma-separated string,
@@ -162,7 +169,9 @@ class TaskSerializer(serializers.ModelSerializer):
 
 class TaskUpdateDestroySerializer(serializers.ModelSerializer):
     """Serializer for Task with nested short user representations and
-    separate write-only fields for setting assignee and reviewers by ID."""
+    separate write-only fields for setting assignee and reviewers by ID.
+    Updates only write the submitted columns, so a concurrent comment cannot
+    have its comments_count increment overwritten."""
     assignee = UserShortSerializer(read_only=True)
     assignee_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),
@@ -188,6 +197,30 @@ class TaskUpdateDestroySerializer(serializers.ModelSerializer):
             'due_date'
         ]
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+class TaskBulkItemSerializer(serializers.ModelSerializer):
+    """Validates one task of a bulk create/update request.
+    Board and users are plain ids here; the bulk view resolves all of them
+    with one query per model instead of one query per field and item."""
+    id = serializers.IntegerField(required=False)
+    board = serializers.IntegerField()
+    assignee_id = serializers.IntegerField()
+    reviewer_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'board', 'title', 'description',
+            'status', 'priority',
+            'assignee_id', 'reviewer_id',
+            'due_date'
+        ]
+
 class CommentSerializer(serializers.ModelSerializer):
     """Serializer for Comment with author set to the authenticated user automatically."""
     author = serializers.SerializerMethodField()
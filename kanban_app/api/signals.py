@@ -0,0 +1,206 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from auth_app.api.models import UserProfile
+from .access import invalidate_access_on_commit
+from .cache import bump_board_version_on_commit
+from .changes import record_change, record_changes
+from .models import Board, Comment, Task
+from .stats import create_board_stats, record_task_created, record_task_deleted, record_task_updated, recount_members
+
+User = get_user_model()
+
+# Every write that changes what a board, task or comment listing shows goes through
+# these handlers. They bump the board cache version, move the updated_at
+# timestamps that conditional GET validators are computed from and append to
+# the change log read by the delta sync endpoint. Task and membership changes
+# also move the materialized BoardStats counters, and membership changes
+# drop the cached board access of the affected users. Timestamps are
+# touched with queryset.update(), which does not send signals again.
+
+
+def boards_changed(*board_ids):
+    board_ids = [board_id for board_id in board_ids if board_id]
+    if not board_ids:
+        return
+    Board.objects.filter(pk__in=board_ids).update(updated_at=timezone.now())
+    for board_id in board_ids:
+        bump_board_version_on_commit(board_id)
+
+
+def tasks_bulk_written(tasks, previous_board_ids=None):
+    """
+    bulk_create() and bulk_update() send no model signals, so bulk writers report
+    the written tasks here to get the same invalidation and change log entries
+    (their stats are moved with record_tasks_created/record_tasks_updated).
+    previous_board_ids maps task ids to the board they were on before the write.
+    """
+    previous_board_ids = previous_board_ids or {}
+    task_ids_by_board = defaultdict(list)
+    moved = defaultdict(list)
+    for task in tasks:
+        task_ids_by_board[task.board_id].append(task.pk)
+        previous = previous_board_ids.get(task.pk)
+        if previous and previous != task.board_id:
+            moved[previous].append(task.pk)
+    boards_changed(*task_ids_by_board, *moved)
+    for board_id, task_ids in task_ids_by_board.items():
+        record_changes(board_id, 'task', task_ids)
+    for board_id, task_ids in moved.items():
+        record_changes(board_id, 'task', task_ids, 'delete')
+
+
+@receiver(post_save, sender=Board)
+def board_saved(sender, instance, created=False, raw=False, **kwargs):
+    """A new board starts with an empty stats row; adding members recounts it."""
+    if created and not raw:
+        create_board_stats(instance.pk)
+    bump_board_version_on_commit(instance.pk)
+    record_change(instance.pk, 'board', instance.pk)
+    invalidate_access_on_commit(user_ids=[instance.owner_id], board_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=Board)
+def board_deleting(sender, instance, **kwargs):
+    """Collect the users losing access while the membership rows still exist."""
+    member_ids = list(instance.members.values_list('pk', flat=True))
+    invalidate_access_on_commit(user_ids=[instance.owner_id, *member_ids], board_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Board)
+def board_deleted(sender, instance, **kwargs):
+    bump_board_version_on_commit(instance.pk)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Remember the board, status and priority a task had before saving, so moving it
+    invalidates both boards and moves its stats contribution."""
+    if instance.pk and not raw and (update_fields is None or {'board', 'status', 'priority'} & set(update_fields)):
+        instance._previous_state = (
+            Task.objects.filter(pk=instance.pk).values_list('board_id', 'status', 'priority').first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created=False, raw=False, **kwargs):
+    previous_state = vars(instance).pop('_previous_state', None)
+    if created and not raw:
+        record_task_created(instance)
+    elif previous_state:
+        record_task_updated(*previous_state, instance)
+    previous_board_id = previous_state and previous_state[0]
+    if previous_board_id == instance.board_id:
+        previous_board_id = None
+    boards_changed(instance.board_id, previous_board_id)
+    record_change(instance.board_id, 'task', instance.pk)
+    if previous_board_id:
+        record_change(previous_board_id, 'task', instance.pk, 'delete')
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    """Deleting a whole board already invalidates it and drops its stats, so cascaded task deletes are skipped."""
+    if not isinstance(origin, Board):
+        record_task_deleted(instance)
+        boards_changed(instance.board_id)
+        record_change(instance.board_id, 'task', instance.pk, 'delete')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created=False, **kwargs):
+    _comment_changed(instance, 'upsert', 1 if created else 0)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    """Cascades from deleting the task or board are already covered by those handlers;
+    a task tombstone implies that its comments are gone."""
+    if not isinstance(origin, (Task, Board)):
+        _comment_changed(instance, 'delete', -1)
+
+
+def _comment_changed(comment, action, count_delta=0):
+    """Comments show up as comments_count on their task and on the board payload.
+    The stored counter is moved with an F() expression so concurrent writers never lose updates."""
+    Task.objects.filter(pk=comment.task_id).update(
+        updated_at=timezone.now(), comments_count=F('comments_count') + count_delta,
+    )
+    board_id = Task.objects.filter(pk=comment.task_id).values_list('board_id', flat=True).first()
+    boards_changed(board_id)
+    record_change(board_id, 'comment', comment.pk, action)
+    record_change(board_id, 'task', comment.task_id)
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Handle both board.members.add(user) and user.members.add(board).
+    Member counts are recounted once the through rows are written; a reverse clear
+    remembers its boards in pre_clear, because post_clear gets no pk_set."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            recount_members([instance.pk])
+        else:
+            recount_members(pk_set if action != 'post_clear' else vars(instance).pop('_cleared_board_ids', []))
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    log_action = 'upsert' if action == 'post_add' else 'delete'
+    if not reverse:
+        user_ids = list(pk_set if action != 'pre_clear' else instance.members.values_list('pk', flat=True))
+        boards_changed(instance.pk)
+        record_changes(instance.pk, 'member', user_ids, log_action)
+        invalidate_access_on_commit(user_ids=user_ids, board_ids=[instance.pk])
+        return
+    board_ids = list(pk_set if action != 'pre_clear' else instance.members.values_list('pk', flat=True))
+    if action == 'pre_clear':
+        instance._cleared_board_ids = board_ids
+    boards_changed(*board_ids)
+    for board_id in board_ids:
+        record_change(board_id, 'member', instance.pk, log_action)
+    invalidate_access_on_commit(user_ids=[instance.pk], board_ids=board_ids)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    """Deleting a user drops its membership rows without m2m_changed, so the
+    boards it was a member of are remembered here and recounted afterwards."""
+    instance._member_board_ids = list(
+        Board.members.through.objects.filter(user_id=instance.pk).values_list('board_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    recount_members(vars(instance).pop('_member_board_ids', []))
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, **kwargs):
+    _user_display_changed(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """Only the email of a user appears in payloads; login bookkeeping is ignored."""
+    if created or (update_fields and set(update_fields) <= {'last_login', 'password'}):
+        return
+    _user_display_changed(instance.pk)
+
+
+def _user_display_changed(user_id):
+    """Invalidate everything that embeds the user's name or email:
+    boards listing them as owner, member or reviewer, their tasks and their comments."""
+    now = timezone.now()
+    Task.objects.filter(Q(assignee_id=user_id) | Q(reviewer_id=user_id)).update(updated_at=now)
+    Comment.objects.filter(author_id=user_id).update(updated_at=now)
+    member_of = set(Board.members.through.objects.filter(user_id=user_id).values_list('board_id', flat=True))
+    board_ids = set(Board.objects.filter(owner_id=user_id).values_list('pk', flat=True)) | member_of
+    board_ids.update(Task.objects.filter(reviewer_id=user_id).values_list('board_id', flat=True))
+    boards_changed(*board_ids)
+    for board_id in member_of:
+        record_change(board_id, 'member', user_id)
@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Board, BoardStats, Comment, Task
+
+# Maps task status and priority values to the BoardStats column counting them.
+STATUS_FIELDS = {
+    'to-do': 'to_do_count',
+    'in-progress': 'in_progress_count',
+    'review': 'review_count',
+    'done': 'done_count',
+}
+PRIORITY_FIELDS = {
+    'low': 'low_priority_count',
+    'medium': 'medium_priority_count',
+    'high': 'high_priority_count',
+}
+COUNTER_FIELDS = ['member_count', 'ticket_count', *STATUS_FIELDS.values(), *PRIORITY_FIELDS.values()]
+
+
+def _task_deltas(status, priority, sign):
+    """Return the counter changes caused by adding (sign=1) or removing (sign=-1) a task."""
+    deltas = {'ticket_count': sign}
+    if status in STATUS_FIELDS:
+        deltas[STATUS_FIELDS[status]] = sign
+    if priority in PRIORITY_FIELDS:
+        deltas[PRIORITY_FIELDS[priority]] = sign
+    return deltas
+
+
+def apply_deltas(board_id, deltas):
+    """Apply counter changes to the stats row of a board with a single atomic UPDATE."""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        BoardStats.objects.filter(board_id=board_id).update(**changes)
+
+
+def create_board_stats(board_id):
+    """Create the empty stats row of a freshly saved board unless it already has one."""
+    return BoardStats.objects.get_or_create(board_id=board_id)[0]
+
+
+def record_task_created(task):
+    apply_deltas(task.board_id, _task_deltas(task.status, task.priority, 1))
+
+
+def record_task_deleted(task):
+    apply_deltas(task.board_id, _task_deltas(task.status, task.priority, -1))
+
+
+def record_task_updated(board_id, status, priority, task):
+    """Move a task's contribution from its previous board/status/priority to the current one."""
+    record_tasks_updated([((board_id, status, priority), task)])
+
+
+def record_tasks_created(tasks):
+    """Bulk variant of record_task_created issuing one UPDATE per affected board."""
+    totals = defaultdict(lambda: defaultdict(int))
+    for task in tasks:
+        _add(totals[task.board_id], _task_deltas(task.status, task.priority, 1))
+    _apply_totals(totals)
+
+
+def record_tasks_updated(changes):
+    """Bulk variant of record_task_updated for (previous (board_id, status, priority), task) pairs,
+    issuing one UPDATE per affected board."""
+    totals = defaultdict(lambda: defaultdict(int))
+    for (board_id, status, priority), task in changes:
+        _add(totals[board_id], _task_deltas(status, priority, -1))
+        _add(totals[task.board_id], _task_deltas(task.status, task.priority, 1))
+    _apply_totals(totals)
+
+
+def _add(counters, deltas):
+    for field, delta in deltas.items():
+        counters[field] += delta
+
+
+def _apply_totals(totals):
+    for board_id, deltas in totals.items():
+        apply_deltas(board_id, deltas)
+
+
+def recount_members(board_ids):
+    """Set the member_count of the given boards from the members through table
+    with one correlated UPDATE, so it is right whichever way the members changed."""
+    counts = (
+        Board.members.through.objects.filter(board_id=OuterRef('board_id'))
+        .order_by()
+        .values('board_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    BoardStats.objects.filter(board_id__in=board_ids).update(
+        member_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+    )
+
+
+def compute_board_stats(board_ids):
+    """Compute the exact counters for the given boards with one grouped pass over
+    tasks and one over the members through table."""
+    stats = {board_id: dict.fromkeys(COUNTER_FIELDS, 0) for board_id in board_ids}
+
+    grouped_tasks = (
+        Task.objects.filter(board_id__in=board_ids)
+        .order_by()
+        .values('board_id', 'status', 'priority')
+        .annotate(total=Count('pk'))
+    )
+    for row in grouped_tasks:
+        counters = stats[row['board_id']]
+        for field, delta in _task_deltas(row['status'], row['priority'], row['total']).items():
+            counters[field] += delta
+
+    grouped_members = (
+        Board.members.through.objects.filter(board_id__in=board_ids)
+        .order_by()
+        .values('board_id')
+        .annotate(total=Count('pk'))
+    )
+    for row in grouped_members:
+        stats[row['board_id']]['member_count'] = row['total']
+
+    return stats
+
+
+def rebuild_board_stats(board_ids, dry_run=False):
+    """Recompute the counters of the given boards and store them unless dry_run is set.
+    Returns the ids of boards whose stored counters were missing or wrong."""
+    expected = compute_board_stats(board_ids)
+    stored = {row.pk: row for row in BoardStats.objects.filter(board_id__in=board_ids)}
+    missing, drifted = [], []
+    for board_id, counters in expected.items():
+        row = stored.get(board_id)
+        if row is None:
+            missing.append(BoardStats(board_id=board_id, **counters))
+        elif any(getattr(row, field) != value for field, value in counters.items()):
+            for field, value in counters.items():
+                setattr(row, field, value)
+            drifted.append(row)
+    if not dry_run:
+        BoardStats.objects.bulk_create(missing)
+        BoardStats.objects.bulk_update(drifted, COUNTER_FIELDS)
+    return [row.board_id for row in missing + drifted]
+
+
+def recount_comments(tasks):
+    """Set the stored comments_count of the given task queryset from the comments table
+    with one correlated UPDATE; used after bulk writes that bypass the comment signals
+    and to repair drifted counters."""
+    counts = (
+        Comment.objects.filter(task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return tasks.update(comments_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
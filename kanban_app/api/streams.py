@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+
+from auth_app.api.authentication import CachedTokenAuthentication
+
+from .changes import latest_cursor, missed_changes
+from .events import board_channel, get_broker
+from .models import Board
+
+# Seconds between keep-alive comments on an idle stream.
+HEARTBEAT_INTERVAL = 15
+
+
+async def authenticate(request):
+    """
+    Resolve the token from the Authorization header or, because browser EventSource
+    cannot send headers, from the ?token= query parameter.
+    Returns the user or None.
+    """
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword != CachedTokenAuthentication.keyword:
+        key = request.GET.get('token', '')
+    if not key:
+        return None
+    try:
+        user, _ = await CachedTokenAuthentication().aauthenticate_credentials(key)
+    except exceptions.AuthenticationFailed:
+        return None
+    return user
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def board_events(request, pk):
+    """
+    Server-Sent Events stream of the changes on a board, for board owners and members.
+    Each event carries the change cursor, kind, object id and action of one change log
+    entry; clients fetch the changed objects from /api/boards/<pk>/changes/ using the
+    cursor they last saw. A reconnecting client sending Last-Event-ID first gets the
+    entries it missed. Needs an ASGI server, WSGI cannot hold the connection open.
+    """
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    board = await Board.objects.filter(pk=pk).afirst()
+    if board is None:
+        return JsonResponse({'detail': 'No Board matches the given query.'}, status=404)
+    if board.owner_id != user.pk and not await board.members.filter(pk=user.pk).aexists():
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    try:
+        resume_from = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        resume_from = None
+    response = StreamingHttpResponse(stream_board(board.pk, resume_from), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream_board(board_id, resume_from=None):
+    """
+    Subscribe first, then read and announce the current cursor, so no change falls in between.
+    When resuming, the log entries after `resume_from` are replayed instead and live
+    messages they already covered are skipped; if too many were missed, the ready event
+    carries `resume_from` and the client catches up through the delta endpoint.
+    """
+    async with get_broker().subscribe(board_channel(board_id)) as subscription:
+        yield 'retry: 3000\n\n'
+        missed, replayed = None, 0
+        if resume_from is not None:
+            missed = await sync_to_async(missed_changes)(board_id, resume_from)
+        if missed is None:
+            cursor = resume_from if resume_from is not None else await sync_to_async(latest_cursor)(board_id)
+            yield format_event({'cursor': cursor}, event='ready', event_id=cursor)
+        else:
+            for message in missed:
+                yield format_event(message, event='change', event_id=message['cursor'])
+                replayed = message['cursor']
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if message['cursor'] > replayed:
+                yield format_event(message, event='change', event_id=message['cursor'])
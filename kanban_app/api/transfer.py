@@ -0,0 +1,320 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .access import invalidate_access_on_commit
+from .models import Board, Comment, Task, User
+from .stats import rebuild_board_stats, recount_comments
+
+# Boards are moved between installations as JSON Lines: one object per line with a
+# 'type' of board, member, task or comment. Parents come before their children, and
+# users are referenced by email so they can be mapped onto the ids of the target database.
+
+# Rows fetched per round trip by the export iterators.
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows buffered per bulk insert by the importer.
+IMPORT_BATCH_SIZE = 1000
+
+# Fields every row of a type must carry; reviewer_email may be null.
+REQUIRED_FIELDS = {
+    'board': ('id', 'title', 'owner_email'),
+    'member': ('board_id', 'user_email'),
+    'task': ('id', 'board_id', 'title', 'description', 'status', 'priority', 'due_date', 'assignee_email'),
+    'comment': ('id', 'task_id', 'content', 'created_at', 'author_email'),
+}
+
+
+# Per type: the model whose fields the values are checked against, the fields holding
+# ids of the exported rows, and the fields holding user emails (optional ones may be null).
+ROW_MODELS = {'board': Board, 'member': None, 'task': Task, 'comment': Comment}
+ID_FIELDS = {'board': ('id',), 'member': ('board_id',), 'task': ('id', 'board_id'), 'comment': ('id', 'task_id')}
+EMAIL_FIELDS = {
+    'board': ('owner_email',), 'member': ('user_email',), 'task': ('assignee_email',), 'comment': ('author_email',),
+}
+OPTIONAL_EMAIL_FIELDS = {'task': ('reviewer_email',)}
+
+
+class BoardImportError(ValueError):
+    """Raised for malformed lines, unknown users or references to rows not seen before."""
+
+
+def export_board_lines(boards, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the given board queryset with its members, tasks and comments as JSON lines.
+    Every table is read with a server-side iterator over values(), so memory stays
+    flat no matter how many tasks and comments the boards have.
+    """
+    board_ids = boards.values('pk')
+    rows = [
+        ('board', boards.order_by('pk').values('id', 'title', owner_email=F('owner__email'))),
+        ('member', Board.members.through.objects.filter(board_id__in=board_ids).order_by('pk').values(
+            'board_id', user_email=F('user__email'),
+        )),
+        ('task', Task.objects.filter(board_id__in=board_ids).order_by('pk').values(
+            'id', 'board_id', 'title', 'description', 'status', 'priority', 'due_date',
+            assignee_email=F('assignee__email'), reviewer_email=F('reviewer__email'),
+        )),
+        ('comment', Comment.objects.filter(task__board_id__in=board_ids).order_by('pk').values(
+            'id', 'task_id', 'content', 'created_at', author_email=F('author__email'),
+        )),
+    ]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for kind, queryset in rows:
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield encoder.encode({'type': kind, **row}) + '\n'
+
+
+def insert_rows(model, rows):
+    """
+    Insert dicts of attname -> value with a single executemany, skipping model
+    instances, pre_save hooks and signals. About three times faster than bulk_create
+    for rows whose primary keys are not needed afterwards; every row must have the
+    same keys and carry its own timestamps.
+    """
+    if not rows:
+        return
+    fields = [model._meta.get_field(name) for name in rows[0]]
+    connection = connections[model.objects.db]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [field.get_db_prep_save(row[field.attname], connection) for field in fields] for row in rows
+        ])
+
+
+class BoardImporter:
+    """
+    Stream rows produced by export_board_lines into the database.
+    Rows are buffered and written with bulk_create, members go straight into the
+    through table. Old ids are mapped to the new ones, and users are looked up by
+    email once per batch. Only the id maps grow with the input; pass owner to make
+    one user the owner of every imported board (used by the API). Such an import may
+    only add users the owner already shares a board with as members, and assignees,
+    reviewers and comment authors have to be the owner or a member of their board,
+    like the task and comment endpoints require.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, owner=None):
+        self.batch_size = batch_size
+        self.owner = owner
+        self.board_ids, self.task_ids = {}, {}
+        self.user_ids = {}
+        self.board_users, self.task_boards = {}, {}
+        self.linked_user_ids = None
+        self.boards, self.members, self.tasks, self.comments = [], [], [], []
+        self.counts = dict.fromkeys(REQUIRED_FIELDS, 0)
+        self.line_number = 0
+
+    def run(self, lines):
+        """Import all lines in one transaction and return the number of rows per type."""
+        with transaction.atomic():
+            for line in lines:
+                self.line_number += 1
+                if isinstance(line, bytes):
+                    try:
+                        line = line.decode('utf-8')
+                    except UnicodeDecodeError:
+                        raise self.error('not valid UTF-8')
+                if line.strip():
+                    self.add(self.parse(line))
+            for flush in (self.flush_boards, self.flush_members, self.flush_tasks, self.flush_comments):
+                flush()
+            self.finish()
+        return self.counts
+
+    def parse(self, line):
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise self.error(f'invalid JSON ({error})')
+        if not isinstance(row, dict) or row.get('type') not in REQUIRED_FIELDS:
+            raise self.error('expected an object with a type of board, member, task or comment')
+        missing = [field for field in REQUIRED_FIELDS[row['type']] if field not in row]
+        if missing:
+            raise self.error(f'{row["type"]} rows need the fields {", ".join(missing)}')
+        return self.clean(row)
+
+    def clean(self, row):
+        """
+        Check the values of a row like the model would and convert them (dates, timestamps)
+        in place, so every bad value is reported with its line instead of failing the insert.
+        """
+        kind = row['type']
+        for name in ID_FIELDS[kind]:
+            if isinstance(row[name], bool) or not isinstance(row[name], (int, str)):
+                raise self.error(f'{name} must be an integer or a string')
+        for name in EMAIL_FIELDS[kind]:
+            if not isinstance(row[name], str) or not row[name]:
+                raise self.error(f'{name} must be an email address')
+        for name in OPTIONAL_EMAIL_FIELDS.get(kind, ()):
+            if row.get(name) is not None and not isinstance(row[name], str):
+                raise self.error(f'{name} must be an email address or null')
+        model = ROW_MODELS[kind]
+        for name in REQUIRED_FIELDS[kind]:
+            if model is not None and name not in ID_FIELDS[kind] and name not in EMAIL_FIELDS[kind]:
+                row[name] = self.clean_value(model._meta.get_field(name), row[name])
+        return row
+
+    def clean_value(self, field, value):
+        """to_python() and the validators of the model field; choices are enforced, blank strings allowed."""
+        if value is None:
+            if field.null:
+                return None
+            raise self.error(f'{field.name} must not be null')
+        if isinstance(field, models.CharField) and not isinstance(value, str):
+            raise self.error(f'{field.name} must be a string')
+        try:
+            value = field.to_python(value)
+            if field.choices and value not in {choice for choice, _ in field.flatchoices}:
+                raise ValidationError(f'{value!r} is not one of {", ".join(choice for choice, _ in field.flatchoices)}.')
+            field.run_validators(value)
+            if isinstance(field, models.DateTimeField) and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+        except (ValidationError, TypeError, ValueError) as error:
+            messages = error.messages if isinstance(error, ValidationError) else [str(error)]
+            raise self.error(f'{field.name}: {" ".join(messages)}')
+        return value
+
+    def error(self, message):
+        return BoardImportError(f'line {self.line_number}: {message}')
+
+    def add(self, row):
+        kind = row['type']
+        self.counts[kind] += 1
+        buffer = {'board': self.boards, 'member': self.members, 'task': self.tasks, 'comment': self.comments}[kind]
+        buffer.append((self.line_number, row))
+        if len(buffer) >= self.batch_size:
+            getattr(self, f'flush_{kind}s')()
+
+    def resolve_users(self, emails):
+        """Map the emails not seen yet to user ids with one query."""
+        unknown = {email for email in emails if email and email not in self.user_ids}
+        if unknown:
+            self.user_ids.update(User.objects.filter(email__in=unknown).values_list('email', 'pk'))
+        missing = sorted(email for email in unknown if email not in self.user_ids)
+        if missing:
+            raise BoardImportError(f'unknown users: {", ".join(missing[:20])}')
+
+    def linked_users(self):
+        """The owner and everyone owning or being a member of a board the owner can access."""
+        if self.linked_user_ids is None:
+            boards = Board.objects.accessible_to(self.owner).values('pk')
+            self.linked_user_ids = {
+                self.owner.pk,
+                *Board.objects.filter(pk__in=boards).values_list('owner_id', flat=True),
+                *Board.members.through.objects.filter(board_id__in=boards).values_list('user_id', flat=True),
+            }
+        return self.linked_user_ids
+
+    def check_member(self, line_number, email):
+        if self.owner is not None and self.user_ids[email] not in self.linked_users():
+            raise BoardImportError(f'line {line_number}: {email} does not share a board with the importing user')
+
+    def check_board_user(self, line_number, name, email, board_id):
+        if self.owner is not None and email is not None and self.user_ids[email] not in self.board_users[board_id]:
+            raise BoardImportError(f'line {line_number}: {name} {email} is not the owner or a member of the board')
+
+    def lookup(self, mapping, line_number, kind, old_id):
+        try:
+            return mapping[old_id]
+        except KeyError:
+            raise BoardImportError(f'line {line_number}: {kind} {old_id} does not appear before it')
+
+    def flush_boards(self):
+        if not self.boards:
+            return
+        if self.owner is None:
+            self.resolve_users(row['owner_email'] for _, row in self.boards)
+        created = Board.objects.bulk_create([
+            Board(title=row['title'], owner_id=self.owner.pk if self.owner else self.user_ids[row['owner_email']])
+            for _, row in self.boards
+        ])
+        for (_, row), board in zip(self.boards, created):
+            self.board_ids[row['id']] = board.pk
+            self.board_users[board.pk] = {board.owner_id}
+        self.boards = []
+
+    def flush_members(self):
+        if not self.members:
+            return
+        self.flush_boards()
+        self.resolve_users(row['user_email'] for _, row in self.members)
+        memberships = []
+        for line_number, row in self.members:
+            board_id = self.lookup(self.board_ids, line_number, 'board', row['board_id'])
+            self.check_member(line_number, row['user_email'])
+            user_id = self.user_ids[row['user_email']]
+            self.board_users[board_id].add(user_id)
+            memberships.append(Board.members.through(board_id=board_id, user_id=user_id))
+        Board.members.through.objects.bulk_create(memberships, ignore_conflicts=True)
+        self.members = []
+
+    def flush_tasks(self):
+        if not self.tasks:
+            return
+        """Members first, so the assignees and reviewers can be checked against them"""
+        self.flush_members()
+        self.resolve_users(
+            email for _, row in self.tasks for email in (row['assignee_email'], row.get('reviewer_email'))
+        )
+        tasks = []
+        for line_number, row in self.tasks:
+            board_id = self.lookup(self.board_ids, line_number, 'board', row['board_id'])
+            self.check_board_user(line_number, 'assignee', row['assignee_email'], board_id)
+            self.check_board_user(line_number, 'reviewer', row.get('reviewer_email'), board_id)
+            tasks.append(Task(
+                board_id=board_id,
+                title=row['title'],
+                description=row['description'],
+                status=row['status'],
+                priority=row['priority'],
+                due_date=row['due_date'],
+                assignee_id=self.user_ids[row['assignee_email']],
+                reviewer_id=self.user_ids.get(row.get('reviewer_email')),
+            ))
+        created = Task.objects.bulk_create(tasks)
+        for (_, row), task in zip(self.tasks, created):
+            self.task_ids[row['id']] = task.pk
+            self.task_boards[task.pk] = task.board_id
+        self.tasks = []
+
+    def flush_comments(self):
+        if not self.comments:
+            return
+        self.flush_tasks()
+        self.resolve_users(row['author_email'] for _, row in self.comments)
+        now = timezone.now()
+        rows = []
+        for line_number, row in self.comments:
+            task_id = self.lookup(self.task_ids, line_number, 'task', row['task_id'])
+            self.check_board_user(line_number, 'author', row['author_email'], self.task_boards[task_id])
+            rows.append({
+                'task_id': task_id,
+                'author_id': self.user_ids[row['author_email']],
+                'content': row['content'],
+                'created_at': row['created_at'],
+                'updated_at': now,
+            })
+        """bulk_create would overwrite the auto_now_add created_at, so the original timestamps go in directly."""
+        insert_rows(Comment, rows)
+        self.comments = []
+
+    def finish(self):
+        """Fill in what the signal handlers would have maintained for single writes."""
+        board_ids = list(self.board_ids.values())
+        for start in range(0, len(board_ids), self.batch_size):
+            batch = board_ids[start:start + self.batch_size]
+            rebuild_board_stats(batch)
+            recount_comments(Task.objects.filter(board_id__in=batch))
+        user_ids = set(self.user_ids.values()) | ({self.owner.pk} if self.owner else set())
+        invalidate_access_on_commit(user_ids=user_ids)
@@ -1,41 +1,76 @@
 from django.urls import path
+from .async_views import ASYNC_READ_VIEWS, selected_async_routes, with_async_reads
+from .streams import board_events
 from .views import (
     TaskListCreateAPIView,
     TaskUpdateDestroyAPIView,
+    TaskBulkAPIView,
     CommentListCreateAPIView,
     BoardListCreateView,
     BoardSingleView,
+    BoardChangesView,
+    BoardExportView,
+    BoardImportView,
     EmailCheckAPIView,
     TaskAssigneeView,
     TaskReviewerView,
     CommentDeleteAPIView,
+    SearchView,
 )
 
-urlpatterns = [
-    # Endpoint for listing all boards or creating a new board
-    path('boards/', BoardListCreateView.as_view(), name='boards'),
 
-    # Endpoint to retrieve, update or delete a single board identified by its primary key
-    path('boards/<int:pk>/', BoardSingleView.as_view(), name='board-details'),
+def build_urlpatterns(async_routes):
+    """The API routes; GET and HEAD of the routes named in async_routes are served async."""
 
-    # Endpoint to check if an email exists or is valid (usually for user validation)
-    path('email-check/', EmailCheckAPIView.as_view(), name='email-check'),
+    def read_view(name, sync_view):
+        if name in async_routes:
+            return with_async_reads(sync_view, ASYNC_READ_VIEWS[name].as_view())
+        return sync_view
 
-    # Endpoint for listing all tasks or creating a new task
-    path('tasks/', TaskListCreateAPIView.as_view(), name='tasks'),
+    return [
+        # Endpoint for listing all boards or creating a new board
+        path('boards/', read_view('boards', BoardListCreateView.as_view()), name='boards'),
 
-    # Endpoint to retrieve, update, or delete a task identified by its primary key
-    path('tasks/<int:pk>/', TaskUpdateDestroyAPIView.as_view(), name='task-update-destroy'),
+        # Endpoints streaming the own boards out as JSON Lines and importing such a file again
+        path('boards/export/', BoardExportView.as_view(), name='boards-export'),
+        path('boards/import/', BoardImportView.as_view(), name='boards-import'),
 
-    # Endpoint to list all tasks assigned to the authenticated user
-    path('tasks/assigned-to-me/', TaskAssigneeView.as_view(), name='tasks-assigned-to-me'),
+        # Endpoint to retrieve, update or delete a single board identified by its primary key
+        path('boards/<int:pk>/', read_view('board-details', BoardSingleView.as_view()), name='board-details'),
 
-    # Endpoint to list all tasks where the authenticated user is a reviewer
-    path('tasks/reviewing/', TaskReviewerView.as_view(), name='tasks-reviewing-to-me'),
+        # Endpoint returning the changes on a board since a change cursor (delta sync for polling clients)
+        path('boards/<int:pk>/changes/', BoardChangesView.as_view(), name='board-changes'),
 
-    # Endpoint for listing all comments or creating a new comment related to a specific task
-    path('tasks/<int:task_pk>/comments/', CommentListCreateAPIView.as_view(), name='comments'),
+        # Server-Sent Events stream pushing board changes to subscribed members (requires ASGI)
+        path('boards/<int:pk>/events/', board_events, name='board-events'),
 
-    # Endpoint to delete a specific comment by its primary key, related to a specific task
-    path('tasks/<int:task_pk>/comments/<int:pk>/', CommentDeleteAPIView.as_view(), name='comments-delete'),
-]
\ No newline at end of file
+        # Endpoint to check if an email exists or is valid (usually for user validation)
+        path('email-check/', read_view('email-check', EmailCheckAPIView.as_view()), name='email-check'),
+
+        # Full-text search over the tasks and comments of the boards the user can access
+        path('search/', SearchView.as_view(), name='search'),
+
+        # Endpoint for listing all tasks or creating a new task
+        path('tasks/', TaskListCreateAPIView.as_view(), name='tasks'),
+
+        # Endpoint for creating (POST) or updating/moving (PATCH) many tasks in one transaction
+        path('tasks/bulk/', TaskBulkAPIView.as_view(), name='tasks-bulk'),
+
+        # Endpoint to retrieve, update, or delete a task identified by its primary key
+        path('tasks/<int:pk>/', TaskUpdateDestroyAPIView.as_view(), name='task-update-destroy'),
+
+        # Endpoint to list all tasks assigned to the authenticated user
+        path('tasks/assigned-to-me/', read_view('tasks-assigned-to-me', TaskAssigneeView.as_view()), name='tasks-assigned-to-me'),
+
+        # Endpoint to list all tasks where the authenticated user is a reviewer
+        path('tasks/reviewing/', read_view('tasks-reviewing-to-me', TaskReviewerView.as_view()), name='tasks-reviewing-to-me'),
+
+        # Endpoint for listing all comments or creating a new comment related to a specific task
+        path('tasks/<int:task_pk>/comments/', read_view('comments', CommentListCreateAPIView.as_view()), name='comments'),
+
+        # Endpoint to delete a specific comment by its primary key, related to a specific task
+        path('tasks/<int:task_pk>/comments/<int:pk>/', CommentDeleteAPIView.as_view(), name='comments-delete'),
+    ]
+
+
+urlpatterns = build_urlpatterns(selected_async_routes())
@@ -1,9 +1,13 @@
-from django.db.models import Q, Count, Prefetch
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.functions import Lower
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from .models import Task, Comment, Board, User
 from .serializers import (
     TaskSerializer,
@@ -13,18 +17,48 @@ from .serializers import (
     BoardCreateSerializer,
     BoardSingleSerializer,
     BoardUpdateSerializer,
+    TaskShortBoardSerializer,
+    TaskBulkItemSerializer,
     UserShortSerializer,
     EmailQuerySerializer,
+    SearchQuerySerializer,
 )
+from .stats import (
+    record_tasks_created,
+    record_tasks_updated,
+)
+from .signals import tasks_bulk_written
+from .access import accessible_board_ids, board_user_ids, board_user_ids_many, can_access_board
+from .cache import get_board_payload
+from .changes import collect_changes, latest_cursor
+from .conditional import ConditionalGetMixin
+from .payloads import (
+    BOARD_LIST_COLUMNS,
+    COMMENT_COLUMNS,
+    TASK_COLUMNS,
+    RowListMixin,
+    board_detail_payload,
+    board_list_row,
+    comment_row,
+    task_row,
+)
+from .search import search, search_terms
+from .transfer import BoardImporter, BoardImportError, export_board_lines
+from .pagination import BoardPagination, TaskPagination, CommentPagination
 from .permissions import IsOwnerOrMember, IsOwner, IsBoardMember, IsCommentBoardMember, IsCommentCreator, BoardMemberForBoard
 
-class BoardListCreateView(generics.ListCreateAPIView):
+class BoardListCreateView(ConditionalGetMixin, RowListMixin, generics.ListCreateAPIView):
     """
     API view to list all Boards accessible to the authenticated user or create a new Board.
     - GET: Returns all Boards where the user is the owner or a member, including annotated counts.
     - POST: Creates a new Board with the authenticated user as the owner and optional members.
+    GET is paginated by board id when ?limit= or ?cursor= is given, streamed with ?stream=1
+    and answers conditional requests with 304 Not Modified.
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BoardPagination
+    row_columns = BOARD_LIST_COLUMNS
+    row_mapper = staticmethod(board_list_row)
 
     def get_serializer_class(self):
         """Use different serializers for GET (listing) and POST (creation)"""
@@ -34,16 +68,11 @@ class BoardListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        """Query Boards where user is owner or member and annotate with counts for dashboard stats"""
-        return Board.objects.filter(
-            Q(owner=user) | Q(members=user)
-        ).annotate(
-            member_count=Count('members', distinct=True),
-            ticket_count=Count('tasks', distinct=True),
-            tasks_to_do_count=Count('tasks', filter=Q(tasks__status='to-do'), distinct=True),
-            tasks_high_prio_count=Count('tasks', filter=Q(tasks__priority='high'), distinct=True)
-        )
+        """Query Boards where user is owner or member; rows are read as BOARD_LIST_COLUMNS,
+        which joins their materialized dashboard stats"""
+        return Board.objects.accessible_to(user)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Save the new Board instance with the current user as owner"""
         board = serializer.save(owner=self.request.user)
@@ -53,12 +82,6 @@ class BoardListCreateView(generics.ListCreateAPIView):
         if members:
             board.members.set(members)
 
-        """Manually annotate counts for the created board instance to provide detailed response"""
-        board.member_count = board.members.count()
-        board.ticket_count = board.tasks.count()
-        board.tasks_to_do_count = board.tasks.filter(status='to-do').count()
-        board.tasks_high_prio_count = board.tasks.filter(priority='high').count()
-
         """Store created board for use in response"""
         self._created_board = board
 
@@ -72,7 +95,7 @@ class BoardListCreateView(generics.ListCreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
 
-class BoardSingleView(generics.RetrieveUpdateDestroyAPIView):
+class BoardSingleView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific Board instance by its primary key.
     Permissions:
@@ -80,22 +103,59 @@ class BoardSingleView(generics.RetrieveUpdateDestroyAPIView):
       - Other methods allowed for owner or members.
     Supports:
       - GET: Returns detailed board info including related tasks (with comment counts) and members.
+        Conditional requests are validated against the board's updated_at.
       - PATCH: Allows partial update with a dedicated update serializer.
     """
     queryset = Board.objects.all()
+    monotonic_last_modified = True
 
     def get_queryset(self):
-        """Prefetch related tasks with comment counts and related user fields for efficiency"""
+        """Look the board up without relations for GET and DELETE; the nested payload is
+        only built by get_detail_queryset when the cached copy is missing.
+        PATCH joins members and owner with their profiles for the response."""
+        if self.request.method == 'PATCH':
+            return Board.objects.prefetch_related(self.members_prefetch()).select_related('owner__userprofile')
+        return Board.objects.all()
+
+    @staticmethod
+    def members_prefetch():
+        """User profiles are joined in so that no full name is loaded one user at a time."""
+        return Prefetch('members', queryset=User.objects.select_related('userprofile').order_by('pk'))
+
+    def get_detail_queryset(self):
+        """Prefetch related tasks (with their stored comment counts) and related user fields for efficiency.
+        GET builds the same payload with payloads.board_detail_payload(); this queryset and
+        BoardSingleSerializer remain the reference it is tested and benchmarked against."""
         return Board.objects.prefetch_related(
             Prefetch(
                 'tasks',
-                queryset=Task.objects.annotate(
-                    comments_count=Count('comments')
-                ).prefetch_related('reviewer', 'assignee')
+                queryset=Task.objects.select_related('reviewer__userprofile').order_by('pk')
             ),
-            'members'
+            self.members_prefetch()
         ).select_related('owner')
 
+    def retrieve(self, request, *args, **kwargs):
+        """Permissions are checked on every request by get_object(); only the
+        serialized payload is served from the versioned board cache."""
+        board = self.get_object()
+        return Response(get_board_payload(board.pk, lambda: board_detail_payload(board.pk)))
+
+    def perform_update(self, serializer):
+        """Save, then reload the board so the response reads members and owner
+        with their profiles from one prefetch instead of one query per member."""
+        board = serializer.save()
+        serializer.instance = self.get_queryset().get(pk=board.pk)
+
+    def get_object(self):
+        """Memoize the looked-up board; the conditional GET validators and retrieve() share it."""
+        if not hasattr(self, '_board'):
+            self._board = super().get_object()
+        return self._board
+
+    def get_validator_state(self):
+        """Every change shown on the board payload touches board.updated_at."""
+        return self.get_object().updated_at, 1
+
     def get_permissions(self):
         if self.request.method == 'DELETE':
             permission_classes = [permissions.IsAuthenticated, IsOwner]
@@ -110,12 +170,143 @@ class BoardSingleView(generics.RetrieveUpdateDestroyAPIView):
         return BoardSingleSerializer
 
 
+class BoardChangesView(generics.GenericAPIView):
+    """
+    API view returning what changed on a board since a change cursor.
+    Query parameter: ?since=<cursor> (omit or 0 for a full snapshot).
+    Returns the current state of every task, comment and member changed after the
+    cursor, tombstones for deleted ones, and the cursor to send on the next poll.
+    When `has_more` is true the client should poll again right away.
+    """
+    queryset = Board.objects.all()
+    permission_classes = [permissions.IsAuthenticated, BoardMemberForBoard]
+
+    def get(self, request, *args, **kwargs):
+        board = self.get_object()
+        try:
+            since = int(request.query_params.get('since', 0))
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'since': 'Must be a non-negative integer cursor.'})
+
+        if since == 0:
+            return Response(self.snapshot(board))
+
+        cursor, has_more, latest = collect_changes(board.pk, since)
+        upserted = {kind: [pk for pk, action in objects.items() if action == 'upsert'] for kind, objects in latest.items()}
+        deleted = {kind: [pk for pk, action in objects.items() if action == 'delete'] for kind, objects in latest.items()}
+
+        return Response({
+            'cursor': cursor,
+            'has_more': has_more,
+            'snapshot': False,
+            'board': self.serialize_board(board) if upserted['board'] else None,
+            'tasks': self.serialize_tasks(board, pk__in=upserted['task']),
+            'comments': self.serialize_comments(board, pk__in=upserted['comment']),
+            'members': self.serialize_members(board, pk__in=upserted['member']),
+            'deleted': {
+                'tasks': deleted['task'],
+                'comments': deleted['comment'],
+                'members': deleted['member'],
+            },
+        })
+
+    def snapshot(self, board):
+        """The cursor is read before the data, so anything written meanwhile is sent again next time."""
+        cursor = latest_cursor(board.pk)
+        return {
+            'cursor': cursor,
+            'has_more': False,
+            'snapshot': True,
+            'board': self.serialize_board(board),
+            'tasks': self.serialize_tasks(board),
+            'comments': self.serialize_comments(board),
+            'members': self.serialize_members(board),
+            'deleted': {'tasks': [], 'comments': [], 'members': []},
+        }
+
+    @staticmethod
+    def serialize_board(board):
+        return {'id': board.pk, 'title': board.title, 'owner_id': board.owner_id}
+
+    @staticmethod
+    def serialize_tasks(board, **filters):
+        tasks = (
+            board.tasks.filter(**filters)
+            .select_related('reviewer__userprofile')
+        )
+        return TaskShortBoardSerializer(tasks, many=True).data
+
+    @staticmethod
+    def serialize_comments(board, **filters):
+        comments = Comment.objects.filter(task__board=board, **filters).select_related('author__userprofile')
+        return [
+            {**CommentSerializer(comment).data, 'task': comment.task_id}
+            for comment in comments
+        ]
+
+    @staticmethod
+    def serialize_members(board, **filters):
+        members = board.members.filter(**filters).select_related('userprofile')
+        return UserShortSerializer(members, many=True).data
+
+
+class BoardExportView(APIView):
+    """
+    API view streaming the boards owned by the authenticated user as JSON Lines
+    (boards, members, tasks and comments; see transfer.py for the format).
+    Query parameter: ?ids=<id>,<id> to export only some of them.
+    Rows are read with server-side iterators and written as they come, so the
+    response never holds a whole board in memory.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        boards = Board.objects.filter(owner=request.user)
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                boards = boards.filter(pk__in=[int(pk) for pk in ids.split(',')])
+            except ValueError:
+                raise ValidationError({'ids': 'Must be a comma separated list of board ids.'})
+
+        response = StreamingHttpResponse(export_board_lines(boards), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="boards.jsonl"'
+        return response
+
+
+class BoardImportView(APIView):
+    """
+    API view importing boards from a JSON Lines body as produced by the export.
+    The authenticated user becomes the owner of every imported board; members,
+    assignees, reviewers and comment authors are matched to existing users by email.
+    Members must already share a board with the user, and assignees, reviewers and
+    comment authors must be the owner or a member of the imported board.
+    The body is read line by line and inserted in batches within one transaction.
+    Returns the number of imported rows per type, or 400 with the offending line.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        stream = request.stream
+        if stream is None:
+            raise ValidationError({'detail': 'The request body is empty.'})
+        try:
+            counts = BoardImporter(owner=request.user).run(iter(stream.readline, b''))
+        except BoardImportError as error:
+            raise ValidationError({'detail': str(error)})
+        return Response(counts, status=status.HTTP_201_CREATED)
+
+
 class EmailCheckAPIView(APIView):
     """
     API view to check for the existence of a user with a given email.
     Requires authenticated user.
     Query parameter: ?email=<email>
     Returns user data if found, otherwise raises a 404 NotFound.
+    The comparison is written as LOWER(email) = <lowercased email> so it can use
+    the functional index on the user table (iexact compiles to LIKE/UPPER, which cannot).
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -125,7 +316,12 @@ class EmailCheckAPIView(APIView):
         email = query_serializer.validated_data["email"]
 
         try:
-            user = User.objects.get(email__iexact=email)
+            user = (
+                User.objects
+                .alias(email_lower=Lower('email'))
+                .select_related('userprofile')
+                .get(email_lower=email.lower())
+            )
         except User.DoesNotExist:
             raise NotFound(detail="A user with this email does not exist.")
 
@@ -133,28 +329,58 @@ class EmailCheckAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class SearchView(APIView):
+    """
+    API view searching the titles and descriptions of tasks and the comments on the
+    boards the authenticated user owns or is a member of (see search.py).
+    Query parameters: ?q=<text>, optionally &board=<id> and &limit=<1-100, default 20>.
+    Every word of q must match, as a word prefix. Returns the best matches first as
+    a list of {type, id, task_id, board_id, title, snippet}; title and snippet are
+    HTML-escaped with the matches wrapped in <mark>.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        terms = search_terms(params['q'])
+        if not terms:
+            raise ValidationError({'q': 'Enter at least one word of two or more letters or digits.'})
+        board_ids = accessible_board_ids(request)
+        if 'board' in params:
+            if params['board'] not in board_ids:
+                raise PermissionDenied('You do not have access to this board.')
+            board_ids = {params['board']}
+        return Response(search(board_ids, terms, params['limit']))
+
+
 class TaskListCreateAPIView(generics.ListCreateAPIView):
     """
     API view to list all tasks or create a new task.
     Requires user to be authenticated and to be either the board owner or a member.
-    Tasks are annotated with the number of related comments.
+    Tasks carry their stored number of related comments.
     """
     http_method_names = ['post']
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrMember]
 
     def get_queryset(self):
-        return Task.objects.annotate(comments_count=Count('comments'))
+        return Task.objects.all()
 
     def create(self, request, *args, **kwargs):
         # Standardmäßige Validierung & Speicherung
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        task = serializer.save()
+        """The stats row is moved by the post_save handler, in the same transaction"""
+        with transaction.atomic():
+            task = serializer.save()
 
-        # Re-fetch mit Annotation
+        # Re-fetch mit Benutzerprofilen
         task = (
-            Task.objects.annotate(comments_count=Count('comments'))
+            Task.objects
+            .select_related('assignee__userprofile', 'reviewer__userprofile')
             .get(pk=task.pk)
         )
 
@@ -178,66 +404,209 @@ class TaskUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     ]
 
     def get_queryset(self):
-        return Task.objects.annotate(comments_count=Count('comments'))
+        return Task.objects.select_related('assignee__userprofile', 'reviewer__userprofile')
 
     def perform_update(self, serializer):
-        task = self.get_object()
-        board = task.board
         validated_data = serializer.validated_data
+        """Owner and member ids of the task's board, resolved once (and usually cached)"""
+        allowed_user_ids = board_user_ids(serializer.instance.board_id)
 
         assignee = validated_data.get('assignee')
         if assignee:
-            if assignee != board.owner and not board.members.filter(pk=assignee.pk).exists():
+            if assignee.pk not in allowed_user_ids:
                 raise ValidationError({'assignee': 'Assignee must be a member of the board.'})
 
         reviewer = validated_data.get('reviewer')
         if reviewer:
-            if reviewer != board.owner and not board.members.filter(pk=reviewer.pk).exists():
+            if reviewer.pk not in allowed_user_ids:
                 raise ValidationError({'reviewer': 'Reviewer must be a member of the board.'})
 
-        serializer.save()
+        """The stats contribution is moved by the pre_save/post_save handlers, in the same transaction"""
+        with transaction.atomic():
+            serializer.save()
+
+class TaskBulkAPIView(APIView):
+    """
+    API view to create (POST) or update and move (PATCH) many tasks in one request.
+    The body is a list of task objects; PATCH items need an `id` plus the fields to change.
+    All referenced boards, board members and tasks are loaded with one query per model,
+    everything is written in one transaction with bulk_create/bulk_update, and the
+    response holds one result per item in request order. If any item is invalid,
+    nothing is written and the response lists the failing items.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_items = 500
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items(request.data)
+        errors = {}
+        validated = self.validate_items(items, errors, partial=False)
+        self.check_boards_and_users(request, validated, errors)
+        if errors:
+            return self.error_response(errors)
+
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create([Task(**self.model_values(data)) for data in validated])
+            record_tasks_created(tasks)
+            tasks_bulk_written(tasks)
+        return Response({'results': self.results(tasks, status.HTTP_201_CREATED)}, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items(request.data)
+        errors = {}
+        validated = self.validate_items(items, errors, partial=True)
+
+        """Load every task of the request with a single query"""
+        task_ids = [data['id'] for data in validated if data and 'id' in data]
+        existing = Task.objects.in_bulk(task_ids)
+        tasks = [None] * len(validated)
+        seen = set()
+        for index, data in enumerate(validated):
+            if data is None:
+                continue
+            if 'id' not in data:
+                errors[index] = (status.HTTP_400_BAD_REQUEST, {'id': ['This field is required.']})
+            elif data['id'] in seen:
+                errors[index] = (status.HTTP_400_BAD_REQUEST, {'id': ['Task is listed more than once.']})
+            elif data['id'] not in existing:
+                errors[index] = (status.HTTP_404_NOT_FOUND, {'detail': 'Task not found.'})
+            elif not can_access_board(request, existing[data['id']].board_id):
+                errors[index] = (status.HTTP_403_FORBIDDEN, {'detail': 'You are not a member of the task\'s board.'})
+            else:
+                tasks[index] = existing[data['id']]
+                seen.add(data['id'])
+                data.setdefault('board', tasks[index].board_id)
+        self.check_boards_and_users(request, validated, errors)
+        if errors:
+            return self.error_response(errors)
+
+        previous = [(task.board_id, task.status, task.priority) for task in tasks]
+        fields = {'updated_at'}
+        now = timezone.now()
+        for task, data in zip(tasks, validated):
+            for name, value in self.model_values(data).items():
+                setattr(task, name, value)
+                fields.add(name.removesuffix('_id'))
+            task.updated_at = now
+
+        with transaction.atomic():
+            Task.objects.bulk_update(tasks, sorted(fields))
+            record_tasks_updated(list(zip(previous, tasks)))
+            tasks_bulk_written(tasks, {task.pk: before[0] for task, before in zip(tasks, previous)})
+        return Response({'results': self.results(tasks, status.HTTP_200_OK)})
+
+    def get_items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of tasks.']})
+        if len(data) > self.max_items:
+            raise ValidationError({'non_field_errors': [f'At most {self.max_items} tasks per request.']})
+        return data
+
+    def validate_items(self, items, errors, partial):
+        """Run the field validation of every item; no item validation touches the database."""
+        validated = []
+        for index, item in enumerate(items):
+            serializer = TaskBulkItemSerializer(data=item, partial=partial)
+            if serializer.is_valid():
+                validated.append(dict(serializer.validated_data))
+            else:
+                errors[index] = (status.HTTP_400_BAD_REQUEST, serializer.errors)
+                validated.append(None)
+        return validated
+
+    def check_boards_and_users(self, request, validated, errors):
+        """Check board access and that assignees/reviewers belong to their board,
+        resolving all boards and members of the request at once."""
+        pending = [(index, data) for index, data in enumerate(validated) if data is not None and index not in errors]
+        board_users = board_user_ids_many(data['board'] for _, data in pending)
+        for index, data in pending:
+            users = board_users.get(data['board'])
+            if users is None:
+                errors[index] = (status.HTTP_404_NOT_FOUND, {'board': ['Board does not exist.']})
+            elif not can_access_board(request, data['board']):
+                errors[index] = (status.HTTP_403_FORBIDDEN, {'board': ['You are not a member of this board.']})
+            elif data.get('assignee_id') is not None and data['assignee_id'] not in users:
+                errors[index] = (status.HTTP_400_BAD_REQUEST, {'assignee': 'Assignee must be a member of the board.'})
+            elif data.get('reviewer_id') is not None and data['reviewer_id'] not in users:
+                errors[index] = (status.HTTP_400_BAD_REQUEST, {'reviewer': 'Reviewer must be a member of the board.'})
+
+    @staticmethod
+    def model_values(data):
+        values = {key: value for key, value in data.items() if key not in ('id', 'board')}
+        if 'board' in data:
+            values['board_id'] = data['board']
+        return values
+
+    @staticmethod
+    def error_response(errors):
+        return Response({
+            'detail': 'No task was written because some items are invalid.',
+            'results': [
+                {'index': index, 'status': code, 'errors': detail}
+                for index, (code, detail) in sorted(errors.items())
+            ],
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def results(tasks, code):
+        """Serialize the written tasks from one re-fetch, in request order."""
+        fetched = (
+            Task.objects.filter(pk__in=[task.pk for task in tasks])
+            .select_related('assignee__userprofile', 'reviewer__userprofile')
+            .in_bulk()
+        )
+        return [
+            {'index': index, 'status': code, 'task': TaskSerializer(fetched[task.pk]).data}
+            for index, task in enumerate(tasks)
+        ]
+
 
-class TaskAssigneeView(generics.ListAPIView):
+class TaskAssigneeView(ConditionalGetMixin, RowListMixin, generics.ListAPIView):
     """
     API view to list all tasks assigned to the authenticated user.
+    Paginated by (due_date, id) when ?limit= or ?cursor= is given, streamed with ?stream=1; supports conditional GET.
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TaskPagination
+    row_columns = TASK_COLUMNS
+    row_mapper = staticmethod(task_row)
 
     def get_queryset(self):
-        user = self.request.user
-        return (
-            Task.objects
-            .filter(assignee=user)
-            .annotate(comments_count=Count('comments'))
-        )
+        """Rows are read as TASK_COLUMNS, which joins the users and their profiles."""
+        return Task.objects.filter(assignee=self.request.user)
 
 
-class TaskReviewerView(generics.ListAPIView):
+class TaskReviewerView(ConditionalGetMixin, RowListMixin, generics.ListAPIView):
     """
     API view to list all tasks where the authenticated user is a reviewer.
+    Paginated by (due_date, id) when ?limit= or ?cursor= is given, streamed with ?stream=1; supports conditional GET.
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TaskPagination
+    row_columns = TASK_COLUMNS
+    row_mapper = staticmethod(task_row)
 
     def get_queryset(self):
-        user = self.request.user
-        return (
-            Task.objects
-            .filter(reviewer=user)
-            .annotate(comments_count=Count('comments'))
-        )
+        """Rows are read as TASK_COLUMNS, which joins the users and their profiles."""
+        return Task.objects.filter(reviewer=self.request.user)
 
-class CommentListCreateAPIView(generics.ListCreateAPIView):
+class CommentListCreateAPIView(ConditionalGetMixin, RowListMixin, generics.ListCreateAPIView):
     """
     API view to list all comments related to a specific task or create a new comment.
     Permissions allow only board owners or members.
     Comments are ordered by creation date descending.
+    Paginated by (created_at, id) descending when ?limit= or ?cursor= is given, streamed with ?stream=1;
+    supports conditional GET.
     """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsCommentBoardMember]
+    pagination_class = CommentPagination
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    row_columns = COMMENT_COLUMNS
+    row_mapper = staticmethod(comment_row)
 
     def initial(self, request, *args, **kwargs):
         """
@@ -255,9 +624,12 @@ class CommentListCreateAPIView(generics.ListCreateAPIView):
             raise NotFound(detail="Task not found.")
 
     def get_queryset(self):
+        """Rows are read as COMMENT_COLUMNS, which joins the author and their profile."""
         return Comment.objects.filter(task=self.task)
 
+    @transaction.atomic
     def perform_create(self, serializer):
+        """The comment signals bump the task's stored comment counter in the same transaction"""
         serializer.save(author=self.request.user, task=self.task)
 
 
@@ -271,4 +643,9 @@ class CommentDeleteAPIView(generics.DestroyAPIView):
 
     def get_queryset(self):
         task_pk = self.kwargs['task_pk']
-        return Comment.objects.filter(task_id=task_pk)
\ No newline at end of file
+        return Comment.objects.filter(task_id=task_pk)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """The comment signals decrement the task's stored comment counter in the same transaction"""
+        instance.delete()
\ No newline at end of file
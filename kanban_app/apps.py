@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class KanbanAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kanban_app'
+
+    def ready(self):
+        """Connect the signal handlers that keep cached board payloads fresh."""
+        from .api import signals  # noqa: F401
@@ -0,0 +1,56 @@
+"""Helpers shared by the benchmark management commands.
+
+Benchmarks never touch the configured database: they run inside throwaway
+test databases that are created and destroyed the same way the test runner does it.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Create the test databases for the duration of the block and drop them afterwards."""
+    setup_test_environment()
+    old_config = setup_databases(verbosity, interactive=False, aliases=set(connections))
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity)
+        teardown_test_environment()
+
+
+def percentile(ordered, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms):
+    """Reduce a list of millisecond samples to p50/p95/mean."""
+    ordered = sorted(samples_ms)
+    return {
+        'p50': round(percentile(ordered, 50), 3),
+        'p95': round(percentile(ordered, 95), 3),
+        'mean': round(statistics.fmean(ordered), 3) if ordered else 0.0,
+    }
+
+
+def time_calls(func, iterations):
+    """Call func `iterations` times and return the latency summary in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
@@ -0,0 +1,263 @@
+import datetime
+import gc
+import io
+import itertools
+import json
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from auth_app.api import urls as auth_urls
+from kanban_app.api import urls as kanban_urls
+from kanban_app.api.models import Board, Comment, Task
+from kanban_app.api.transfer import export_board_lines
+from kanban_app.benchmarking import benchmark_database, summarize
+
+# Dataset sizes, passed on to seed_data.
+SIZES = {
+    'small': {'users': 20, 'boards': 10, 'tasks': 200, 'comments': 400},
+    'medium': {'users': 200, 'boards': 100, 'tasks': 10000, 'comments': 40000},
+    'large': {'users': 1000, 'boards': 500, 'tasks': 100000, 'comments': 400000},
+}
+
+# Routes that cannot be measured with the test client, with the reason.
+SKIPPED_ROUTES = {
+    'board-events': 'Server-Sent Events stream, needs an ASGI server',
+}
+
+# Tasks per bulk request.
+BULK_SIZE = 50
+
+
+class Fixture:
+    """
+    The objects the benchmark requests act on: the owner of the board with the
+    most tasks (so list endpoints return as much as possible), that board, another
+    member and its most commented task. Writes go through the same user.
+    """
+
+    def __init__(self, password):
+        self.password = password
+        self.board = Board.objects.annotate(task_total=Count('tasks')).order_by('-task_total', 'pk').first()
+        self.user = self.board.owner
+        self.member = self.board.members.exclude(pk=self.user.pk).first() or self.user
+        self.task = self.board.tasks.annotate(comment_total=Count('comments')).order_by('-comment_total', 'pk').first()
+        self.bulk_ids = list(self.board.tasks.order_by('pk').values_list('pk', flat=True)[:BULK_SIZE])
+        self.counter = itertools.count()
+        self.client = APIClient()
+        token, _ = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.export = ''.join(export_board_lines(Board.objects.filter(pk=self.board.pk))).encode()
+
+    def next(self):
+        return next(self.counter)
+
+    def task_data(self):
+        return {
+            'board': self.board.pk, 'title': f'Benchmark {self.next()}', 'description': 'Benchmark',
+            'status': 'to-do', 'priority': 'medium', 'assignee_id': self.user.pk, 'reviewer_id': self.member.pk,
+        }
+
+    def new_board(self):
+        return Board.objects.create(title='Benchmark', owner=self.user)
+
+    def new_task(self):
+        return Task.objects.create(
+            board=self.board, title='Benchmark', description='', status='to-do', priority='low', assignee=self.user,
+        )
+
+    def new_comment(self):
+        return Comment.objects.create(task=self.task, author=self.user, content='Benchmark')
+
+
+class Case:
+    """One benchmarked request. prepare(fixture) runs before every call, outside the
+    measurement, and returns the path plus keyword arguments for the client method."""
+
+    def __init__(self, route, method, prepare, label='', max_iterations=None):
+        self.route = route
+        self.method = method
+        self.prepare = prepare
+        self.key = f'{method} {route}{f" ({label})" if label else ""}'
+        self.max_iterations = max_iterations
+
+
+def json_body(data):
+    return {'data': data, 'format': 'json'}
+
+
+# The benchmarked requests. Password hashing dominates login and registration, so they run fewer iterations.
+CASES = [
+    Case('user-register', 'POST', lambda fx: ('/api/registration/', json_body({
+        'fullname': 'Bench User', 'email': f'bench-register-{fx.next()}@example.com',
+        'password': 'benchmark', 'repeated_password': 'benchmark',
+    })), max_iterations=5),
+    Case('user-login', 'POST', lambda fx: ('/api/login/', json_body({
+        'email': fx.user.email, 'password': fx.password,
+    })), max_iterations=5),
+    Case('boards', 'GET', lambda fx: ('/api/boards/', {})),
+    Case('boards', 'POST', lambda fx: ('/api/boards/', json_body({
+        'title': 'Benchmark', 'members': list(fx.board.members.values_list('pk', flat=True)[:5]),
+    }))),
+    Case('board-details', 'GET', lambda fx: (f'/api/boards/{fx.board.pk}/', {})),
+    Case('board-details', 'PATCH', lambda fx: (f'/api/boards/{fx.board.pk}/', json_body({
+        'title': f'Benchmark {fx.next()}',
+    }))),
+    Case('board-details', 'DELETE', lambda fx: (f'/api/boards/{fx.new_board().pk}/', {})),
+    Case('board-changes', 'GET', lambda fx: (f'/api/boards/{fx.board.pk}/changes/', {}), label='snapshot'),
+    Case('boards-export', 'GET', lambda fx: (f'/api/boards/export/?ids={fx.board.pk}', {})),
+    Case('boards-import', 'POST', lambda fx: ('/api/boards/import/', {
+        'data': fx.export, 'content_type': 'application/x-ndjson',
+    })),
+    Case('email-check', 'GET', lambda fx: (f'/api/email-check/?email={fx.member.email}', {})),
+    Case('tasks', 'POST', lambda fx: ('/api/tasks/', json_body(fx.task_data()))),
+    Case('tasks-bulk', 'POST', lambda fx: ('/api/tasks/bulk/', json_body(
+        [fx.task_data() for _ in range(BULK_SIZE)]
+    ))),
+    Case('tasks-bulk', 'PATCH', lambda fx: ('/api/tasks/bulk/', json_body(
+        [{'id': pk, 'status': ('done', 'review')[fx.next() % 2]} for pk in fx.bulk_ids]
+    ))),
+    Case('task-update-destroy', 'PATCH', lambda fx: (f'/api/tasks/{fx.task.pk}/', json_body({
+        'status': ('done', 'review')[fx.next() % 2],
+    }))),
+    Case('task-update-destroy', 'DELETE', lambda fx: (f'/api/tasks/{fx.new_task().pk}/', {})),
+    Case('tasks-assigned-to-me', 'GET', lambda fx: ('/api/tasks/assigned-to-me/', {})),
+    Case('tasks-reviewing-to-me', 'GET', lambda fx: ('/api/tasks/reviewing/', {})),
+    Case('comments', 'GET', lambda fx: (f'/api/tasks/{fx.task.pk}/comments/', {})),
+    Case('comments', 'POST', lambda fx: (f'/api/tasks/{fx.task.pk}/comments/', json_body({'content': 'Benchmark'}))),
+    Case('comments-delete', 'DELETE', lambda fx: (
+        f'/api/tasks/{fx.task.pk}/comments/{fx.new_comment().pk}/', {}
+    )),
+    Case('search', 'GET', lambda fx: ('/api/search/', {'data': {'q': fx.task.title.split()[0]}})),
+]
+
+
+class Command(BaseCommand):
+    """
+    Run every API route against seeded datasets and record p50/p95 latency, the
+    number of queries and the response size per endpoint. Results can be written as
+    JSON and compared with a saved baseline: the command fails when an endpoint issues
+    more queries than before or its p95 latency or response size grew beyond the tolerance.
+    Runs against a throwaway test database.
+    """
+    help = 'Benchmark all API endpoints with query count and latency budgets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', action='append', choices=list(SIZES), help='Repeatable, default: small.')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare against the results in this JSON file.')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed relative p95 growth.')
+        parser.add_argument('--latency-floor', type=float, default=2.0,
+                            help='p95 growth in ms that is always tolerated (timer noise).')
+        parser.add_argument('--bytes-tolerance', type=float, default=0.1, help='Allowed relative size growth.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        self.check_coverage()
+        report = {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'iterations': options['iterations'],
+            'seed': options['seed'],
+            'results': {},
+        }
+        for size in options['size'] or ['small']:
+            with benchmark_database():
+                call_command('seed_data', seed=options['seed'], stdout=io.StringIO(), **SIZES[size])
+                fixture = Fixture(password='seedpassword')
+                report['results'][size] = self.run_cases(fixture, size, options)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        failures = [
+            f"{size} {key}: {result['error']}"
+            for size, results in report['results'].items()
+            for key, result in results.items() if 'error' in result
+        ]
+        if baseline:
+            failures += self.compare(report, baseline, options)
+        if failures:
+            raise CommandError('Budget exceeded:\n  ' + '\n  '.join(failures))
+
+    def check_coverage(self):
+        """Warn about routes that have neither a case nor a reason to be skipped."""
+        routes = {pattern.name for pattern in kanban_urls.urlpatterns + auth_urls.urlpatterns}
+        covered = {case.route for case in CASES} | set(SKIPPED_ROUTES)
+        for route in sorted(routes - covered):
+            self.stderr.write(f"Route '{route}' has no benchmark case.")
+        for route, reason in SKIPPED_ROUTES.items():
+            self.stdout.write(f"Skipping {route}: {reason}.")
+
+    def run_cases(self, fixture, size, options):
+        self.stdout.write(f"\n{size}: {SIZES[size]}")
+        self.stdout.write(f"{'endpoint':<42} {'p50':>9} {'p95':>9} {'queries':>8} {'bytes':>10}")
+        results = {}
+        for case in CASES:
+            """Each case starts from a cold cache and without garbage left by the previous one."""
+            cache.clear()
+            gc.collect()
+            iterations = min(options['iterations'], case.max_iterations or options['iterations'])
+            result = self.measure(fixture, case, options['warmup'], iterations)
+            results[case.key] = result
+            self.stdout.write(
+                f"{case.key:<42} {result['p50']:>7.2f}ms {result['p95']:>7.2f}ms "
+                f"{result['queries']:>8} {result['bytes']:>10}"
+                + (f"  {result['error']}" if 'error' in result else '')
+            )
+        return results
+
+    def measure(self, fixture, case, warmup, iterations):
+        """Time the request including reading a streamed body; queries is the maximum seen."""
+        samples, queries, size, status = [], 0, 0, None
+        for number in range(warmup + iterations):
+            path, kwargs = case.prepare(fixture)
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = getattr(fixture.client, case.method.lower())(path, **kwargs)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = (time.perf_counter() - start) * 1000
+            status = response.status_code
+            if number >= warmup:
+                samples.append(elapsed)
+                queries = max(queries, len(context.captured_queries))
+                size = len(body)
+        result = {**summarize(samples), 'queries': queries, 'bytes': size, 'status': status}
+        if not 200 <= status < 300:
+            result['error'] = f'unexpected status {status}'
+        return result
+
+    def compare(self, report, baseline, options):
+        """Return a description of every budget the current results exceed."""
+        failures = []
+        for size, results in report['results'].items():
+            previous = baseline.get('results', {}).get(size, {})
+            for key, result in results.items():
+                before = previous.get(key)
+                if not before:
+                    continue
+                if result['queries'] > before['queries']:
+                    failures.append(f"{size} {key}: {result['queries']} queries, baseline {before['queries']}")
+                allowed = max(before['p95'] * (1 + options['latency_tolerance']), before['p95'] + options['latency_floor'])
+                if result['p95'] > allowed:
+                    failures.append(f"{size} {key}: p95 {result['p95']:.2f}ms, budget {allowed:.2f}ms")
+                if result['bytes'] > before['bytes'] * (1 + options['bytes_tolerance']):
+                    failures.append(f"{size} {key}: {result['bytes']} bytes, baseline {before['bytes']}")
+        if not failures:
+            self.stdout.write(self.style.SUCCESS('All endpoints are within the baseline budgets.'))
+        return failures
@@ -0,0 +1,78 @@
+import itertools
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from rest_framework.test import APIClient
+
+from kanban_app.api.models import Board, Task, User
+from kanban_app.api.stats import rebuild_board_stats
+from kanban_app.benchmarking import benchmark_database, time_calls
+
+
+class Command(BaseCommand):
+    """
+    Seed boards of growing size and measure GET /api/boards/ for a user owning one of them.
+    The legacy members x tasks join is timed next to the endpoint for comparison.
+    Runs against a throwaway test database.
+    """
+    help = 'Benchmark the board dashboard list against growing board sizes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='5:100,20:500,50:2000',
+            help='Comma separated members:tasks pairs, one board per pair.'
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [tuple(int(n) for n in pair.split(':')) for pair in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must look like "5:100,20:500".')
+
+        with benchmark_database():
+            password = make_password('benchmark')
+            counter = itertools.count()
+            self.stdout.write(f"{'members':>8} {'tasks':>8} {'endpoint p50':>13} {'p95':>9} {'legacy p50':>11}")
+            for member_total, task_total in sizes:
+                owner, board = self.seed_board(member_total, task_total, password, counter)
+                client = APIClient()
+                client.force_authenticate(owner)
+                endpoint = time_calls(lambda: client.get('/api/boards/'), options['iterations'])
+                legacy = time_calls(lambda: list(self.legacy_queryset(owner)), options['iterations'])
+                self.stdout.write(
+                    f"{member_total:>8} {task_total:>8} {endpoint['p50']:>11.2f}ms "
+                    f"{endpoint['p95']:>7.2f}ms {legacy['p50']:>9.2f}ms"
+                )
+
+    def seed_board(self, member_total, task_total, password, counter):
+        """Create one owner, `member_total` members and a board holding `task_total` tasks."""
+        users = User.objects.bulk_create([
+            User(username=f'bench-{n}', email=f'bench-{n}@example.com', password=password)
+            for n in itertools.islice(counter, member_total + 1)
+        ])
+        owner, members = users[0], users[1:]
+        board = Board.objects.create(title=f'{member_total}x{task_total}', owner=owner)
+        board.members.add(owner, *members)
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+        Task.objects.bulk_create([
+            Task(
+                board=board, title=f'Task {n}', description='',
+                status=statuses[n % len(statuses)], priority=priorities[n % len(priorities)],
+                assignee=users[n % len(users)],
+            )
+            for n in range(task_total)
+        ], batch_size=1000)
+        rebuild_board_stats([board.pk])
+        return owner, board
+
+    def legacy_queryset(self, user):
+        """The former dashboard query: four distinct counts over a members x tasks join."""
+        return Board.objects.filter(Q(owner=user) | Q(members=user)).annotate(
+            member_count=Count('members', distinct=True),
+            ticket_count=Count('tasks', distinct=True),
+            tasks_to_do_count=Count('tasks', filter=Q(tasks__status='to-do'), distinct=True),
+            tasks_high_prio_count=Count('tasks', filter=Q(tasks__priority='high'), distinct=True),
+        )
@@ -0,0 +1,96 @@
+import itertools
+import json
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from auth_app.api.models import UserProfile
+from kanban_app.api.models import Board, Task, User
+from kanban_app.api.payloads import board_detail_payload
+from kanban_app.api.renderers import OrjsonRenderer, orjson
+from kanban_app.api.serializers import BoardSingleSerializer
+from kanban_app.api.views import BoardSingleView
+from kanban_app.benchmarking import benchmark_database, time_calls
+
+
+class Command(BaseCommand):
+    """
+    Measure building and rendering the board detail payload of one large board: the
+    prefetching queryset with BoardSingleSerializer against board_detail_payload(), and
+    DRF's JSONRenderer against OrjsonRenderer. All four combinations must render the
+    same bytes, otherwise the command fails. Runs against a throwaway test database.
+    """
+    help = 'Benchmark serializing and rendering the board detail payload of a large board.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000)
+        parser.add_argument('--members', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write('orjson is not installed; OrjsonRenderer falls back to JSONRenderer.')
+
+        with benchmark_database():
+            board = self.seed_board(options['members'], options['tasks'])
+            builders = {
+                'serializer': lambda: BoardSingleSerializer(BoardSingleView().get_detail_queryset().get(pk=board.pk)).data,
+                'compiled': lambda: board_detail_payload(board.pk),
+            }
+            renderers = {'json': JSONRenderer(), 'orjson': OrjsonRenderer()}
+            payload = builders['serializer']()
+            expected = renderers['json'].render(payload)
+            for (build_name, build), (render_name, renderer) in itertools.product(builders.items(), renderers.items()):
+                if renderer.render(build()) != expected:
+                    raise CommandError(f'{build_name} rendered by {render_name} differs from the serializer output.')
+
+            results = {
+                **{f'build {name}': time_calls(build, options['iterations']) for name, build in builders.items()},
+                **{
+                    f'render {name}': time_calls(lambda: renderer.render(payload), options['iterations'])
+                    for name, renderer in renderers.items()
+                },
+                'serializer + json': time_calls(
+                    lambda: renderers['json'].render(builders['serializer']()), options['iterations'],
+                ),
+                'compiled + orjson': time_calls(
+                    lambda: renderers['orjson'].render(builders['compiled']()), options['iterations'],
+                ),
+            }
+
+        self.stdout.write(f"{options['tasks']} tasks, {options['members']} members, {len(expected)} bytes")
+        self.stdout.write(f"{'stage':<20} {'p50':>10} {'p95':>10}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:<20} {result['p50']:>8.2f}ms {result['p95']:>8.2f}ms")
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+    @staticmethod
+    def seed_board(member_total, task_total):
+        """Members with profiles (one without, and non-ASCII names), tasks with and without reviewers."""
+        password = make_password('benchmark')
+        users = User.objects.bulk_create([
+            User(username=f'payload-{n}', email=f'payload-{n}@example.com', password=password)
+            for n in range(member_total + 1)
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, fullname=f'Jürgen Müller {n}') for n, user in enumerate(users[1:])
+        ])
+        board = Board.objects.create(title='Großes Board', owner=users[0])
+        board.members.add(*users)
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+        Task.objects.bulk_create([
+            Task(
+                board=board, title=f'Task {n}', description=f'Beschreibung {n}',
+                status=statuses[n % len(statuses)], priority=priorities[n % len(priorities)],
+                assignee=users[n % len(users)], reviewer=users[(n * 7) % len(users)] if n % 3 else None,
+                comments_count=n % 5,
+            )
+            for n in range(task_total)
+        ], batch_size=1000)
+        return board
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from auth_app.api.models import UserProfile
+from kanban_app.api.models import Board, User
+from kanban_app.benchmarking import benchmark_database
+
+
+class Command(BaseCommand):
+    """
+    Compare N single-task requests against one bulk request, for creating tasks
+    and for moving them to another column. Requests go through token
+    authentication like real clients. Runs against a throwaway test database.
+    """
+    help = 'Benchmark the bulk task API against one request per task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Tasks per run.')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        with benchmark_database():
+            client, board, user = self.setup_board()
+
+            def task(number):
+                return {
+                    'board': board.pk, 'title': f'Task {number}', 'description': 'Benchmark',
+                    'status': 'to-do', 'priority': 'medium', 'assignee_id': user.pk,
+                }
+
+            single_ids = []
+            single_create = self.timed(lambda: single_ids.extend(
+                client.post('/api/tasks/', task(number), format='json').data['id'] for number in range(count)
+            ))
+            bulk_ids = []
+            bulk_create = self.timed(lambda: bulk_ids.extend(
+                item['task']['id']
+                for item in client.post('/api/tasks/bulk/', [task(n) for n in range(count)], format='json').data['results']
+            ))
+            single_move = self.timed(lambda: [
+                client.patch(f'/api/tasks/{pk}/', {'status': 'done'}, format='json') for pk in single_ids
+            ])
+            bulk_move = self.timed(lambda: client.patch(
+                '/api/tasks/bulk/', [{'id': pk, 'status': 'done'} for pk in bulk_ids], format='json'
+            ))
+
+        self.stdout.write(f"{'operation':<10} {'single requests':>18} {'bulk request':>16} {'speedup':>9}")
+        for name, single, bulk in [('create', single_create, bulk_create), ('move', single_move, bulk_move)]:
+            self.stdout.write(
+                f"{name:<10} {count / single:>12.0f} tasks/s {count / bulk:>10.0f} tasks/s {single / bulk:>8.1f}x"
+            )
+
+    def setup_board(self):
+        user = User.objects.create_user(username='bench@example.com', email='bench@example.com')
+        UserProfile.objects.create(user=user, fullname='Bench User')
+        board = Board.objects.create(title='Bulk benchmark', owner=user)
+        board.members.add(user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+        return client, board, user
+
+    @staticmethod
+    def timed(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
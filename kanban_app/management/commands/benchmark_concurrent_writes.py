@@ -0,0 +1,183 @@
+import copy
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from kanban_app.api.models import Board, BoardStats, Task, User
+from kanban_app.benchmarking import benchmark_database, summarize
+
+# SQLite connection profiles compared by default: SQLite's own defaults with a new
+# connection per request (the old settings), and the tuned profile from core.settings.
+SQLITE_PROFILES = {
+    'sqlite-default': {'CONN_MAX_AGE': 0, 'OPTIONS': {}},
+    'sqlite-tuned': {'CONN_MAX_AGE': 60, 'OPTIONS': settings.SQLITE_OPTIONS},
+}
+
+
+class Worker(threading.Thread):
+    """
+    Issue requests against one database alias until the deadline. A write creates a
+    task and bumps its board's counters in one transaction, like POST /api/tasks/
+    (bulk_create keeps the model signals, which write to the default database, out of it);
+    a read lists the tasks of a board. After every request the connection is closed
+    or kept exactly as Django does at the end of a request (CONN_MAX_AGE).
+    """
+
+    def __init__(self, alias, board_ids, user_ids, deadline, write, seed):
+        super().__init__()
+        self.alias = alias
+        self.board_ids = board_ids
+        self.user_ids = user_ids
+        self.deadline = deadline
+        self.write = write
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.errors = 0
+
+    def run(self):
+        connection = connections[self.alias]
+        try:
+            while time.perf_counter() < self.deadline:
+                start = time.perf_counter()
+                try:
+                    self.write_task() if self.write else self.read_tasks()
+                except OperationalError:
+                    self.errors += 1
+                else:
+                    self.samples.append((time.perf_counter() - start) * 1000)
+                connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+    def write_task(self):
+        board_id = self.rng.choice(self.board_ids)
+        with transaction.atomic(using=self.alias):
+            Task.objects.using(self.alias).bulk_create([Task(
+                board_id=board_id, title='Benchmark', description='', status='to-do', priority='low',
+                assignee_id=self.rng.choice(self.user_ids),
+            )])
+            BoardStats.objects.using(self.alias).filter(board_id=board_id).update(
+                ticket_count=F('ticket_count') + 1, to_do_count=F('to_do_count') + 1,
+                low_priority_count=F('low_priority_count') + 1,
+            )
+
+    def read_tasks(self):
+        list(Task.objects.using(self.alias).filter(board_id=self.rng.choice(self.board_ids)).order_by('-pk')[:50])
+
+
+class Command(BaseCommand):
+    """
+    Measure write throughput with concurrent writers (and optional readers) per database
+    profile. The SQLite profiles run on temporary database files; with PostgreSQL
+    configured, --configured adds a run against a throwaway test database created from
+    the active settings (pool and persistent connections included).
+    """
+    help = 'Compare database profiles under concurrent writers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', choices=list(SQLITE_PROFILES),
+                            help='Repeatable, default: all SQLite profiles.')
+        parser.add_argument('--configured', action='store_true', help='Also run against the configured database.')
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile.')
+        parser.add_argument('--boards', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if options['configured'] and connections['default'].vendor == 'sqlite':
+            raise CommandError('--configured needs a server database; SQLite test databases live in memory.')
+
+        results = {}
+        self.stdout.write(
+            f"{options['writers']} writers, {options['readers']} readers, {options['duration']:.0f}s per profile"
+        )
+        self.stdout.write(
+            f"{'profile':<16} {'writes/s':>9} {'reads/s':>9} {'write p50':>10} {'write p95':>10} {'errors':>7}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name in options['profile'] or list(SQLITE_PROFILES):
+                alias = self.add_sqlite_alias(name, os.path.join(directory, f'{name}.sqlite3'))
+                results[name] = self.run_profile(name, alias, options)
+        if options['configured']:
+            with benchmark_database():
+                results['configured'] = self.run_profile('configured', 'default', options)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+    @staticmethod
+    def add_sqlite_alias(name, path):
+        """Register a database alias for the profile next to the configured ones."""
+        alias = f'benchmark-{name}'
+        profile = SQLITE_PROFILES[name]
+        connections.settings[alias] = {
+            **copy.deepcopy(settings.DATABASES['default']),
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'ATOMIC_REQUESTS': False,
+            'AUTOCOMMIT': True,
+            'CONN_HEALTH_CHECKS': False,
+            'TIME_ZONE': None,
+            'TEST': {},
+            **copy.deepcopy(profile),
+        }
+        return alias
+
+    def run_profile(self, name, alias, options):
+        call_command('migrate', database=alias, verbosity=0)
+        board_ids, user_ids = self.seed(alias, options['boards'])
+        connections[alias].close()
+
+        deadline = time.perf_counter() + options['duration']
+        workers = [
+            Worker(alias, board_ids, user_ids, deadline, write=number < options['writers'], seed=options['seed'] + number)
+            for number in range(options['writers'] + options['readers'])
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        writes = [sample for worker in workers if worker.write for sample in worker.samples]
+        reads = sum(len(worker.samples) for worker in workers if not worker.write)
+        result = {
+            'writes_per_second': round(len(writes) / elapsed, 1),
+            'reads_per_second': round(reads / elapsed, 1),
+            'write_latency': summarize(writes),
+            'errors': sum(worker.errors for worker in workers),
+        }
+        self.stdout.write(
+            f"{name:<16} {result['writes_per_second']:>9.0f} {result['reads_per_second']:>9.0f} "
+            f"{result['write_latency']['p50']:>8.2f}ms {result['write_latency']['p95']:>8.2f}ms {result['errors']:>7}"
+        )
+        return result
+
+    @staticmethod
+    def seed(alias, board_count):
+        """One user per board owning it, and the counters rows the writers update."""
+        password = make_password(None)
+        users = User.objects.using(alias).bulk_create([
+            User(username=f'writer-{number}@example.com', email=f'writer-{number}@example.com', password=password)
+            for number in range(board_count)
+        ])
+        boards = Board.objects.using(alias).bulk_create([
+            Board(title=f'Board {number}', owner=user) for number, user in enumerate(users)
+        ])
+        BoardStats.objects.using(alias).bulk_create([BoardStats(board=board, member_count=1) for board in boards])
+        return [board.pk for board in boards], [user.pk for user in users]
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.settings import api_settings
+
+from auth_app.api.models import UserProfile
+from kanban_app.api.models import Board, Comment, Task, User
+from kanban_app.api.payloads import json_array_chunks
+from kanban_app.api.views import CommentListCreateAPIView, TaskAssigneeView
+from kanban_app.benchmarking import benchmark_database
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Per list endpoint: the queryset it serialized before, and its view, which now maps value rows.
+LISTS = {
+    'tasks-assigned-to-me': (
+        lambda user, task: Task.objects.filter(assignee=user).select_related('assignee__userprofile', 'reviewer__userprofile'),
+        TaskAssigneeView,
+    ),
+    'comments': (
+        lambda user, task: Comment.objects.filter(task=task).select_related('author__userprofile'),
+        CommentListCreateAPIView,
+    ),
+}
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure_in_child(func):
+    """
+    Run func() in a forked child, consuming the response chunks it returns as a server
+    would, and return how far it pushed the child's peak RSS above the size it started
+    with, its duration and the time until the first chunk. Each measurement gets a fresh
+    process, since a process' peak RSS never goes down. The in-memory test database is inherited.
+    """
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        try:
+            baseline = peak_rss_kb()
+            start = time.perf_counter()
+            digest, size, first_chunk = hashlib.sha256(), 0, None
+            for chunk in func():
+                first_chunk = first_chunk or time.perf_counter() - start
+                digest.update(chunk)
+                size += len(chunk)
+            result = {
+                'peak_rss_mb': round((peak_rss_kb() - baseline) / 1024, 1),
+                'seconds': round(time.perf_counter() - start, 3),
+                'first_byte_seconds': round(first_chunk, 3),
+                'bytes': size,
+                'digest': digest.hexdigest(),
+            }
+        except Exception as error:
+            result = {'error': repr(error)}
+        with os.fdopen(write_end, 'w') as pipe:
+            json.dump(result, pipe)
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        result = json.load(pipe)
+    os.waitpid(pid, 0)
+    if 'error' in result:
+        raise CommandError(result['error'])
+    return result
+
+
+class Command(BaseCommand):
+    """
+    Compare the peak memory of rendering the task and comment lists from model instances
+    through their serializers (every task, comment, user and profile column loaded), from
+    the value rows the list endpoints use now, and streamed as with ?stream=1, each over
+    --rows rows and with the configured JSON renderer. All must render the same bytes.
+    Every measurement runs in its own forked process, so this needs a POSIX system.
+    Runs against a throwaway test database.
+    """
+    help = 'Measure peak RSS of large list responses: serialized, built from value rows and streamed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if resource is None or not hasattr(os, 'fork'):
+            raise CommandError('benchmark_list_memory needs os.fork() and the resource module.')
+
+        results = {}
+        with benchmark_database():
+            user, task = self.seed(options['rows'])
+            self.stdout.write(f"{options['rows']} rows per list")
+            self.stdout.write(f"{'list':<22} {'build':<10} {'peak RSS':>10} {'time':>8} {'first byte':>11} {'size':>10}")
+            renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+            for name, (hydrated_queryset, view_class) in LISTS.items():
+                hydrated = hydrated_queryset(user, task).order_by('pk')
+                rows = hydrated.values_list(*view_class.row_columns, named=True)
+                builds = {
+                    'hydrated': lambda: [renderer.render(view_class.serializer_class(hydrated, many=True).data)],
+                    'rows': lambda: [renderer.render([view_class.row_mapper(row) for row in rows])],
+                    'streamed': lambda: json_array_chunks(rows, view_class.row_mapper, renderer),
+                }
+                measured = {}
+                for mode, build in builds.items():
+                    measured[mode] = measure_in_child(build)
+                    self.stdout.write(
+                        f"{name:<22} {mode:<10} {measured[mode]['peak_rss_mb']:>8.1f}MB "
+                        f"{measured[mode]['seconds']:>7.2f}s {measured[mode]['first_byte_seconds']:>10.3f}s "
+                        f"{measured[mode]['bytes']:>10}"
+                    )
+                digests = {result.pop('digest') for result in measured.values()}
+                if len(digests) != 1:
+                    raise CommandError(f'The {name} list renders differently per build.')
+                results[name] = measured
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+    @staticmethod
+    def seed(rows):
+        """One user assigned `rows` tasks reviewed by a second user, and `rows` comments on one task."""
+        password = make_password('benchmark')
+        user, reviewer = User.objects.bulk_create([
+            User(username=f'memory-{n}', email=f'memory-{n}@example.com', password=password) for n in range(2)
+        ])
+        UserProfile.objects.bulk_create([UserProfile(user=user, fullname='Memory Benchmark')])
+        board = Board.objects.create(title='Memory', owner=user)
+        Task.objects.bulk_create([
+            Task(
+                board=board, title=f'Task {n}', description='Description', status='to-do', priority='low',
+                assignee=user, reviewer=reviewer if n % 2 else None,
+            )
+            for n in range(rows)
+        ], batch_size=5000)
+        task = Task.objects.filter(board=board).first()
+        Comment.objects.bulk_create([
+            Comment(task=task, author=user if n % 2 else reviewer, content=f'Comment {n}') for n in range(rows)
+        ], batch_size=5000)
+        return user, task
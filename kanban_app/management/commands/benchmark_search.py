@@ -0,0 +1,171 @@
+import itertools
+import json
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from kanban_app.api.models import Board, Comment, Task, User
+from kanban_app.api.search import create_search_schema, drop_search_schema, search
+from kanban_app.api.transfer import insert_rows
+from kanban_app.benchmarking import benchmark_database, time_calls
+
+# Syllables the pseudo words of the generated texts are built from.
+SYLLABLES = ['ka', 'no', 'mi', 'ru', 'te', 'sa', 'lo', 'ven', 'dor', 'tis', 'bar', 'gel', 'pu', 'qua', 'zer', 'fin']
+
+
+def vocabulary(rng, size):
+    """`size` distinct pseudo words of two to four syllables."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    """
+    Measure full-text search over millions of tasks and comments. The texts are drawn
+    from a pseudo word vocabulary with Zipf distributed frequencies, so there are
+    terms found in a large share of all rows and terms found in a handful. The
+    searching user owns --user-boards of the --boards boards. The queries cover the
+    most frequent term, a medium and a rare one, prefixes of two, three and more
+    letters and combinations, each through search() over the user's boards and over
+    all other boards (the two ways SQLite restricts the boards), and one through the API.
+    The search index is built after the rows are inserted (like rebuild_search_index),
+    the build time is reported. Fails when a p95 exceeds --budget-ms.
+    Runs against a throwaway test database.
+    """
+    help = 'Benchmark full-text search over tasks and comments at scale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--boards', type=int, default=1000)
+        parser.add_argument('--user-boards', type=int, default=10)
+        parser.add_argument('--words', type=int, default=20_000, help='Size of the vocabulary.')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--budget-ms', type=float, default=50.0)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=20_000)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if options['user_boards'] > options['boards']:
+            raise CommandError('--user-boards cannot exceed --boards.')
+        self.rng = random.Random(options['seed'])
+        words = vocabulary(self.rng, options['words'])
+        self.words = words
+        self.weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+        with benchmark_database():
+            connection = connections[Task.objects.db]
+            if connection.vendor not in ('sqlite', 'postgresql'):
+                raise CommandError(f'Search is not supported on {connection.vendor}.')
+            user, board_ids = self.seed(options)
+            start = time.perf_counter()
+            with transaction.atomic():
+                drop_search_schema(connection)
+                create_search_schema(connection)
+            self.stdout.write(f'Search index built in {time.perf_counter() - start:.1f}s')
+
+            common, medium, rare = words[0], words[len(words) // 20], words[-1]
+            queries = {
+                'common term': [common],
+                'medium term': [medium],
+                'rare term': [rare],
+                '2 letter prefix': [common[:2]],
+                '3 letter prefix': [medium[:3]],
+                'longer prefix': [common[:-1]],
+                'common + medium': [common, medium],
+                'three terms': [common, words[1][:3], medium],
+            }
+            limit = options['limit']
+            scopes = {'own': board_ids, 'others': set(Board.objects.exclude(owner=user).values_list('pk', flat=True))}
+            results = {}
+            for (name, terms), (scope, boards) in itertools.product(queries.items(), scopes.items()):
+                if not boards:
+                    continue
+                results[f'{name}, {scope}'] = {
+                    'terms': terms,
+                    'hits': len(search(boards, terms, limit)),
+                    **time_calls(lambda: search(boards, terms, limit), options['iterations']),
+                }
+
+            client = APIClient()
+            client.force_authenticate(user)
+            query = f'{common} {medium[:3]}'
+            if client.get('/api/search/', {'q': query}).status_code != 200:
+                raise CommandError('The search endpoint did not answer with 200.')
+            results['api request, own'] = {
+                'terms': query.split(),
+                'hits': len(client.get('/api/search/', {'q': query}).json()),
+                **time_calls(lambda: client.get('/api/search/', {'q': query}), options['iterations']),
+            }
+
+        self.stdout.write(
+            f"{options['tasks']} tasks, {options['comments']} comments on {options['boards']} boards, "
+            f"searching the {options['user_boards']} own boards of the user and the others, limit {limit}"
+        )
+        self.stdout.write(f"{'query':<26} {'terms':<28} {'hits':>5} {'p50':>10} {'p95':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<26} {' '.join(result['terms']):<28} {result['hits']:>5} "
+                f"{result['p50']:>8.2f}ms {result['p95']:>8.2f}ms"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        over_budget = [name for name, result in results.items() if result['p95'] > options['budget_ms']]
+        if over_budget:
+            raise CommandError(f"p95 above {options['budget_ms']}ms: {', '.join(over_budget)}")
+
+    def text(self, word_count):
+        return ' '.join(self.rng.choices(self.words, cum_weights=self.weights, k=word_count)).capitalize()
+
+    def seed(self, options):
+        """
+        The searching user owns the first --user-boards boards, a second user the rest.
+        Tasks are spread evenly over the boards and comments over the tasks; both are
+        written with insert_rows and explicit ids, without search triggers.
+        """
+        password = make_password('benchmark')
+        user, other = User.objects.bulk_create([
+            User(username=f'search-{n}', email=f'search-{n}@example.com', password=password) for n in range(2)
+        ])
+        boards = Board.objects.bulk_create([
+            Board(title=f'Board {n}', owner=user if n < options['user_boards'] else other)
+            for n in range(options['boards'])
+        ])
+        board_ids = [board.pk for board in boards]
+        drop_search_schema(connections[Task.objects.db])
+
+        today, now = timezone.localdate(), timezone.now()
+        batch_size = options['batch_size']
+        for start in range(0, options['tasks'], batch_size):
+            with transaction.atomic():
+                insert_rows(Task, [
+                    {
+                        'id': pk, 'board_id': board_ids[pk % len(board_ids)], 'title': self.text(4),
+                        'description': self.text(20)[:255], 'status': 'to-do', 'priority': 'low',
+                        'due_date': today, 'assignee_id': user.pk, 'reviewer_id': None,
+                        'comments_count': 0, 'updated_at': now,
+                    }
+                    for pk in range(start + 1, min(start + batch_size, options['tasks']) + 1)
+                ])
+        for start in range(0, options['comments'], batch_size):
+            with transaction.atomic():
+                insert_rows(Comment, [
+                    {
+                        'id': pk, 'task_id': pk % options['tasks'] + 1, 'author_id': user.pk,
+                        'content': self.text(12), 'created_at': now, 'updated_at': now,
+                    }
+                    for pk in range(start + 1, min(start + batch_size, options['comments']) + 1)
+                ])
+        return user, set(board_ids[:options['user_boards']])
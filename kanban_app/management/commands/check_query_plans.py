@@ -0,0 +1,122 @@
+import io
+import re
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+from kanban_app.api.models import Board, Comment, Task, User
+from kanban_app.benchmarking import benchmark_database
+from .benchmark_api import SIZES
+
+# Plan fragments showing an index lookup on SQLite and PostgreSQL.
+INDEX_SCAN = re.compile(r'USING (?:COVERING |INTEGER PRIMARY KEY|PRIMARY KEY)|USING INDEX|Index (?:Only )?Scan|Bitmap Index Scan')
+
+# Plan fragments showing a full scan of the given table on SQLite and PostgreSQL.
+FULL_SCAN = r'\bSCAN {table}\b(?! USING)|Seq Scan on "?{table}\b'
+
+
+class PlanCheck:
+    """The query one endpoint issues on a hot path. build(fixture) returns the queryset;
+    index names the index the plan must use, None accepts any index."""
+
+    def __init__(self, label, build, index=None):
+        self.label = label
+        self.build = build
+        self.index = index
+
+    def run(self, fixture):
+        """Return (ok, plan) for this check; a full scan of the queried table always fails."""
+        queryset = self.build(fixture)
+        plan = queryset.explain()
+        if re.search(FULL_SCAN.format(table=re.escape(queryset.model._meta.db_table)), plan):
+            return False, plan
+        if self.index is not None:
+            return self.index in plan, plan
+        return bool(INDEX_SCAN.search(plan)), plan
+
+
+class PlanFixture:
+    """A user with assigned and reviewed tasks, their board and a commented task."""
+
+    def __init__(self):
+        task = Task.objects.exclude(reviewer=None).order_by('-comments_count', 'pk').first()
+        if task is None:
+            raise CommandError('The query plans need at least one task with a reviewer.')
+        self.task = task
+        self.board = task.board
+        self.assignee = task.assignee
+        self.reviewer = task.reviewer
+
+
+# The hot queries of the API, as the views issue them.
+PLAN_CHECKS = [
+    PlanCheck('login: user by email', lambda fx: User.objects.filter(email=fx.assignee.email), 'user_email_idx'),
+    PlanCheck('registration: email taken', lambda fx: User.objects.filter(email=fx.assignee.email).values('pk')[:1],
+              'user_email_idx'),
+    PlanCheck('email-check: user by email, any case', lambda fx: (
+        User.objects.alias(email_lower=Lower('email')).filter(email_lower=fx.assignee.email.upper().lower())
+    ), 'user_email_lower_idx'),
+    PlanCheck('tasks assigned to me', lambda fx: (
+        Task.objects.filter(assignee=fx.assignee).order_by('due_date', 'id')
+    ), 'task_assignee_due_idx'),
+    PlanCheck('tasks reviewing', lambda fx: (
+        Task.objects.filter(reviewer=fx.reviewer).order_by('due_date', 'id')
+    ), 'task_reviewer_due_idx'),
+    PlanCheck('board tasks by status', lambda fx: (
+        Task.objects.filter(board=fx.board, status=fx.task.status)
+    ), 'task_board_status_idx'),
+    PlanCheck('board tasks by priority', lambda fx: (
+        Task.objects.filter(board=fx.board, priority=fx.task.priority)
+    ), 'task_board_priority_idx'),
+    PlanCheck('board detail: tasks of the board', lambda fx: Task.objects.filter(board_id__in=[fx.board.pk])),
+    PlanCheck('board stats: grouped task counts', lambda fx: (
+        Task.objects.filter(board_id__in=[fx.board.pk]).order_by()
+        .values('board_id', 'status', 'priority').annotate(total=Count('pk'))
+    )),
+    PlanCheck('boards accessible to a user', lambda fx: Board.objects.accessible_to(fx.assignee)),
+    PlanCheck('comments of a task, newest first', lambda fx: (
+        Comment.objects.filter(task=fx.task).order_by('-created_at', '-id')
+    ), 'comment_task_created_idx'),
+]
+
+
+def check_query_plans():
+    """Run every plan check against the current database; returns (check, ok, plan) tuples."""
+    fixture = PlanFixture()
+    return [(check, *check.run(fixture)) for check in PLAN_CHECKS]
+
+
+class Command(BaseCommand):
+    """
+    EXPLAIN the queries behind the hot endpoints and fail when one of them does not
+    use its index. Runs against a throwaway test database filled by seed_data, which
+    is ANALYZEd first so the planner sees realistic table statistics. On tiny tables
+    a sequential scan is the right plan, hence the medium dataset by default.
+    """
+    help = 'Assert that the query plans of the hot endpoints use an index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=list(SIZES), default='medium', help='Dataset size, see benchmark_api.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            call_command('seed_data', seed=options['seed'], stdout=io.StringIO(), **SIZES[options['size']])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            results = check_query_plans()
+
+        failures = []
+        for check, ok, plan in results:
+            expected = check.index or 'any index'
+            self.stdout.write(f"{'ok' if ok else 'FAIL':<5} {check.label:<40} {expected}")
+            if not ok or options['verbosity'] > 1:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+            if not ok:
+                failures.append(check.label)
+        if failures:
+            raise CommandError('No index used by: ' + ', '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All query plans use an index.'))
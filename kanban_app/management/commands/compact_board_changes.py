@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from kanban_app.api.changes import compact_changes
+from kanban_app.api.models import Board
+
+
+class Command(BaseCommand):
+    """
+    Collapse the board change log to the latest entry per object.
+    Meant to run periodically (e.g. from cron); safe to run while clients sync.
+    """
+    help = 'Compact the per-board change log used by the delta sync endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Boards compacted per statement.')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.order_by('pk').values_list('pk', flat=True)
+        deleted = 0
+        last_pk = 0
+        while True:
+            batch = list(boards.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            deleted += compact_changes(batch)
+            last_pk = batch[-1]
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} superseded change log entries."))
@@ -0,0 +1,86 @@
+import glob
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Merge the per-process histogram snapshots written by core.middleware.PerformanceMiddleware
+    and print one line per route: requests, mean/p50/p95/max latency, queries and bytes.
+    Percentiles are read from the histogram, i.e. they are the upper bound of their bucket.
+    """
+    help = 'Show the per-route request statistics collected by the performance middleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PERF_STATS_DIR, help='Snapshot directory.')
+        parser.add_argument('--json', action='store_true', help='Print the merged statistics as JSON.')
+        parser.add_argument('--sort', choices=['total', 'mean', 'count', 'queries'], default='total')
+        parser.add_argument('--clear', action='store_true', help='Delete the snapshots after reading them.')
+
+    def handle(self, *args, **options):
+        paths = glob.glob(os.path.join(options['dir'], 'perf-*.json'))
+        if not paths:
+            raise CommandError(f"No snapshots in {options['dir']}; is PERF_INSTRUMENTATION enabled?")
+
+        buckets_ms, routes = None, {}
+        for path in paths:
+            with open(path, encoding='utf-8') as file:
+                snapshot = json.load(file)
+            buckets_ms = snapshot['buckets_ms']
+            for key, stats in snapshot['routes'].items():
+                merged = routes.setdefault(key, {**stats, 'buckets': [0] * len(stats['buckets']), 'count': 0,
+                                                 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'max_queries': 0,
+                                                 'db_ms': 0.0, 'bytes': 0})
+                for field in ('count', 'total_ms', 'queries', 'db_ms', 'bytes'):
+                    merged[field] += stats[field]
+                merged['max_ms'] = max(merged['max_ms'], stats['max_ms'])
+                merged['max_queries'] = max(merged['max_queries'], stats['max_queries'])
+                merged['buckets'] = [a + b for a, b in zip(merged['buckets'], stats['buckets'])]
+
+        for stats in routes.values():
+            stats['mean_ms'] = stats['total_ms'] / stats['count']
+            stats['p50_ms'] = self.bucket_percentile(stats, buckets_ms, 50)
+            stats['p95_ms'] = self.bucket_percentile(stats, buckets_ms, 95)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'processes': len(paths), 'buckets_ms': buckets_ms, 'routes': routes}, indent=2))
+        else:
+            self.print_table(routes, options['sort'], len(paths))
+
+        if options['clear']:
+            for path in paths:
+                os.remove(path)
+
+    @staticmethod
+    def bucket_percentile(stats, buckets_ms, pct):
+        """Upper bound of the bucket holding the percentile; the overflow bucket reports the maximum."""
+        rank = pct / 100 * stats['count']
+        seen = 0
+        for index, count in enumerate(stats['buckets']):
+            seen += count
+            if seen >= rank and count:
+                return buckets_ms[index] if index < len(buckets_ms) else stats['max_ms']
+        return stats['max_ms']
+
+    def print_table(self, routes, sort, processes):
+        order = {
+            'total': lambda item: item[1]['total_ms'],
+            'mean': lambda item: item[1]['mean_ms'],
+            'count': lambda item: item[1]['count'],
+            'queries': lambda item: item[1]['queries'] / item[1]['count'],
+        }[sort]
+        self.stdout.write(f"{processes} process snapshot(s)")
+        self.stdout.write(
+            f"{'route':<48} {'count':>7} {'mean':>9} {'p50<=':>8} {'p95<=':>8} {'max':>9} "
+            f"{'queries':>8} {'db mean':>9} {'bytes':>9}"
+        )
+        for key, stats in sorted(routes.items(), key=order, reverse=True):
+            count = stats['count']
+            self.stdout.write(
+                f"{key:<48} {count:>7} {stats['mean_ms']:>7.1f}ms {stats['p50_ms']:>6.0f}ms {stats['p95_ms']:>6.0f}ms "
+                f"{stats['max_ms']:>7.1f}ms {stats['queries'] / count:>8.1f} {stats['db_ms'] / count:>7.1f}ms "
+                f"{stats['bytes'] // count:>9}"
+            )
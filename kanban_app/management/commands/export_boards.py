@@ -0,0 +1,39 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from kanban_app.api.models import Board
+from kanban_app.api.transfer import EXPORT_CHUNK_SIZE, export_board_lines
+
+
+class Command(BaseCommand):
+    """
+    Write boards with their members, tasks and comments as JSON Lines.
+    Rows are streamed from server-side cursors straight to the output, so memory
+    stays flat however large the boards are. Progress goes to stderr.
+    """
+    help = 'Export boards as JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_ids', nargs='*', type=int, help='Limit to these boards (default: all).')
+        parser.add_argument('--output', '-o', default='-', help='File to write to, - for stdout.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        boards = Board.objects.all()
+        if options['board_ids']:
+            boards = boards.filter(pk__in=options['board_ids'])
+
+        output = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        rows = 0
+        start = time.perf_counter()
+        try:
+            for line in export_board_lines(boards, chunk_size=options['chunk_size']):
+                output.write(line)
+                rows += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        elapsed = time.perf_counter() - start
+        self.stderr.write(f"Exported {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):.0f} rows/s).")
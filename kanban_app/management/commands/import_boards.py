@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban_app.api.models import User
+from kanban_app.api.transfer import IMPORT_BATCH_SIZE, BoardImporter, BoardImportError
+
+
+class Command(BaseCommand):
+    """
+    Import boards from a JSON Lines file written by export_boards.
+    Users are matched by email, rows are inserted in batches and board stats and
+    comment counts are rebuilt at the end. Nothing is written if any line fails.
+    """
+    help = 'Import boards from JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-', help='File to read, - for stdin.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--owner', help='Email of the user to own all imported boards.')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            owner = User.objects.filter(email=options['owner']).first()
+            if owner is None:
+                raise CommandError(f"No user with the email {options['owner']}.")
+
+        # Read bytes, the importer decodes every line and reports the ones that are not UTF-8
+        source = sys.stdin.buffer if options['input'] == '-' else open(options['input'], 'rb')
+        start = time.perf_counter()
+        try:
+            counts = BoardImporter(batch_size=options['batch_size'], owner=owner).run(source)
+        except BoardImportError as error:
+            raise CommandError(str(error))
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+        elapsed = time.perf_counter() - start
+        rows = sum(counts.values())
+        summary = ', '.join(f'{count} {kind}s' for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary} in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)."
+        ))
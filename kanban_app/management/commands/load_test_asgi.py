@@ -0,0 +1,179 @@
+import asyncio
+import datetime
+import io
+import itertools
+import json
+import time
+import types
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import include, path
+from rest_framework.authtoken.models import Token
+
+from kanban_app.api.async_views import ASYNC_READ_VIEWS
+from kanban_app.api.urls import build_urlpatterns
+from kanban_app.benchmarking import benchmark_database, percentile, summarize
+from .benchmark_api import SIZES, Fixture
+
+# The stacks compared: which routes are served by the async views.
+MODES = {
+    'sync': set(),
+    'async': set(ASYNC_READ_VIEWS),
+}
+
+
+def read_paths(fixture):
+    """One GET per route with an async read view, requested round-robin."""
+    return [
+        '/api/boards/',
+        f'/api/boards/{fixture.board.pk}/',
+        '/api/tasks/assigned-to-me/',
+        '/api/tasks/reviewing/',
+        f'/api/tasks/{fixture.task.pk}/comments/',
+        f'/api/email-check/?email={fixture.member.email}',
+    ]
+
+
+async def asgi_get(application, url, headers):
+    """Send one GET through the ASGI application and return (status, body)."""
+    route, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': route, 'raw_path': route.encode(), 'query_string': query.encode(), 'headers': headers,
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    finished = asyncio.Event()
+    request_sent = False
+    status, body = None, []
+
+    async def receive():
+        """The empty request body, then a disconnect once the response is complete."""
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                finished.set()
+
+    await application(scope, receive, send)
+    finished.set()
+    return status, b''.join(body)
+
+
+class Command(BaseCommand):
+    """
+    Load test the read endpoints through Django's ASGI handler, once with the DRF views
+    (the sync stack) and once with the async views, and compare requests per second and
+    tail latency. The requests are driven in-process by --concurrency coroutines, like as
+    many open client connections, so the figures are those of the application stack
+    without a server or network in between. Before measuring, every endpoint is
+    requested on both stacks and their responses must be identical.
+    Runs against a throwaway test database seeded by seed_data.
+    """
+    help = 'Compare the sync and async read views under concurrent ASGI load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=list(SIZES), default='small', help='Dataset size, see benchmark_api.')
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per stack.')
+        parser.add_argument('--mode', action='append', choices=list(MODES), help='Repeatable, default: both.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', '-o', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        modes = options['mode'] or list(MODES)
+        report = {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'size': options['size'],
+            'concurrency': options['concurrency'],
+            'results': {},
+        }
+        with benchmark_database():
+            call_command('seed_data', seed=options['seed'], stdout=io.StringIO(), **SIZES[options['size']])
+            fixture = Fixture(password='seedpassword')
+            headers = [
+                (b'host', b'testserver'),
+                (b'authorization', f'Token {Token.objects.get(user=fixture.user).key}'.encode()),
+            ]
+            paths = read_paths(fixture)
+
+            applications = {mode: self.application(routes) for mode, routes in MODES.items() if mode in modes}
+            self.verify(applications, paths, headers)
+
+            self.stdout.write(
+                f"{options['requests']} requests per stack, {options['concurrency']} concurrent, {options['size']} dataset"
+            )
+            self.stdout.write(f"{'stack':<8} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'errors':>7}")
+            for mode, (application, urlconf) in applications.items():
+                cache.clear()
+                with override_settings(ROOT_URLCONF=urlconf):
+                    result = asyncio.run(self.load(application, paths, headers, options['concurrency'], options['requests']))
+                report['results'][mode] = result
+                self.stdout.write(
+                    f"{mode:<8} {result['requests_per_second']:>9.0f} {result['p50']:>7.1f}ms {result['p95']:>7.1f}ms "
+                    f"{result['p99']:>7.1f}ms {result['max']:>7.1f}ms {result['errors']:>7}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+    @staticmethod
+    def application(async_routes):
+        """An ASGI handler plus the URLconf it has to run with, serving the API routes
+        with the given async read routes."""
+        urlconf = types.ModuleType(f'load_test_urls_{len(async_routes)}')
+        urlconf.urlpatterns = [path('api/', include(build_urlpatterns(async_routes)))]
+        return ASGIHandler(), urlconf
+
+    def verify(self, applications, paths, headers):
+        """Every stack has to answer every path with the same status and body."""
+        responses = {}
+        for mode, (application, urlconf) in applications.items():
+            with override_settings(ROOT_URLCONF=urlconf):
+                responses[mode] = [asyncio.run(asgi_get(application, url, headers)) for url in paths]
+        for url, answers in zip(paths, zip(*responses.values())):
+            if answers[0][0] != 200:
+                raise CommandError(f'{url} answered {answers[0][0]}: {answers[0][1][:200]!r}')
+            if any(answer != answers[0] for answer in answers[1:]):
+                raise CommandError(f'The stacks answer {url} differently.')
+
+    @staticmethod
+    async def load(application, paths, headers, concurrency, total):
+        """Run `concurrency` clients sending requests back to back until `total` have been sent."""
+        counter = itertools.count()
+        samples, errors = [], 0
+
+        async def client():
+            nonlocal errors
+            while (number := next(counter)) < total:
+                start = time.perf_counter()
+                status, _ = await asgi_get(application, paths[number % len(paths)], headers)
+                samples.append((time.perf_counter() - start) * 1000)
+                errors += status != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        ordered = sorted(samples)
+        return {
+            'requests_per_second': round(len(samples) / elapsed, 1),
+            **summarize(samples),
+            'p99': round(percentile(ordered, 99), 3),
+            'max': round(ordered[-1], 3) if ordered else 0.0,
+            'errors': errors,
+        }
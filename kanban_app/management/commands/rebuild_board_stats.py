@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kanban_app.api.models import Board
+from kanban_app.api.stats import rebuild_board_stats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the materialized BoardStats rows from the tasks and members tables.
+    With --verify nothing is written and the command fails if any board has drifted.
+    """
+    help = 'Rebuild or verify the materialized board statistics.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Only report drift, do not write.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('board_ids', nargs='*', type=int, help='Limit to these boards.')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.order_by('pk').values_list('pk', flat=True)
+        if options['board_ids']:
+            boards = boards.filter(pk__in=options['board_ids'])
+
+        checked, drifted = 0, []
+        batch_size = options['batch_size']
+        last_pk = 0
+        while True:
+            batch = list(boards.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                drifted += rebuild_board_stats(batch, dry_run=options['verify'])
+            checked += len(batch)
+            last_pk = batch[-1]
+
+        if options['verify'] and drifted:
+            raise CommandError(f"{len(drifted)} of {checked} boards have drifted stats: {drifted[:20]}")
+        action = 'Verified' if options['verify'] else 'Rebuilt'
+        self.stdout.write(self.style.SUCCESS(f"{action} stats for {checked} boards, {len(drifted)} were out of date."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from kanban_app.api.search import SCHEMA, create_search_schema, drop_search_schema
+
+
+class Command(BaseCommand):
+    """
+    Drop and recreate the full-text search index and fill it from the task and
+    comment tables. Needed on SQLite after a migration rebuilt one of those tables,
+    which drops the triggers keeping the index in sync.
+    """
+    help = 'Rebuild the full-text search index of tasks and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor not in SCHEMA:
+            self.stderr.write(f'Search is not supported on {connection.vendor}.')
+            return
+        with transaction.atomic(using=connection.alias):
+            drop_search_schema(connection)
+            create_search_schema(connection)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the search index of the {connection.alias} database.'))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from kanban_app.api.models import Comment, Task
+from kanban_app.api.stats import recount_comments
+
+
+class Command(BaseCommand):
+    """
+    Compare the stored Task.comments_count with the real number of comments and
+    repair drift (e.g. after raw SQL or queryset.update() bypassed the comment signals).
+    Works through the tasks in primary key batches, one grouped count per batch.
+    Drifted counters are set by recount_comments, which counts inside the UPDATE, so
+    an increment made by the comment signals in between is never overwritten.
+    """
+    help = 'Repair drift of the stored task comment counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift, do not write.')
+
+    def handle(self, *args, **options):
+        checked = repaired = 0
+        last_pk = 0
+        while True:
+            tasks = list(
+                Task.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'comments_count')[:options['batch_size']]
+            )
+            if not tasks:
+                break
+            last_pk = tasks[-1].pk
+            checked += len(tasks)
+
+            actual = dict(
+                Comment.objects.filter(task_id__in=[task.pk for task in tasks])
+                .order_by()
+                .values_list('task_id')
+                .annotate(total=Count('pk'))
+            )
+            drifted = [task.pk for task in tasks if task.comments_count != actual.get(task.pk, 0)]
+            repaired += len(drifted)
+            if drifted and not options['dry_run']:
+                recount_comments(Task.objects.filter(pk__in=drifted))
+
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} tasks. {verb} {repaired} drifted comment counters."))
@@ -0,0 +1,176 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from auth_app.api.models import UserProfile
+from kanban_app.api.models import Board, Comment, Task, User
+from kanban_app.api.stats import rebuild_board_stats
+from kanban_app.api.transfer import insert_rows
+
+# Word lists the generated names, titles and comments are drawn from.
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Greta', 'Hannah', 'Jonas', 'Lena', 'Max', 'Sophie']
+LAST_NAMES = ['Becker', 'Fischer', 'Hoffmann', 'Koch', 'Meyer', 'Müller', 'Richter', 'Schmidt', 'Schulz', 'Wagner']
+PROJECTS = ['WebApp', 'Mobile App', 'API', 'Checkout', 'Onboarding', 'Reporting', 'Search', 'Billing', 'Design System']
+VERBS = ['Implement', 'Refactor', 'Fix', 'Document', 'Test', 'Review', 'Migrate', 'Optimize', 'Remove']
+OBJECTS = ['login flow', 'user settings', 'database index', 'error handling', 'email templates', 'cache layer', 'CI pipeline']
+REMARKS = ['Looks good to me.', 'Please add tests.', 'Blocked by the API change.', 'Done on staging.', 'Can we split this up?']
+
+
+class Command(BaseCommand):
+    """
+    Generate a reproducible dataset of users, profiles, boards, members, tasks and
+    comments for load testing. Rows are written with bulk_create in batches, all users
+    share one pre-hashed password, members go straight into the through table and
+    the stored counters are filled in, so even millions of rows finish in minutes.
+    The same --seed always produces the same data.
+    """
+    help = 'Bulk generate test data at a configurable scale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--boards', type=int, default=50)
+        parser.add_argument('--tasks', type=int, default=1000, help='Total number of tasks.')
+        parser.add_argument('--comments', type=int, default=2000, help='Total number of comments.')
+        parser.add_argument('--members-per-board', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed', help='Prefix of the generated user emails.')
+        parser.add_argument('--password', default='seedpassword', help='Password of every generated user.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and (options['boards'] or options['tasks']):
+            raise CommandError('Boards and tasks need at least one user.')
+        if options['boards'] < 1 and options['tasks']:
+            raise CommandError('Tasks need at least one board.')
+        if User.objects.filter(email__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(f"Users with the prefix '{options['prefix']}' exist already, pass another --prefix.")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.today = datetime.date.today()
+        start = time.perf_counter()
+
+        user_ids = self.timed('users', options['users'], lambda: self.create_users(
+            options['users'], options['prefix'], options['password'],
+        ))
+        members = self.timed('boards', options['boards'], lambda: self.create_boards(
+            options['boards'], user_ids, options['members_per_board'],
+        ))
+        comments = self.timed('tasks', options['tasks'], lambda: self.create_tasks(
+            options['tasks'], options['comments'], members,
+        ))
+        self.timed('board stats', len(members), lambda: self.rebuild_stats(list(members)))
+        self.stdout.write(f"{comments} comments were written together with the tasks.")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - start:.1f}s."))
+
+    def timed(self, label, count, func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<12} {count:>10} in {elapsed:8.1f}s ({count / max(elapsed, 1e-9):,.0f}/s)")
+        return result
+
+    def batches(self, total):
+        """Yield (start, size) pairs covering range(total) in batch_size steps."""
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def create_users(self, count, prefix, password):
+        """Users and their profiles; the password is hashed once and shared."""
+        password_hash = make_password(password)
+        user_ids = []
+        for start, size in self.batches(count):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=f'{prefix}-{number}@example.com',
+                        email=f'{prefix}-{number}@example.com',
+                        password=password_hash,
+                    )
+                    for number in range(start, start + size)
+                ])
+                UserProfile.objects.bulk_create([
+                    UserProfile(user=user, fullname=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}')
+                    for user in users
+                ])
+            user_ids += [user.pk for user in users]
+        return user_ids
+
+    def create_boards(self, count, user_ids, members_per_board):
+        """Boards with their owner plus random members; returns the member ids per board."""
+        members = {}
+        for start, size in self.batches(count):
+            owners = [self.rng.choice(user_ids) for _ in range(size)]
+            with transaction.atomic():
+                boards = Board.objects.bulk_create([
+                    Board(title=f'{self.rng.choice(PROJECTS)} #{number}', owner_id=owner_id)
+                    for number, owner_id in zip(range(start, start + size), owners)
+                ])
+                rows = []
+                for board, owner_id in zip(boards, owners):
+                    others = self.rng.sample(user_ids, min(members_per_board, len(user_ids)))
+                    members[board.pk] = tuple(dict.fromkeys([owner_id, *others]))[:max(members_per_board, 1)]
+                    rows += [
+                        Board.members.through(board_id=board.pk, user_id=user_id) for user_id in members[board.pk]
+                    ]
+                Board.members.through.objects.bulk_create(rows)
+        return members
+
+    def create_tasks(self, count, comment_count, members):
+        """
+        Tasks spread randomly over the boards, each followed by its comments.
+        The number of comments per task is decided up front so comments_count is
+        written with the task, and comments are inserted right after their batch of
+        tasks, so no task ids have to be kept around. Comment ids are never needed,
+        which lets them skip the model layer via insert_rows.
+        """
+        if not count:
+            return 0
+        written = 0
+        board_ids = list(members)
+        per_task, remainder = divmod(comment_count, count)
+        extra_chance = remainder / count
+        for _, size in self.batches(count):
+            tasks = []
+            for _ in range(size):
+                board_id = self.rng.choice(board_ids)
+                board_members = members[board_id]
+                tasks.append(Task(
+                    board_id=board_id,
+                    title=f'{self.rng.choice(VERBS)} {self.rng.choice(OBJECTS)}',
+                    description=f'{self.rng.choice(VERBS)} the {self.rng.choice(OBJECTS)} for {self.rng.choice(PROJECTS)}.',
+                    status=self.rng.choice(Task.STATUS_CHOICES)[0],
+                    priority=self.rng.choice(Task.PRIORITY_CHOICES)[0],
+                    due_date=self.today + datetime.timedelta(days=self.rng.randint(-30, 90)),
+                    assignee_id=self.rng.choice(board_members),
+                    reviewer_id=self.rng.choice(board_members) if self.rng.random() < 0.7 else None,
+                    comments_count=per_task + (self.rng.random() < extra_chance),
+                ))
+            with transaction.atomic():
+                tasks = Task.objects.bulk_create(tasks)
+                now = timezone.now()
+                comments = [
+                    {
+                        'task_id': task.pk,
+                        'author_id': self.rng.choice(members[task.board_id]),
+                        'content': self.rng.choice(REMARKS),
+                        'created_at': now,
+                        'updated_at': now,
+                    }
+                    for task in tasks
+                    for _ in range(task.comments_count)
+                ]
+                insert_rows(Comment, comments)
+            written += len(comments)
+        return written
+
+    def rebuild_stats(self, board_ids):
+        for start, size in self.batches(len(board_ids)):
+            with transaction.atomic():
+                rebuild_board_stats(board_ids[start:start + size])
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+STATUS_FIELDS = {'to-do': 'to_do_count', 'in-progress': 'in_progress_count', 'review': 'review_count', 'done': 'done_count'}
+PRIORITY_FIELDS = {'low': 'low_priority_count', 'medium': 'medium_priority_count', 'high': 'high_priority_count'}
+
+
+def populate_board_stats(apps, schema_editor):
+    Board = apps.get_model('kanban_app', 'Board')
+    BoardStats = apps.get_model('kanban_app', 'BoardStats')
+    Task = apps.get_model('kanban_app', 'Task')
+    db_alias = schema_editor.connection.alias
+
+    stats = {
+        board_id: BoardStats(board_id=board_id)
+        for board_id in Board.objects.using(db_alias).values_list('pk', flat=True)
+    }
+    for row in Board.members.through.objects.using(db_alias).values('board_id').annotate(total=Count('pk')):
+        stats[row['board_id']].member_count = row['total']
+    for row in Task.objects.using(db_alias).values('board_id', 'status', 'priority').annotate(total=Count('pk')):
+        counters = stats[row['board_id']]
+        counters.ticket_count += row['total']
+        if row['status'] in STATUS_FIELDS:
+            field = STATUS_FIELDS[row['status']]
+            setattr(counters, field, getattr(counters, field) + row['total'])
+        if row['priority'] in PRIORITY_FIELDS:
+            field = PRIORITY_FIELDS[row['priority']]
+            setattr(counters, field, getattr(counters, field) + row['total'])
+    BoardStats.objects.using(db_alias).bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0007_remove_task_reviewer_task_reviewer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardStats',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='kanban_app.board')),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('ticket_count', models.PositiveIntegerField(default=0)),
+                ('to_do_count', models.PositiveIntegerField(default=0)),
+                ('in_progress_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('done_count', models.PositiveIntegerField(default=0)),
+                ('low_priority_count', models.PositiveIntegerField(default=0)),
+                ('medium_priority_count', models.PositiveIntegerField(default=0)),
+                ('high_priority_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_board_stats, migrations.RunPython.noop),
+    ]
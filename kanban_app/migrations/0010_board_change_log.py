@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('board', 'Board'), ('task', 'Task'), ('comment', 'Comment'), ('member', 'Member')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='kanban_app.board')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'id'], name='boardchange_board_cursor_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:40
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_comments_count(apps, schema_editor):
+    Task = apps.get_model('kanban_app', 'Task')
+    Comment = apps.get_model('kanban_app', 'Comment')
+    db_alias = schema_editor.connection.alias
+    counts = (
+        Comment.objects.using(db_alias).filter(task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Task.objects.using(db_alias).update(comments_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0010_board_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_comments_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,123 @@
+from django.db import migrations
+
+# The search index is vendor specific SQL: an FTS5 table with triggers on SQLite,
+# generated tsvector columns with GIN indexes on PostgreSQL. The statements are a
+# frozen copy of the ones in kanban_app.api.search at the time of this migration,
+# so later changes to that module do not change what this migration does.
+
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE kanban_search USING fts5(
+        title, body, board, task_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6 7 8'
+    )
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_insert AFTER INSERT ON kanban_app_task BEGIN
+        INSERT INTO kanban_search (rowid, title, body, board, task_id)
+        VALUES (NEW.id * 2, NEW.title, NEW.description, 'b' || NEW.board_id, NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_update AFTER UPDATE OF title, description, board_id ON kanban_app_task
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description OR OLD.board_id IS NOT NEW.board_id
+    BEGIN
+        UPDATE kanban_search SET title = NEW.title, body = NEW.description, board = 'b' || NEW.board_id
+        WHERE rowid = NEW.id * 2;
+        UPDATE kanban_search SET board = 'b' || NEW.board_id
+        WHERE OLD.board_id IS NOT NEW.board_id
+          AND rowid IN (SELECT id * 2 + 1 FROM kanban_app_comment WHERE task_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_delete AFTER DELETE ON kanban_app_task BEGIN
+        DELETE FROM kanban_search WHERE rowid = OLD.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_insert AFTER INSERT ON kanban_app_comment BEGIN
+        INSERT INTO kanban_search (rowid, title, body, board, task_id)
+        SELECT NEW.id * 2 + 1, '', NEW.content, 'b' || board_id, NEW.task_id FROM kanban_app_task WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_update AFTER UPDATE OF content, task_id ON kanban_app_comment
+    WHEN OLD.content IS NOT NEW.content OR OLD.task_id IS NOT NEW.task_id
+    BEGIN
+        UPDATE kanban_search SET body = NEW.content, task_id = NEW.task_id,
+            board = (SELECT 'b' || board_id FROM kanban_app_task WHERE id = NEW.task_id)
+        WHERE rowid = NEW.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_delete AFTER DELETE ON kanban_app_comment BEGIN
+        DELETE FROM kanban_search WHERE rowid = OLD.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, board, task_id)
+    SELECT id * 2, title, description, 'b' || board_id, id FROM kanban_app_task
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, board, task_id)
+    SELECT comment.id * 2 + 1, '', comment.content, 'b' || task.board_id, comment.task_id
+    FROM kanban_app_comment comment JOIN kanban_app_task task ON task.id = comment.task_id
+    """,
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS kanban_search_task_insert',
+    'DROP TRIGGER IF EXISTS kanban_search_task_update',
+    'DROP TRIGGER IF EXISTS kanban_search_task_delete',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_insert',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_update',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_delete',
+    'DROP TABLE IF EXISTS kanban_search',
+]
+
+POSTGRESQL_SCHEMA = [
+    """
+    ALTER TABLE kanban_app_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', description), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX task_search_idx ON kanban_app_task USING GIN (search_vector)',
+    """
+    ALTER TABLE kanban_app_comment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', content)
+    ) STORED
+    """,
+    'CREATE INDEX comment_search_idx ON kanban_app_comment USING GIN (search_vector)',
+]
+
+POSTGRESQL_DROP = [
+    'ALTER TABLE kanban_app_task DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE kanban_app_comment DROP COLUMN IF EXISTS search_vector',
+]
+
+SCHEMA = {'sqlite': (SQLITE_SCHEMA, SQLITE_DROP), 'postgresql': (POSTGRESQL_SCHEMA, POSTGRESQL_DROP)}
+
+
+def run_statements(schema_editor, index):
+    statements = SCHEMA.get(schema_editor.connection.vendor, ((), ()))[index]
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def create_index(apps, schema_editor):
+    run_statements(schema_editor, 0)
+
+
+def drop_index(apps, schema_editor):
+    run_statements(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0012_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
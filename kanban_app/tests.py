@@ -1,3 +1,1014 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import tempfile
+import time
+import types
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext, ignore_warnings
+from django.urls import include, path
+from django.utils.http import http_date
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from auth_app.api.models import UserProfile
+from core.db_routers import ReadRouting, ReplicaRouter, read_routing, remember_write, replica_pool
+from core.middleware import fingerprint, view_stats
+from kanban_app.api.async_views import selected_async_routes
+from kanban_app.api.changes import change_message, latest_cursor
+from kanban_app.api.events import board_channel, get_broker
+from kanban_app.api.models import Board, BoardChange, BoardStats, Comment, Task, User
+from kanban_app.api.pagination import CommentPagination
+from kanban_app.api.payloads import board_detail_payload
+from kanban_app.api.renderers import OrjsonRenderer
+from kanban_app.api.serializers import BoardListSerializer, BoardSingleSerializer, CommentSerializer, TaskSerializer
+from kanban_app.api.stats import rebuild_board_stats
+from kanban_app.api.urls import build_urlpatterns
+from kanban_app.api.views import (
+    BoardListCreateView, BoardSingleView, CommentListCreateAPIView, TaskAssigneeView, TaskBulkAPIView,
+)
+from kanban_app.management.commands.check_query_plans import check_query_plans
+
+
+class QueryCountTests(APITestCase):
+    """
+    Guards against N+1 queries: every read endpoint must issue the same number
+    of queries no matter how many rows it returns.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.create_user('owner')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.board.members.add(self.user)
+        self.task = self.create_task()
+        self.client.force_authenticate(self.user)
+
+    def create_user(self, name):
+        user = User.objects.create_user(username=name, email=f'{name}@example.com')
+        UserProfile.objects.create(user=user, fullname=name.title())
+        return user
+
+    def create_task(self):
+        reviewer = self.create_user(f'reviewer{Task.objects.count()}')
+        self.board.members.add(reviewer)
+        return Task.objects.create(
+            board=self.board, title='Task', description='', status='to-do', priority='high',
+            assignee=self.user, reviewer=reviewer,
+        )
+
+    def add_rows(self):
+        """Grow every listing: more boards, members, tasks, reviewers and comment authors."""
+        for number in range(3):
+            board = Board.objects.create(title=f'Board {number}', owner=self.user)
+            task = self.create_task()
+            Task.objects.filter(pk=task.pk).update(assignee=self.user)
+            task.reviewer = self.user
+            task.save()
+            author = self.create_user(f'author{number}')
+            Comment.objects.create(task=self.task, author=author, content='Hi')
+
+    def count_queries(self, url):
+        """Cached payloads are dropped first so the full serialization path is measured."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url):
+        before = self.count_queries(url)
+        self.add_rows()
+        self.assertEqual(self.count_queries(url), before, f'query count of {url} grows with its rows')
+
+    def test_board_list(self):
+        self.assertConstantQueries('/api/boards/')
+
+    def test_board_detail(self):
+        self.assertConstantQueries(f'/api/boards/{self.board.pk}/')
+
+    def test_tasks_assigned_to_me(self):
+        self.assertConstantQueries('/api/tasks/assigned-to-me/')
+
+    def test_tasks_reviewing(self):
+        self.assertConstantQueries('/api/tasks/reviewing/')
+
+    def test_comments(self):
+        self.assertConstantQueries(f'/api/tasks/{self.task.pk}/comments/')
+
+    def test_lists_skip_unused_user_columns(self):
+        for url in ('/api/tasks/assigned-to-me/', f'/api/tasks/{self.task.pk}/comments/'):
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            self.assertFalse([query for query in context.captured_queries if 'password' in query['sql']], url)
+
+    def test_board_update_response(self):
+        url = f'/api/boards/{self.board.pk}/'
+        cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.patch(url, {'title': 'Renamed'}, format='json')
+        self.board.members.add(*[self.create_user(f'member{number}') for number in range(4)])
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.patch(url, {'title': 'Renamed again'}, format='json')
+        self.assertEqual(len(response.data['members_data']), 6)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+
+class BoardCacheTests(APITestCase):
+    """The board detail payload is cached per board version and invalidated by writes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.board = Board.objects.create(title='Board', owner=self.user)
+            self.board.members.add(self.user)
+        self.url = f'/api/boards/{self.board.pk}/'
+        self.client.force_authenticate(self.user)
+
+    def test_cached_payload_skips_serialization_queries(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+        """Only the board lookup remains; board access is cached as well."""
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_task_write_invalidates_payload(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                board=self.board, title='New', description='', status='to-do', priority='low', assignee=self.user,
+            )
+        self.assertEqual([item['id'] for item in self.client.get(self.url).data['tasks']], [task.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(task=task, author=self.user, content='Hi')
+        self.assertEqual(self.client.get(self.url).data['tasks'][0]['comments_count'], 1)
+
+    def test_permissions_still_checked(self):
+        outsider = User.objects.create_user(username='outsider', email='outsider@example.com')
+        self.client.get(self.url)
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ConditionalGetTests(APITestCase):
+    """List and detail endpoints answer If-None-Match with 304 until something changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_not_modified_until_task_added(self):
+        for url in ['/api/boards/', f'/api/boards/{self.board.pk}/']:
+            etag = self.client.get(url).headers['ETag']
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertLessEqual(len(context.captured_queries), 2)
+
+        etag = self.client.get('/api/boards/').headers['ETag']
+        Task.objects.create(
+            board=self.board, title='New', description='', status='to-do', priority='low', assignee=self.user,
+        )
+        self.assertEqual(self.client.get('/api/boards/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_lists_are_not_validated_by_date(self):
+        newest = Board.objects.create(title='Newest', owner=self.user)
+        response = self.client.get('/api/boards/')
+        self.assertNotIn('Last-Modified', response.headers)
+        etag = response.headers['ETag']
+        newest.delete()
+        self.assertEqual(self.client.get('/api/boards/', HTTP_IF_MODIFIED_SINCE=http_date(time.time())).status_code, 200)
+        self.assertEqual(self.client.get('/api/boards/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertIn('Last-Modified', self.client.get(f'/api/boards/{self.board.pk}/').headers)
+
+
+class KeysetPaginationTests(APITestCase):
+    """?limit= and ?cursor= page the task and comment lists by keyset; without them the lists stay plain."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.task = Task.objects.create(
+            board=self.board, title='Task', description='', status='to-do', priority='low', assignee=self.user,
+        )
+        self.client.force_authenticate(self.user)
+
+    def pages(self, url, limit):
+        """Follow the next links from the first page, returning the ids of every page."""
+        pages = []
+        response = self.client.get(url, {'limit': limit})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            if response.data['next'] is None:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_round_trip(self):
+        for day in (3, 1, 2, 1):
+            Task.objects.create(
+                board=self.board, title='Task', description='', status='to-do', priority='low',
+                assignee=self.user, due_date=datetime.date(2025, 1, day),
+            )
+        expected = list(Task.objects.order_by('due_date', 'id').values_list('pk', flat=True))
+        pages = self.pages('/api/tasks/assigned-to-me/', 2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_equal_timestamps_keep_a_stable_order(self):
+        for _ in range(5):
+            Comment.objects.create(task=self.task, author=self.user, content='Hi')
+        Comment.objects.update(created_at=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc))
+        pages = self.pages(f'/api/tasks/{self.task.pk}/comments/', 2)
+        self.assertEqual(sum(pages, []), sorted(Comment.objects.values_list('pk', flat=True), reverse=True))
+
+    def test_page_size_is_capped(self):
+        for _ in range(3):
+            Comment.objects.create(task=self.task, author=self.user, content='Hi')
+        with mock.patch.object(CommentPagination, 'max_limit', 2):
+            response = self.client.get(f'/api/tasks/{self.task.pk}/comments/', {'limit': 1000})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('limit=2', response.data['next'])
+
+    def test_malformed_cursor(self):
+        for cursor in ('not a cursor', 'WzFd', 'WyJ4IiwgIjEiXQ'):
+            response = self.client.get('/api/tasks/assigned-to-me/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.data, {'cursor': ['Invalid cursor.']})
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get('/api/tasks/assigned-to-me/')
+        self.assertEqual([row['id'] for row in response.data], [self.task.pk])
+        self.assertNotIn('next', response.content.decode())
+
+
+class BoardChangesTests(APITestCase):
+    """The delta endpoint returns what changed after a cursor, with tombstones for deletions."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.owner, self.member)
+        self.url = f'/api/boards/{self.board.pk}/changes/'
+        self.client.force_authenticate(self.member)
+
+    def create_task(self):
+        return Task.objects.create(
+            board=self.board, title='Task', description='', status='to-do', priority='low', assignee=self.owner,
+        )
+
+    def changes(self, since):
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_since_cursor(self):
+        snapshot = self.changes(0)
+        self.assertTrue(snapshot['snapshot'])
+        self.assertEqual({member['id'] for member in snapshot['members']}, {self.owner.pk, self.member.pk})
+
+        task = self.create_task()
+        comment = Comment.objects.create(task=task, author=self.member, content='Hi')
+        delta = self.changes(snapshot['cursor'])
+        self.assertFalse(delta['snapshot'])
+        self.assertGreater(delta['cursor'], snapshot['cursor'])
+        self.assertEqual([row['id'] for row in delta['tasks']], [task.pk])
+        self.assertEqual([(row['id'], row['task']) for row in delta['comments']], [(comment.pk, task.pk)])
+        self.assertEqual(delta['members'], [])
+
+        empty = self.changes(delta['cursor'])
+        self.assertEqual(empty['cursor'], delta['cursor'])
+        self.assertEqual((empty['tasks'], empty['comments'], empty['board']), ([], [], None))
+
+    def test_tombstones_for_deleted_tasks_and_comments(self):
+        task, other = self.create_task(), self.create_task()
+        comment = Comment.objects.create(task=other, author=self.member, content='Hi')
+        cursor = self.changes(0)['cursor']
+        deleted_ids = task.pk, comment.pk
+        comment.delete()
+        task.delete()
+        delta = self.changes(cursor)
+        self.assertEqual(delta['deleted'], {'tasks': [deleted_ids[0]], 'comments': [deleted_ids[1]], 'members': []})
+        self.assertEqual([row['id'] for row in delta['tasks']], [other.pk])
+
+    def test_non_members_and_bad_cursors_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'since': -1}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'x'}).status_code, 400)
+        outsider = User.objects.create_user(username='outsider', email='outsider@example.com')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_compaction_keeps_the_latest_entry_per_object(self):
+        cursor = self.changes(0)['cursor']
+        task = self.create_task()
+        for status in ('review', 'done'):
+            task.status = status
+            task.save()
+        Comment.objects.create(task=task, author=self.member, content='Hi').delete()
+        before = self.changes(cursor)
+
+        call_command('compact_board_changes', stdout=io.StringIO())
+        entries = BoardChange.objects.filter(board=self.board).values_list('kind', 'object_id')
+        self.assertEqual(len(entries), len(set(entries)))
+        self.assertEqual(self.changes(cursor), before)
+
+
+class BoardEventsTests(APITestCase):
+    """The Server-Sent Events stream of a board, read through the async test client."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.outsider = User.objects.create_user(username='outsider', email='outsider@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.url = f'/api/boards/{self.board.pk}/events/'
+
+    def headers(self, user, **headers):
+        return {'Authorization': f'Token {Token.objects.get_or_create(user=user)[0].key}', **headers}
+
+    async def events(self, response, count):
+        """Read the next `count` events, skipping the retry line and keep-alive comments."""
+        events = []
+        while len(events) < count:
+            chunk = await asyncio.wait_for(anext(response.streaming_content), 5)
+            chunk = chunk.decode()
+            if 'data: ' in chunk:
+                fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+                events.append((fields['event'], int(fields['id']), json.loads(fields['data'])))
+        return events
+
+    async def test_authentication_and_membership(self):
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 401)
+        self.assertEqual((await self.async_client.get(self.url, {'token': 'wrong'})).status_code, 401)
+        headers = await sync_to_async(self.headers)(self.outsider)
+        self.assertEqual((await self.async_client.get(self.url, headers=headers)).status_code, 403)
+
+    async def test_ready_then_change_events(self):
+        headers = await sync_to_async(self.headers)(self.owner)
+        response = await self.async_client.get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        """The cursor is read once the stream subscribed, so a change made before covers it."""
+        await Task.objects.acreate(
+            board=self.board, title='Task', description='', status='to-do', priority='low', assignee=self.owner,
+        )
+        cursor = await sync_to_async(latest_cursor)(self.board.pk)
+        self.assertEqual(await self.events(response, 1), [('ready', cursor, {'cursor': cursor})])
+
+        message = change_message(cursor + 1, 'task', 7, 'upsert')
+        get_broker().publish(board_channel(self.board.pk), message)
+        self.assertEqual(await self.events(response, 1), [('change', cursor + 1, message)])
+        await response.streaming_content.aclose()
+
+    async def test_resume_from_last_event_id(self):
+        cursor = await sync_to_async(latest_cursor)(self.board.pk)
+        task = await Task.objects.acreate(
+            board=self.board, title='Task', description='', status='to-do', priority='low', assignee=self.owner,
+        )
+        headers = await sync_to_async(self.headers)(self.owner, **{'Last-Event-ID': str(cursor)})
+        response = await self.async_client.get(self.url, headers=headers)
+        [(event, event_id, message)] = await self.events(response, 1)
+        self.assertEqual((event, message['kind'], message['object_id']), ('change', 'task', task.pk))
+        self.assertGreater(event_id, cursor)
+
+        """A live message the replay already covered is not sent twice."""
+        get_broker().publish(board_channel(self.board.pk), message)
+        newer = change_message(event_id + 1, 'task', task.pk, 'delete')
+        get_broker().publish(board_channel(self.board.pk), newer)
+        self.assertEqual(await self.events(response, 1), [('change', event_id + 1, newer)])
+        await response.streaming_content.aclose()
+
+
+class TaskBulkTests(APITestCase):
+    """The bulk task endpoint writes every item in one transaction or none of them."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+        self.client.force_authenticate(self.owner)
+
+    def item(self, number, **fields):
+        return {
+            'board': self.board.pk, 'title': f'Task {number}', 'description': 'Bulk', 'status': 'to-do',
+            'priority': 'high', 'assignee_id': self.member.pk, **fields,
+        }
+
+    def test_create_and_update(self):
+        response = self.client.post('/api/tasks/bulk/', [self.item(n) for n in range(3)], format='json')
+        self.assertEqual(response.status_code, 201)
+        ids = [result['task']['id'] for result in response.data['results']]
+        self.assertEqual(
+            [result['task']['title'] for result in response.data['results']], ['Task 0', 'Task 1', 'Task 2'],
+        )
+
+        response = self.client.patch(
+            '/api/tasks/bulk/', [{'id': pk, 'status': 'done'} for pk in ids[:2]], format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(Task.objects.values_list('status', flat=True)), ['done', 'done', 'to-do'])
+        self.assertEqual(rebuild_board_stats([self.board.pk], dry_run=True), [])
+        logged = BoardChange.objects.filter(board=self.board, kind='task').values_list('object_id', flat=True)
+        self.assertEqual(set(logged), set(ids))
+
+    def test_one_invalid_item_writes_nothing(self):
+        items = [self.item(0), self.item(1, status='someday'), self.item(2, assignee_id=self.outsider().pk)]
+        response = self.client.post('/api/tasks/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([(result['index'], result['status']) for result in response.data['results']], [(1, 400), (2, 400)])
+        self.assertFalse(Task.objects.exists())
+
+        task = Task.objects.create(
+            board=self.board, title='Task', description='', status='to-do', priority='low', assignee=self.owner,
+        )
+        response = self.client.patch(
+            '/api/tasks/bulk/', [{'id': task.pk, 'status': 'done'}, {'id': task.pk + 1, 'status': 'done'}], format='json',
+        )
+        self.assertEqual(response.data['results'], [{'index': 1, 'status': 404, 'errors': {'detail': 'Task not found.'}}])
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'to-do')
+
+    def test_failed_write_rolls_back(self):
+        with mock.patch('kanban_app.api.views.tasks_bulk_written', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post('/api/tasks/bulk/', [self.item(n) for n in range(3)], format='json')
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(self.board.stats.ticket_count, 0)
+
+    def test_item_limit(self):
+        with mock.patch.object(TaskBulkAPIView, 'max_items', 2):
+            response = self.client.post('/api/tasks/bulk/', [self.item(n) for n in range(3)], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': ['At most 2 tasks per request.']})
+        self.assertEqual(self.client.post('/api/tasks/bulk/', [], format='json').status_code, 400)
+
+    def test_foreign_board_is_denied(self):
+        foreign = Board.objects.create(title='Foreign', owner=self.outsider())
+        task = Task.objects.create(
+            board=foreign, title='Task', description='', status='to-do', priority='low', assignee=foreign.owner,
+        )
+        response = self.client.post('/api/tasks/bulk/', [self.item(0), self.item(1, board=foreign.pk)], format='json')
+        self.assertEqual([(result['index'], result['status']) for result in response.data['results']], [(1, 403)])
+        response = self.client.patch('/api/tasks/bulk/', [{'id': task.pk, 'board': self.board.pk}], format='json')
+        self.assertEqual([(result['index'], result['status']) for result in response.data['results']], [(0, 403)])
+        self.assertEqual(Task.objects.filter(board=self.board).count(), 0)
+
+    def test_query_count_does_not_grow_with_items(self):
+        counts = []
+        for size in (1, 10):
+            cache.clear()
+            with CaptureQueriesContext(connection) as created:
+                ids = [
+                    result['task']['id'] for result in
+                    self.client.post('/api/tasks/bulk/', [self.item(n) for n in range(size)], format='json').data['results']
+                ]
+            cache.clear()
+            with CaptureQueriesContext(connection) as updated:
+                self.client.patch('/api/tasks/bulk/', [{'id': pk, 'status': 'review'} for pk in ids], format='json')
+            counts.append((len(created), len(updated)))
+        self.assertEqual(counts[0], counts[1])
+
+    def outsider(self):
+        return User.objects.create_user(username='outsider', email='outsider@example.com')
+
+
+class BoardAccessTests(APITestCase):
+    """Cached board access follows membership changes once they commit."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.url = f'/api/boards/{self.board.pk}/'
+
+    def test_membership_changes_invalidate_access(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.board.members.add(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.board.members.remove(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class BoardStatsTests(APITestCase):
+    """The materialized board counters follow every write, including the ones outside the API."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+
+    def counters(self, board=None):
+        board = board or self.board
+        self.assertEqual(rebuild_board_stats([board.pk], dry_run=True), [])
+        stats = BoardStats.objects.get(pk=board.pk)
+        return stats.member_count, stats.ticket_count, stats.to_do_count, stats.done_count, stats.high_priority_count
+
+    def create_task(self, assignee=None, **fields):
+        return Task.objects.create(**{
+            'board': self.board, 'title': 'Task', 'description': '', 'status': 'to-do', 'priority': 'high',
+            'assignee': assignee or self.owner, **fields,
+        })
+
+    def test_new_board_gets_a_stats_row(self):
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+
+    def test_task_create_status_change_and_delete(self):
+        task = self.create_task()
+        self.assertEqual(self.counters(), (0, 1, 1, 0, 1))
+        task.status = 'done'
+        task.save()
+        self.assertEqual(self.counters(), (0, 1, 0, 1, 1))
+        task.priority = 'low'
+        task.save(update_fields=['priority'])
+        task.title = 'Renamed'
+        task.save(update_fields=['title'])
+        self.assertEqual(self.counters(), (0, 1, 0, 1, 0))
+        task.delete()
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+
+    def test_task_moved_to_another_board(self):
+        other = Board.objects.create(title='Other', owner=self.owner)
+        task = self.create_task()
+        task.board = other
+        task.save()
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+        self.assertEqual(self.counters(other), (0, 1, 1, 0, 1))
+
+    def test_member_changes_from_both_sides(self):
+        self.board.members.add(self.owner, self.member)
+        self.assertEqual(self.counters()[0], 2)
+        self.board.members.remove(self.owner)
+        self.assertEqual(self.counters()[0], 1)
+        self.member.members.clear()
+        self.assertEqual(self.counters()[0], 0)
+        self.member.members.add(self.board)
+        self.board.members.clear()
+        self.assertEqual(self.counters()[0], 0)
+
+    def test_deleting_a_user_cascades_into_the_counters(self):
+        self.board.members.add(self.owner, self.member)
+        self.create_task()
+        self.create_task(assignee=self.member, status='done')
+        self.member.delete()
+        self.assertEqual(self.counters(), (1, 1, 1, 0, 1))
+
+    def test_api_writes(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            '/api/boards/', {'title': 'API', 'members': [self.owner.pk, self.member.pk]}, format='json',
+        )
+        self.assertEqual(response.data['member_count'], 2)
+        board = Board.objects.get(pk=response.data['id'])
+        task_id = self.client.post('/api/tasks/', {
+            'board': board.pk, 'title': 'Task', 'description': 'Details', 'status': 'to-do', 'priority': 'high',
+            'assignee_id': self.member.pk,
+        }, format='json').data['id']
+        self.client.patch(f'/api/tasks/{task_id}/', {'status': 'done'}, format='json')
+        self.client.patch(f'/api/boards/{board.pk}/', {'members': [self.owner.pk]}, format='json')
+        self.assertEqual(self.counters(board), (1, 1, 0, 1, 1))
+        self.client.delete(f'/api/tasks/{task_id}/')
+        self.assertEqual(self.counters(board), (1, 0, 0, 0, 0))
+
+
+class BoardTransferTests(APITestCase):
+    """Exported boards import again with remapped ids, members, stats and comment counts."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.owner, self.member)
+        task = Task.objects.create(
+            board=self.board, title='Task', description='', status='review', priority='high',
+            assignee=self.member, reviewer=self.owner,
+        )
+        Comment.objects.create(task=task, author=self.member, content='Hi')
+        self.client.force_authenticate(self.owner)
+
+    def test_round_trip(self):
+        response = self.client.get('/api/boards/export/')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), 5)
+
+        response = self.client.generic('POST', '/api/boards/import/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data, {'board': 1, 'member': 2, 'task': 1, 'comment': 1})
+
+        copy = Board.objects.exclude(pk=self.board.pk).get()
+        self.assertEqual(set(copy.members.values_list('email', flat=True)), {'owner@example.com', 'member@example.com'})
+        task = copy.tasks.get()
+        self.assertEqual((task.assignee, task.reviewer, task.comments_count), (self.member, self.owner, 1))
+        self.assertEqual((copy.stats.ticket_count, copy.stats.review_count, copy.stats.member_count), (1, 1, 2))
+
+    def test_unknown_user_rolls_back(self):
+        body = (
+            b'{"type": "board", "id": 1, "title": "B", "owner_email": "owner@example.com"}\n'
+            b'{"type": "member", "board_id": 1, "user_email": "nobody@example.com"}\n'
+        )
+        response = self.client.generic('POST', '/api/boards/import/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nobody@example.com', response.data['detail'])
+        self.assertEqual(Board.objects.count(), 1)
+
+    def test_users_outside_the_owners_boards_are_rejected(self):
+        User.objects.create_user(username='stranger', email='stranger@example.com')
+        board = b'{"type": "board", "id": 1, "title": "B", "owner_email": "owner@example.com"}\n'
+        member = b'{"type": "member", "board_id": 1, "user_email": "%s"}\n'
+        task = (
+            b'{"type": "task", "id": 1, "board_id": 1, "title": "T", "description": "", "status": "to-do", '
+            b'"priority": "low", "due_date": "2026-01-01", "assignee_email": "%s", "reviewer_email": null}\n'
+        )
+        comment = (
+            b'{"type": "comment", "id": 1, "task_id": 1, "author_email": "%s", '
+            b'"content": "Hi", "created_at": "2026-01-01T00:00:00Z"}\n'
+        )
+        for body, message in (
+            (board + task % b'owner@example.com' + comment % b'stranger@example.com',
+             'line 3: author stranger@example.com is not the owner or a member of the board'),
+            (board + member % b'stranger@example.com',
+             'line 2: stranger@example.com does not share a board with the importing user'),
+            (board + task % b'member@example.com',
+             'line 2: assignee member@example.com is not the owner or a member of the board'),
+        ):
+            response = self.client.generic('POST', '/api/boards/import/', body, content_type='application/x-ndjson')
+            self.assertEqual((response.status_code, response.data['detail']), (400, message))
+        self.assertEqual((Board.objects.count(), Comment.objects.count()), (1, 1))
+
+        body = board + member % b'member@example.com' + task % b'member@example.com' + comment % b'member@example.com'
+        response = self.client.generic('POST', '/api/boards/import/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_invalid_values_are_reported_by_line(self):
+        board = b'{"type": "board", "id": 1, "title": "B", "owner_email": "owner@example.com"}\n'
+        task = {
+            'type': 'task', 'id': 1, 'board_id': 1, 'title': 'T', 'description': '', 'status': 'to-do',
+            'priority': 'low', 'due_date': '2026-01-01', 'assignee_email': 'owner@example.com',
+        }
+        for invalid in (
+            {'due_date': '2026-13-01'}, {'title': None}, {'title': ['T']}, {'status': 'blocked'},
+            {'priority': 'urgent'}, {'board_id': [1]}, {'id': {'a': 1}}, {'assignee_email': None},
+        ):
+            body = board + json.dumps({**task, **invalid}).encode()
+            response = self.client.generic('POST', '/api/boards/import/', body, content_type='application/x-ndjson')
+            self.assertEqual(response.status_code, 400, invalid)
+            self.assertIn('line 2', response.data['detail'])
+        response = self.client.generic('POST', '/api/boards/import/', board + b'\xff\n', content_type='application/x-ndjson')
+        self.assertEqual((response.status_code, response.data['detail']), (400, 'line 2: not valid UTF-8'))
+        self.assertEqual(Board.objects.count(), 1)
+
+
+class CommentCounterTests(APITestCase):
+    """The stored comment counters follow comment writes and drift is repaired by reconcile_comment_counts."""
+
+    def test_reconcile_repairs_drift(self):
+        user = User.objects.create_user(username='owner', email='owner@example.com')
+        board = Board.objects.create(title='Board', owner=user)
+        tasks = [
+            Task.objects.create(
+                board=board, title='Task', description='', status='to-do', priority='low', assignee=user,
+            )
+            for _ in range(3)
+        ]
+        for task in tasks[:2]:
+            Comment.objects.create(task=task, author=user, content='Hi')
+        Comment.objects.create(task=tasks[0], author=user, content='Hi')
+        self.assertEqual([task.comments_count for task in Task.objects.order_by('pk')], [2, 1, 0])
+
+        Task.objects.filter(pk__in=[tasks[0].pk, tasks[2].pk]).update(comments_count=7)
+        output = io.StringIO()
+        call_command('reconcile_comment_counts', dry_run=True, batch_size=2, stdout=output)
+        self.assertIn('Checked 3 tasks. Found 2 drifted comment counters.', output.getvalue())
+        self.assertEqual([task.comments_count for task in Task.objects.order_by('pk')], [7, 1, 7])
+
+        output = io.StringIO()
+        call_command('reconcile_comment_counts', batch_size=2, stdout=output)
+        self.assertIn('Repaired 2 drifted comment counters.', output.getvalue())
+        self.assertEqual([task.comments_count for task in Task.objects.order_by('pk')], [2, 1, 0])
+
+
+class QueryPlanTests(APITestCase):
+    """The hot queries use their indexes; the email check still ignores case; the API benchmark runs."""
+
+    def test_email_check_ignores_case(self):
+        user = User.objects.create_user(username='mixed', email='Mixed.Case@example.com')
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/email-check/?email=mixed.CASE@example.com')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], user.pk)
+
+    def test_query_plans_use_indexes(self):
+        call_command('seed_data', users=20, boards=10, tasks=200, comments=400, stdout=io.StringIO())
+        failures = [(check.label, plan) for check, ok, plan in check_query_plans() if not ok]
+        self.assertEqual(failures, [])
+
+    def test_benchmark_api_smoke(self):
+        """The smallest benchmark run covers every route and answers 2xx everywhere; it runs
+        on the test database instead of creating a throwaway one."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('kanban_app.management.commands.benchmark_api.benchmark_database', contextlib.nullcontext):
+            output = f'{directory}/results.json'
+            call_command('benchmark_api', size=['small'], iterations=1, warmup=0, output=output, stdout=stdout, stderr=stderr)
+            with open(output, encoding='utf-8') as file:
+                results = json.load(file)['results']['small']
+        self.assertEqual(stderr.getvalue(), '')
+        self.assertIn('GET boards', results)
+        self.assertEqual([key for key, result in results.items() if not 200 <= result['status'] < 300], [])
+
+
+@override_settings(PERF_INSTRUMENTATION=True, PERF_SLOW_REQUEST_MS=0, PERF_STATS_DIR=tempfile.gettempdir())
+class PerformanceMiddlewareTests(APITestCase):
+    """The opt-in middleware reports timings and aggregates them per route."""
+
+    def setUp(self):
+        view_stats.reset()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        Board.objects.create(title='Board', owner=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_slow_log_and_stats(self):
+        with self.assertLogs('core.performance', 'WARNING') as logs:
+            response = self.client.get('/api/boards/')
+        self.assertRegex(response['Server-Timing'], r'total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('Slow request GET /api/boards/', logs.output[0])
+        self.assertEqual(view_stats.snapshot()['routes']['GET /api/boards/']['count'], 1)
+
+    def test_fingerprint_folds_literals_and_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 1'),
+        )
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN='scrape-token')
+class MetricsEndpointTests(APITestCase):
+    """Requests, login failures and cache lookups show up on /api/metrics/ for the scraper."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(self.settings(METRICS_DIR=directory.name))
+
+    def test_scrape(self):
+        cache.clear()
+        user = User.objects.create_user(username='owner', email='owner@example.com')
+        self.client.post('/api/login/', {'email': 'owner@example.com', 'password': 'wrong'}, format='json')
+        board = Board.objects.create(title='Board', owner=user)
+        self.client.force_authenticate(user)
+        self.client.get('/api/boards/')
+        self.client.get(f'/api/boards/{board.pk}/')
+        self.client.force_authenticate(None)
+
+        body = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token').content.decode()
+        self.assertIn('kanmind_http_requests_total{method="GET",status="200",view="BoardListCreateView"} 1.0', body)
+        self.assertIn('kanmind_login_failures_total 1.0', body)
+        self.assertIn('kanmind_cache_requests_total{cache="board_access",result="miss"} 1.0', body)
+        self.assertIn('kanmind_cache_requests_total{cache="board_payload",result="miss"} 1.0', body)
+        self.assertRegex(body, r'kanmind_http_request_duration_seconds_count\{method="GET",view="BoardListCreateView"\} 1.0')
+
+    def test_access(self):
+        user = User.objects.create_user(username='owner', email='owner@example.com', password='secret')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with self.settings(METRICS_TOKEN=None):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+            user.is_staff = True
+            user.save()
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+        with self.settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    """Safe reads of the listed views go to healthy replicas unless the user just wrote."""
+
+    def setUp(self):
+        cache.clear()
+        replica_pool.mark('replica1', True)
+        self.router = ReplicaRouter()
+
+    def read_as(self, user):
+        request = RequestFactory().get('/api/boards/')
+        request.user = user
+        routing = ReadRouting(request)
+        routing.enabled = True
+        token = read_routing.set(routing)
+        try:
+            return self.router.db_for_read(Board), self.router.db_for_read(Token)
+        finally:
+            read_routing.reset(token)
+
+    def test_reads_use_replica_and_tokens_primary(self):
+        self.assertIsNone(self.router.db_for_read(Board))
+        self.assertEqual(self.read_as(User(pk=1)), ('replica1', 'default'))
+        self.assertEqual(self.router.db_for_write(Board), 'default')
+
+    def test_writer_sticks_to_primary(self):
+        request = RequestFactory().patch('/api/boards/1/')
+        request.user = User(pk=1)
+        remember_write(request)
+        self.assertEqual(self.read_as(User(pk=1))[0], 'default')
+        self.assertEqual(self.read_as(User(pk=2))[0], 'replica1')
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        replica_pool.mark('replica1', False)
+        self.assertEqual(self.read_as(User(pk=1))[0], 'default')
+
+
+class FastPayloadTests(APITestCase):
+    """The compiled board payload and the orjson renderer produce the bytes DRF would."""
+
+    def test_compiled_payload_matches_serializer(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        reviewer = User.objects.create_user(username='reviewer', email='reviewer@example.com')
+        UserProfile.objects.create(user=reviewer, fullname='Zoë Reviewer')
+        board = Board.objects.create(title='Board', owner=owner)
+        board.members.add(reviewer, owner)
+        for number, task_reviewer in enumerate([reviewer, None, owner]):
+            Task.objects.create(
+                board=board, title=f'Task {number}', description='', status='to-do', priority='low',
+                assignee=owner, reviewer=task_reviewer, comments_count=number,
+            )
+        expected = BoardSingleSerializer(BoardSingleView().get_detail_queryset().get(pk=board.pk)).data
+        self.assertEqual(JSONRenderer().render(board_detail_payload(board.pk)), JSONRenderer().render(expected))
+
+    def test_list_rows_match_serializers(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        reviewer = User.objects.create_user(username='reviewer', email='reviewer@example.com')
+        UserProfile.objects.create(user=reviewer, fullname='Zoë Reviewer')
+        board = Board.objects.create(title='Board', owner=owner)
+        for task_reviewer in (reviewer, None):
+            task = Task.objects.create(
+                board=board, title='Task', description='', status='to-do', priority='low',
+                assignee=owner, reviewer=task_reviewer,
+            )
+        for author in (owner, reviewer):
+            Comment.objects.create(task=task, author=author, content='Hi')
+        Board.objects.create(title='Without stats', owner=owner).stats.delete()
+        for view_class, serializer_class, queryset in (
+            (BoardListCreateView, BoardListSerializer, Board.objects.all()),
+            (TaskAssigneeView, TaskSerializer, Task.objects.filter(assignee=owner)),
+            (CommentListCreateAPIView, CommentSerializer, Comment.objects.filter(task=task)),
+        ):
+            rows = [view_class.row_mapper(row) for row in queryset.values_list(*view_class.row_columns, named=True)]
+            self.assertEqual(
+                JSONRenderer().render(rows), JSONRenderer().render(serializer_class(queryset, many=True).data),
+            )
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'Zoë \u2028 \u2029 "quoted"', 'detail': ErrorDetail('Not found.', code='not_found'),
+            'when': datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2025, 1, 2), 'items': [1, None, True],
+        }
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+        """orjson refuses these; the renderer falls back to JSONRenderer."""
+        for refused in ({'big': 2 ** 70}, {'keys': {1: 'one'}}):
+            self.assertEqual(OrjsonRenderer().render(refused), JSONRenderer().render(refused))
+        self.assertEqual(
+            OrjsonRenderer().render(data, 'application/json; indent=2'), JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+
+def api_urlconf(async_routes):
+    urlconf = types.ModuleType('async_test_urls')
+    urlconf.urlpatterns = [path('api/', include(build_urlpatterns(async_routes)))]
+    return urlconf
+
+
+class AsyncReadViewTests(APITestCase):
+    """The async read views answer exactly like the DRF views they replace."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com')
+        UserProfile.objects.create(user=self.user, fullname='Owner')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.board.members.add(self.user)
+        self.task = Task.objects.create(
+            board=self.board, title='Task', description='', status='to-do', priority='high', assignee=self.user,
+        )
+        Comment.objects.create(task=self.task, author=self.user, content='Hi')
+
+    @ignore_warnings(message='StreamingHttpResponse must consume asynchronous iterators')
+    def get_both(self, url, **extra):
+        """The async stack streams through an async iterator, which the sync test client consumes with a warning."""
+        responses = []
+        for async_routes in (set(), {'all'}):
+            cache.clear()
+            with override_settings(ROOT_URLCONF=api_urlconf(selected_async_routes(async_routes))):
+                response = self.client.get(url, **extra)
+                content = b''.join(response) if response.streaming else response.content
+            responses.append((response.status_code, content))
+        return responses
+
+    def test_same_responses(self):
+        self.client.force_authenticate(self.user)
+        for url in (
+            '/api/boards/', f'/api/boards/{self.board.pk}/', '/api/tasks/assigned-to-me/',
+            f'/api/tasks/{self.task.pk}/comments/', '/api/email-check/?email=OWNER@example.com',
+            '/api/email-check/?email=nobody@example.com', '/api/tasks/0/comments/',
+        ):
+            sync, async_ = self.get_both(url)
+            self.assertEqual(sync, async_, url)
+
+    @mock.patch('kanban_app.api.payloads.STREAM_CHUNK_ROWS', 1)
+    def test_streamed_lists_match_plain_lists(self):
+        self.client.force_authenticate(self.user)
+        Task.objects.create(
+            board=self.board, title='Second', description='', status='done', priority='low', assignee=self.user,
+        )
+        for url in ('/api/boards/', '/api/tasks/assigned-to-me/', '/api/tasks/reviewing/', f'/api/tasks/{self.task.pk}/comments/'):
+            plain = self.client.get(url).content
+            for status_code, content in self.get_both(f'{url}?stream=1'):
+                self.assertEqual((status_code, content), (200, plain), url)
+
+    def test_token_authentication(self):
+        token = Token.objects.create(user=self.user)
+        sync, async_ = self.get_both('/api/boards/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(async_[0], 200)
+        self.assertEqual(sync, async_)
+        sync, async_ = self.get_both('/api/boards/')
+        self.assertEqual(async_[0], 401)
+        self.assertEqual(sync, async_)
+
+
+class SearchTests(APITestCase):
+    """Search finds word prefixes in the accessible boards only and follows every change to tasks and comments."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user', email='user@example.com')
+        self.stranger = User.objects.create_user(username='stranger', email='stranger@example.com')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.foreign_board = Board.objects.create(title='Foreign', owner=self.stranger)
+        self.task = Task.objects.create(
+            board=self.board, title='Kanban <b>Board</b>', description='Sort the cards by Müller',
+            status='to-do', priority='low', assignee=self.user,
+        )
+        Task.objects.create(
+            board=self.foreign_board, title='Kanban', description='', status='to-do', priority='low',
+            assignee=self.stranger,
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_prefixes_in_accessible_boards(self):
+        [hit] = self.search('kan boa')
+        self.assertEqual(hit['title'], '<mark>Kanban</mark> &lt;b&gt;<mark>Board</mark>&lt;/b&gt;')
+        self.assertEqual((hit['type'], hit['id'], hit['board_id']), ('task', self.task.pk, self.board.pk))
+        self.assertEqual(self.search('mull')[0]['snippet'], 'Sort the cards by <mark>Müller</mark>')
+        self.assertEqual(self.search('kanban missing'), [])
+
+    @mock.patch('kanban_app.api.search.MAX_BOARD_TOKENS', 0)
+    def test_prefixes_in_accessible_boards_filtered_by_board(self):
+        self.test_prefixes_in_accessible_boards()
+
+    def test_index_follows_changes(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, content='Cards sorted')
+        self.assertEqual(sorted(hit['type'] for hit in self.search('card')), ['comment', 'task'])
+        self.assertEqual(self.search('sorted')[0]['title'], 'Kanban &lt;b&gt;Board&lt;/b&gt;')
+
+        Comment.objects.filter(pk=comment.pk).update(content='Done')
+        self.assertEqual(len(self.search('card')), 1)
+        Task.objects.filter(pk=self.task.pk).update(board=self.foreign_board)
+        self.assertEqual(self.search('done'), [])
+        Task.objects.filter(pk=self.task.pk).update(board=self.board)
+        self.assertEqual([hit['type'] for hit in self.search('done')], ['comment'])
+        self.board.delete()
+        self.assertEqual(self.search('kanban'), [])
+
+    def test_invalid_queries(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': '- a'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'kanban', 'board': self.foreign_board.pk}).status_code, 403)
+        self.assertEqual(len(self.search('kanban', board=self.board.pk)), 1)
@@ -1,9 +1,14 @@
 import os
 import django
 import datetime
-import random
+
+# Small demo dataset for the guest login. For load testing use `manage.py seed_data`.
+# Run it with `python populate_test_data.py`; it sets up Django itself.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+django.setup()
 
 from django.contrib.auth import get_user_model
+from kanban_app.api.models import Board, Task, Comment
 
 User = get_user_model()
 